@@ -13,6 +13,7 @@ from app.db.base import Base
 from app.models.conversation import Conversation
 from app.models.message import Message
 from app.models.chat_file import ChatFile
+from app.models.conversation_summary import ConversationSummary
 from app.core.settings import settings
 
 # this is the Alembic Config object
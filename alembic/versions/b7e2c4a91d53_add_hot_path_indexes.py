@@ -0,0 +1,52 @@
+"""Add hot-path indexes
+
+Revision ID: b7e2c4a91d53
+Revises: 6f3d3d380358
+Create Date: 2026-10-19 09:12:44.318502
+
+Indexes the columns that every chat request filters or sorts on:
+messages by conversation, conversations by user and chat files by
+conversation in upload order. On PostgreSQL they are built with
+CREATE INDEX CONCURRENTLY, which cannot run inside a transaction, so each
+one runs in an autocommit block and does not lock writes to the table.
+A failed concurrent build leaves an INVALID index behind that IF NOT EXISTS
+would skip; drop it before re-running the upgrade.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2c4a91d53'
+down_revision: Union[str, None] = '6f3d3d380358'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_messages_conversation_id_id', 'messages', ['conversation_id', 'id']),
+    ('ix_conversations_user_id_created_at', 'conversations', ['user_id', 'created_at']),
+    ('ix_chat_files_conversation_id_created_at', 'chat_files', ['conversation_id', 'created_at']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        with op.get_context().autocommit_block():
+            op.create_index(
+                name, table, columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        with op.get_context().autocommit_block():
+            op.drop_index(
+                name, table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
@@ -0,0 +1,54 @@
+"""Conversations keyset index
+
+Revision ID: d41f9a6c2e87
+Revises: b7e2c4a91d53
+Create Date: 2026-10-19 11:47:05.902114
+
+Conversation pages are ordered by (created_at, id) within a user. Adding id
+to the user index lets both the keyset condition and the ORDER BY be served
+by the index, with no sort for conversations created in the same instant.
+Built concurrently like the indexes of b7e2c4a91d53.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41f9a6c2e87'
+down_revision: Union[str, None] = 'b7e2c4a91d53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_conversations_user_id_created_at_id', 'conversations',
+            ['user_id', 'created_at', 'id'],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_conversations_user_id_created_at', table_name='conversations',
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_conversations_user_id_created_at', 'conversations',
+            ['user_id', 'created_at'],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_conversations_user_id_created_at_id', table_name='conversations',
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
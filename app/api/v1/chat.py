@@ -2,14 +2,16 @@
 Chat API endpoints using class-based ChatService.
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.database import get_db
+from app.db.database import get_db, get_session_factory
 from app.services.chat.chat_service import ChatService
 from app.schemas.conversation_request import ConversationRequest
 from app.schemas.conversation_dto import ConversationDTO
+from app.schemas.message_dto import MessageDTO
 
 router = APIRouter()
 
@@ -21,6 +23,21 @@ def get_chat_service(db: AsyncSession = Depends(get_db)) -> ChatService:
     return ChatService(db)
 
 
+def _require_user(request: Request) -> dict:
+    user = request.state.user if request.state.user else None
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return user
+
+
+async def _require_own_conversation(
+    chat_service: ChatService, conversation_id: int, user: dict
+) -> None:
+    conversation = await chat_service.get_conversation(conversation_id)
+    if not conversation or conversation.user_id != user["id"]:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+
+
 @router.post("/conversations", response_model=ConversationDTO)
 async def http_create_conversation(
     request: Request,
@@ -47,18 +64,76 @@ async def http_create_conversation(
 @router.get("/conversations", response_model=List[ConversationDTO])
 async def http_get_conversations(
     request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
     chat_service: ChatService = Depends(get_chat_service),
 ):
     """
-    Get all conversations for a user.
+    Get one page of the user's conversations, newest first.
+    The cursor of the next page is returned in the ``X-Next-Cursor`` header,
+    which is absent on the last page.
     """
-    user = request.state.user if request.state.user else None
+    user = _require_user(request)
+
+    try:
+        conversations, next_cursor = await chat_service.list_conversations(
+            user_id=user["id"], cursor=cursor, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return conversations
 
-    if not user:
-        raise HTTPException(status_code=401, detail="Not authenticated")
+
+@router.get(
+    "/conversations/{conversation_id}/messages", response_model=List[MessageDTO]
+)
+async def http_get_messages(
+    request: Request,
+    response: Response,
+    conversation_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    chat_service: ChatService = Depends(get_chat_service),
+):
+    """
+    Get one page of a conversation's messages, oldest first.
+    The cursor of the next page is returned in the ``X-Next-Cursor`` header,
+    which is absent on the last page.
+    """
+    user = _require_user(request)
+    await _require_own_conversation(chat_service, conversation_id, user)
 
     try:
-        conversations = await chat_service.get_conversations_by_user(user_id=user["id"])
-        return conversations
+        messages, next_cursor = await chat_service.list_messages(
+            conversation_id, cursor=cursor, limit=limit
+        )
     except ValueError as e:
-        raise HTTPException(status_code=401, detail=str(e)) from e
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return messages
+
+
+@router.get("/conversations/{conversation_id}/messages/export")
+async def http_export_messages(
+    request: Request,
+    conversation_id: int,
+    chat_service: ChatService = Depends(get_chat_service),
+    session_factory=Depends(get_session_factory),
+):
+    """
+    Stream a conversation's whole history as NDJSON, one message per line.
+    """
+    user = _require_user(request)
+    await _require_own_conversation(chat_service, conversation_id, user)
+
+    async def lines():
+        # The stream outlives the request-scoped session, so it uses its own.
+        async with session_factory() as session:
+            async for message in ChatService(session).iter_messages(conversation_id):
+                yield MessageDTO.model_validate(message).model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
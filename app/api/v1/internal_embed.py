@@ -0,0 +1,103 @@
+"""
+Internal batch embedding endpoint for other CoWrite services and backfill jobs.
+
+Vectors come from the same model (``model_registry``, or the shared embedding
+server when configured) and projection as the vectors this service stores, so
+callers never load a model of their own. Callers authenticate with the
+``X-Internal-Token`` header; the endpoint is disabled unless
+``settings.internal_api_token`` is set.
+"""
+
+import base64
+import hmac
+
+import numpy as np
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+
+from app.core.admission import AdmissionLimiter, Overloaded
+from app.core.metrics import EMBED_API_REJECTED_TOTAL, EMBED_API_TEXTS_TOTAL
+from app.core.settings import settings
+from app.schemas.embed_request import EmbedRequest, EmbedResponse
+
+router = APIRouter()
+
+
+def verify_internal_token(x_internal_token: str | None = Header(default=None)):
+    """Reject callers without the shared internal token."""
+    if not settings.internal_api_token:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not x_internal_token or not hmac.compare_digest(
+        x_internal_token, settings.internal_api_token
+    ):
+        EMBED_API_REJECTED_TOTAL.labels(reason="unauthorized").inc()
+        raise HTTPException(status_code=401, detail="Invalid internal token")
+
+
+def get_embed_limiter(request: Request) -> AdmissionLimiter:
+    """Return the preloaded embedding AdmissionLimiter from app.state."""
+    return request.app.state.embed_limiter
+
+
+def _check_size(data: EmbedRequest) -> None:
+    """Reject batches over the configured size limits with a 413."""
+    if len(data.texts) > settings.internal_embed_max_texts:
+        EMBED_API_REJECTED_TOTAL.labels(reason="too_many_texts").inc()
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.internal_embed_max_texts} texts per request",
+        )
+    if max(len(text) for text in data.texts) > settings.internal_embed_max_chars:
+        EMBED_API_REJECTED_TOTAL.labels(reason="text_too_long").inc()
+        raise HTTPException(
+            status_code=413,
+            detail=f"Texts are limited to {settings.internal_embed_max_chars} characters",
+        )
+
+
+@router.post(
+    "/internal/embed",
+    response_model=EmbedResponse,
+    dependencies=[Depends(verify_internal_token)],
+)
+async def embed_texts(
+    request: Request,
+    data: EmbedRequest,
+    limiter: AdmissionLimiter = Depends(get_embed_limiter),
+):
+    """
+    Embed a batch of texts.
+
+    Both modes encode the texts unprefixed, exactly as ingestion (``passage``)
+    and retrieval (``query``) do, so the vectors are comparable with the stored
+    ones. ``binary`` returns the row-major float32 matrix as the body, with its
+    shape in the ``X-Embedding-Shape`` header.
+    """
+    _check_size(data)
+
+    try:
+        async with limiter.admit():
+            vectors = await request.app.state.chroma_client.encode_texts(data.texts)
+    except Overloaded as e:
+        EMBED_API_REJECTED_TOTAL.labels(reason="overloaded").inc()
+        raise HTTPException(
+            status_code=503,
+            detail="Embedding capacity exhausted, retry later",
+            headers={"Retry-After": "1"},
+        ) from e
+    EMBED_API_TEXTS_TOTAL.labels(mode=data.mode).inc(len(data.texts))
+
+    vectors = np.ascontiguousarray(vectors, dtype="<f4")
+    if data.encoding == "binary":
+        return Response(
+            content=vectors.tobytes(),
+            media_type="application/octet-stream",
+            headers={
+                "X-Embedding-Shape": f"{vectors.shape[0]},{vectors.shape[1]}",
+                "X-Embedding-Model": settings.embedding_model_name,
+            },
+        )
+    return EmbedResponse(
+        model=settings.embedding_model_name,
+        dimensions=vectors.shape[1],
+        embeddings=[base64.b64encode(row.tobytes()).decode() for row in vectors],
+    )
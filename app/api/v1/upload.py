@@ -2,6 +2,10 @@
 API endpoint for uploading files to S3 and saving metadata in the database.
 """
 
+import asyncio
+import json
+from typing import AsyncIterator, List, Optional
+
 from fastapi import (
     APIRouter,
     Request,
@@ -10,12 +14,24 @@ from fastapi import (
     Depends,
     HTTPException,
     BackgroundTasks,
+    Query,
 )
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.metrics import FILE_STATUS_LOOKUPS_TOTAL
+from app.core.settings import settings
 from app.db.database import get_db
+from app.schemas.sqs_message import ChatFileMessageDto
 from app.services.ai.embedding_service import EmbeddingService
+from app.services.files.ingest_events import (
+    TERMINAL_STATUSES,
+    IngestEvent,
+    IngestEventBus,
+    ingest_events,
+)
 from app.services.files.s3_service import S3Client
+from app.services.files.sqs_publisher import SQSPublisher
 from app.services.files.text_extraction_service import TextExtractionService
 from app.services.files.upload_service import UploadService
 
@@ -41,15 +57,25 @@ def get_embedding_service(
         s3_client=request.app.state.s3_client,
         text_extractor_service=request.app.state.text_extractor_service,
         db=db,
-        model=request.app.state.embedding_model,
+        chunk_store=request.app.state.chunk_store,
     )
 
 
+def get_sqs_publisher(request: Request) -> SQSPublisher:
+    """Return preloaded SQSPublisher from app.state."""
+    return request.app.state.sqs_publisher
+
+
 def get_upload_service(request: Request) -> UploadService:
     """Return UploadService using preloaded S3 client from app.state."""
     return UploadService(request.app.state.s3_client)
 
 
+def get_ingest_events() -> IngestEventBus:
+    """Return the process-wide ingest event bus."""
+    return ingest_events
+
+
 @router.post("/conversations/{conversation_id}/upload")
 async def upload_file(
     request: Request,
@@ -59,10 +85,12 @@ async def upload_file(
     session: AsyncSession = Depends(get_db),
     upload_service: UploadService = Depends(get_upload_service),
     embedding_service: EmbeddingService = Depends(get_embedding_service),
+    sqs_publisher: SQSPublisher = Depends(get_sqs_publisher),
 ):
     """
     Upload a file to S3 and save metadata in the database.
-    Then trigger async embedding creation in the background.
+    Then trigger async embedding creation in the background, or hand the file
+    to the ingestion worker when ``settings.ingestion_enabled_in_api`` is off.
     """
     user = getattr(request.state, "user", None)
 
@@ -76,29 +104,139 @@ async def upload_file(
         session=session, file=file, conversation_id=conversation_id, user_id=user["id"]
     )
 
-    background_tasks.add_task(
-        embedding_service.add_file_embeddings,
-        file_key=chat_file.key,
-        file_name=chat_file.filename,
-        user_id=user["id"],
-        file_id=str(chat_file.id),
+    # Processed elsewhere, later statuses never reach this process's cache.
+    ingest_events.publish(
+        IngestEvent(str(chat_file.id), user["id"], "queued"),
+        expires=not settings.ingestion_enabled_in_api,
     )
 
+    if settings.ingestion_enabled_in_api:
+        background_tasks.add_task(
+            embedding_service.add_file_embeddings,
+            file_key=chat_file.key,
+            file_name=chat_file.filename,
+            user_id=user["id"],
+            file_id=str(chat_file.id),
+        )
+    else:
+        await sqs_publisher.publish(
+            settings.sqs_chat_queue_url,
+            ChatFileMessageDto(
+                file_id=chat_file.id,
+                user_id=user["id"],
+                s3_key=chat_file.key,
+                file_name=chat_file.filename,
+            ),
+        )
+
     return chat_file
 
 
+async def _lookup_status(
+    file_id: str,
+    session: AsyncSession,
+    upload_service: UploadService,
+    events: IngestEventBus,
+) -> Optional[IngestEvent]:
+    """Return a file's status from the event cache, or read and cache it."""
+    event = events.latest(file_id)
+    if event is not None:
+        FILE_STATUS_LOOKUPS_TOTAL.labels(source="cache").inc()
+        return event
+
+    FILE_STATUS_LOOKUPS_TOTAL.labels(source="db").inc()
+    chat_file = await upload_service.get_file_status(session=session, file_id=file_id)
+    if not chat_file:
+        return None
+    event = IngestEvent(
+        file_id,
+        chat_file.user_id,
+        chat_file.status,
+        1.0 if chat_file.status in TERMINAL_STATUSES else 0.0,
+    )
+    events.remember(event)
+    return event
+
+
 @router.get("/conversations/upload/status/{file_id}")
 async def file_status(
     file_id: str,
     session: AsyncSession = Depends(get_db),
     upload_service: UploadService = Depends(get_upload_service),
+    events: IngestEventBus = Depends(get_ingest_events),
 ):
     """
     Get the status of a file processing.
+    Served from the ingest event cache; the database is read at most once per
+    ``ingest_status_cache_ttl_secs`` for files not being processed here.
     """
-    chat_file = await upload_service.get_file_status(session=session, file_id=file_id)
+    event = await _lookup_status(file_id, session, upload_service, events)
 
-    if not chat_file:
+    if not event:
         raise HTTPException(status_code=404, detail="File not found")
 
-    return {"fileId": chat_file.id, "status": chat_file.status}
+    return {"fileId": event.file_id, "status": event.status, "progress": event.progress}
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_ingest_events(
+    events: IngestEventBus,
+    user_id: int,
+    file_ids: List[str],
+    heartbeat_secs: float = settings.ingest_events_heartbeat_secs,
+) -> AsyncIterator[str]:
+    """Yield a user's ingest events as Server-Sent Events.
+
+    The current status of each of ``file_ids`` is sent first. It is read from
+    the cache after subscribing, so no event can fall between the two.
+
+    Args:
+        events: Bus to subscribe to.
+        user_id: Owner of the files.
+        file_ids: Files whose current status is sent on connect.
+        heartbeat_secs: Idle time after which a comment line keeps proxies
+            from closing the connection.
+    """
+    with events.subscribe(user_id) as queue:
+        for file_id in file_ids:
+            event = events.latest(file_id)
+            if event is not None and event.user_id == user_id:
+                yield _sse("status", event.to_dict())
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), heartbeat_secs)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield _sse("status", event.to_dict())
+
+
+@router.get("/conversations/upload/events")
+async def file_events(
+    request: Request,
+    file_id: List[str] = Query(default=[]),
+    session: AsyncSession = Depends(get_db),
+    upload_service: UploadService = Depends(get_upload_service),
+    events: IngestEventBus = Depends(get_ingest_events),
+):
+    """
+    Push processing status changes of the user's files as Server-Sent Events.
+    Pass ``file_id`` (repeatable) to receive those files' current status first.
+    """
+    user = getattr(request.state, "user", None)
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    for requested in file_id:
+        await _lookup_status(requested, session, upload_service, events)
+    # The stream can stay open for hours; do not hold a pooled connection.
+    await session.close()
+
+    return StreamingResponse(
+        stream_ingest_events(events, user["id"], file_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,125 +1,192 @@
 """
-WebSocket endpoint for handling chat messages with Gemini AI using ChatService.
+WebSocket endpoint for handling chat messages with Gemini AI.
+
+A socket can stay open for hours, so it holds no database session of its own:
+every turn opens a short session from the session factory for the reads that
+build the prompt and closes it before the Gemini call. Idle sockets hold no
+pooled connection, and the number of open chats is not bounded by the pool.
+
+Half-open connections are detected by uvicorn's protocol pings
+(``--ws-ping-interval``/``--ws-ping-timeout``). Sockets that send no message
+for ``ws_idle_timeout_secs`` are closed with 1001, and a user's sockets beyond
+``ws_max_connections_per_user`` are refused with 1008. The session cookie is
+verified by ``AuthMiddleware`` and the conversation's owner is checked before the
+handshake is accepted.
 """
 
-from http.cookies import SimpleCookie
+import asyncio
+from typing import Callable
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.database import get_db
+from app.core.admission import Overloaded
+from app.core.connections import ConnectionTracker
+from app.core.metrics import WS_CONNECTIONS_CLOSED_TOTAL
+from app.db.database import get_session_factory
+from app.repositories.conversation_repository import ConversationRepository
 from app.services.ai.workspace_context_service import WorkspaceContextService
-from app.services.chat.chat_service import ChatService
+from app.services.chat.conversation_memory import ConversationMemory
+from app.services.chat.turn_writer import ChatTurnWriter
 from app.services.ai.embedding_service import EmbeddingService
 from app.services.ai.file_context_service import FileContextService
-from app.services.auth.auth_service import verify_user
+from app.services.ai.gemini_client import GeminiClient
 from app.core.settings import settings
 from app.services.ai.gemini_text_service import GeminiTextService
 
 router = APIRouter()
 
+TextServiceFactory = Callable[[AsyncSession], GeminiTextService]
 
-async def get_embedding_service(
-    ws: WebSocket, db: AsyncSession = Depends(get_db)
-) -> EmbeddingService:
-    """Return EmbeddingService using preloaded objects from app.state."""
-    return EmbeddingService(
-        chroma_client=ws.app.state.chroma_client,
-        s3_client=ws.app.state.s3_client,
-        text_extractor_service=ws.app.state.text_extractor_service,
-        db=db,
-        model=ws.app.state.embedding_model,
-    )
 
+async def get_conversation_memory(ws: WebSocket) -> ConversationMemory:
+    """Return the shared ConversationMemory from app.state."""
+    return ws.app.state.conversation_memory
 
-async def get_chat_service(db: AsyncSession = Depends(get_db)) -> ChatService:
-    """Return ChatService using preloaded objects from app.state."""
-    return ChatService(db)
 
+async def get_turn_writer(ws: WebSocket) -> ChatTurnWriter:
+    """Return the shared ChatTurnWriter from app.state."""
+    return ws.app.state.turn_writer
 
-async def get_file_context_service(
-    embedding_service: EmbeddingService = Depends(get_embedding_service),
-    db: AsyncSession = Depends(get_db),
-) -> FileContextService:
-    """Return FileContextService using EmbeddingService and DB session."""
-    return FileContextService(embedding_service=embedding_service, db=db)
 
+async def get_connection_tracker(ws: WebSocket) -> ConnectionTracker:
+    """Return the shared ConnectionTracker from app.state."""
+    return ws.app.state.ws_connections
 
-async def get_workspace_context_service(
-    embedding_service: EmbeddingService = Depends(get_embedding_service),
-) -> WorkspaceContextService:
-    """Return WorkspaceContextService using EmbeddingService."""
-    return WorkspaceContextService(embedding_service=embedding_service)
 
+async def get_text_service_factory(ws: WebSocket) -> TextServiceFactory:
+    """Return a builder of GeminiTextService bound to one turn's DB session.
 
-async def get_gemini_text_service(
-    file_context_service: FileContextService = Depends(get_file_context_service),
-    workspace_context_service: WorkspaceContextService = Depends(
-        get_workspace_context_service
-    ),
-) -> GeminiTextService:
-    """Return GeminiTextService using FileContextService."""
-    return GeminiTextService(
-        file_context_service=file_context_service,
-        workspace_context_service=workspace_context_service,
-    )
+    The services share the preloaded clients from app.state, including one
+    Gemini client created on first use, so a socket owns no clients itself.
+    """
+    state = ws.app.state
+    client = getattr(state, "gemini_client", None)
+    if client is None:
+        client = state.gemini_client = GeminiClient()
+
+    def build(db: AsyncSession) -> GeminiTextService:
+        embedding_service = EmbeddingService(
+            chroma_client=state.chroma_client,
+            s3_client=state.s3_client,
+            text_extractor_service=state.text_extractor_service,
+            db=db,
+            chunk_store=state.chunk_store,
+        )
+        return GeminiTextService(
+            file_context_service=FileContextService(
+                embedding_service=embedding_service,
+                db=db,
+                chunk_store=state.chunk_store,
+            ),
+            workspace_context_service=WorkspaceContextService(
+                embedding_service=embedding_service,
+                chunk_store=state.chunk_store,
+            ),
+            client=client,
+        )
+
+    return build
 
 
 @router.websocket("/ws/chat/{conversation_id}")
 async def websocket_chat(
     websocket: WebSocket,
     conversation_id: int,
-    chat_service: ChatService = Depends(get_chat_service),
-    gemini_text_service: GeminiTextService = Depends(get_gemini_text_service),
+    session_factory=Depends(get_session_factory),
+    text_service_factory: TextServiceFactory = Depends(get_text_service_factory),
+    conversation_memory: ConversationMemory = Depends(get_conversation_memory),
+    turn_writer: ChatTurnWriter = Depends(get_turn_writer),
+    connections: ConnectionTracker = Depends(get_connection_tracker),
 ):
     """WebSocket handler for chat messages in a given conversation."""
-    await websocket.accept()
-
-    cookie_header = websocket.headers.get("cookie")
-    cookies = SimpleCookie(cookie_header)
-    token = cookies.get(settings.user_cookie_name)
-    token_value = token.value if token else None
-
-    if not token_value:
+    # AuthMiddleware has verified the session cookie and refused invalid ones.
+    user = getattr(websocket.state, "user", None)
+    if not user:
+        await websocket.accept()
         await websocket.send_text("Missing session cookie")
         await websocket.close()
         return
 
-    user = await verify_user(token_value)
-    if not user:
-        await websocket.send_text("Invalid session")
-        await websocket.close()
+    # Memory and retrieval read by conversation id, so only its owner may chat.
+    async with session_factory() as db:
+        conversation = await ConversationRepository(db).get_conversation(
+            conversation_id
+        )
+    if not conversation or conversation.user_id != user["id"]:
+        await websocket.close(code=1008, reason="Conversation not found")
         return
 
+    await websocket.accept()
+
+    try:
+        with connections.track(user["id"]):
+            reason = await _serve_turns(
+                websocket,
+                conversation_id,
+                user,
+                session_factory,
+                text_service_factory,
+                conversation_memory,
+                turn_writer,
+            )
+    except Overloaded:
+        reason = "limit"
+        await websocket.close(code=1008, reason="Too many connections")
+    WS_CONNECTIONS_CLOSED_TOTAL.labels(reason=reason).inc()
+
+
+async def _serve_turns(
+    websocket: WebSocket,
+    conversation_id: int,
+    user: dict,
+    session_factory,
+    text_service_factory: TextServiceFactory,
+    conversation_memory: ConversationMemory,
+    turn_writer: ChatTurnWriter,
+) -> str:
+    """Answer prompts until the client leaves or goes idle.
+
+    Returns:
+        str: Why the socket closed, ``disconnect`` or ``idle``.
+    """
+    idle_timeout = settings.ws_idle_timeout_secs or None
     try:
         while True:
-            prompt = await websocket.receive_text()
-
             try:
-                message = await chat_service.create_message(
-                    conversation_id=conversation_id,
-                    prompt=prompt,
-                    user_id=user["id"],
-                )
-
-                response = await gemini_text_service.generate(
-                    conversation_id=conversation_id,
-                    user_id=user["id"],
-                    user_prompt=prompt,
-                )
-
-                await chat_service.update_message_response(
-                    message_id=message.id,
-                    response=response,
-                    status="completed",
-                )
+                prompt = await asyncio.wait_for(websocket.receive_text(), idle_timeout)
+            except asyncio.TimeoutError:
+                await websocket.close(code=1001, reason="Idle timeout")
+                return "idle"
 
+            try:
+                async with session_factory() as db:
+                    gemini_text_service = text_service_factory(db)
+                    history = await conversation_memory.build(
+                        db,
+                        conversation_id,
+                        pending=turn_writer.pending_turns(conversation_id),
+                    )
+                    full_prompt = await gemini_text_service.build_prompt(
+                        conversation_id=conversation_id,
+                        user_id=user["id"],
+                        user_prompt=prompt,
+                        conversation_history=history,
+                    )
+
+                response = await gemini_text_service.complete(full_prompt)
+
+                turn_writer.record(conversation_id, user["id"], prompt, response)
                 await websocket.send_text(response)
 
             except (ValueError, RuntimeError, ConnectionError) as e:
                 print(f"Error processing chat message: {str(e)}")
+                turn_writer.record(
+                    conversation_id, user["id"], prompt, None, status="failed"
+                )
                 await websocket.send_text(
                     "Sorry, an error occurred while processing your message."
                 )
 
     except WebSocketDisconnect:
         print(f"User {user['id']} disconnected")
+        return "disconnect"
@@ -0,0 +1,55 @@
+"""Admission control for expensive endpoints.
+
+``AdmissionLimiter`` bounds how many requests run at once and how many may wait
+for a slot. Requests beyond that are rejected straight away with
+``Overloaded``, which callers turn into a 503, instead of queueing without
+limit behind work that already saturates the CPU.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted."""
+
+
+class AdmissionLimiter:
+    """Concurrency limit with a bounded wait queue."""
+
+    def __init__(self, max_concurrent: int, max_queued: int):
+        """Initialize the limiter.
+
+        Args:
+            max_concurrent: Requests allowed to run at the same time.
+            max_queued: Requests allowed to wait for a slot; more are rejected.
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Hold a slot while the block runs.
+
+        Raises:
+            Overloaded: If every slot is taken and the wait queue is full.
+        """
+        if self._semaphore.locked():
+            if self.waiting >= self.max_queued:
+                raise Overloaded(
+                    f"{self.max_concurrent} running and {self.waiting} waiting"
+                )
+            self.waiting += 1
+            try:
+                await self._semaphore.acquire()
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+        try:
+            yield
+        finally:
+            self._semaphore.release()
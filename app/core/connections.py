@@ -0,0 +1,53 @@
+"""Accounting of open chat WebSockets.
+
+``ConnectionTracker`` counts each user's open sockets, refuses connections
+beyond ``ws_max_connections_per_user`` with ``Overloaded`` and keeps the
+``cowrite_ws_connections_active`` gauge up to date, so the gauge and a pod's
+memory follow the users actually connected.
+"""
+
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from app.core.admission import Overloaded
+from app.core.metrics import WS_CONNECTIONS_ACTIVE
+
+
+class ConnectionTracker:
+    """Per-user limit on concurrently open WebSockets."""
+
+    def __init__(self, max_per_user: int):
+        """Initialize the tracker.
+
+        Args:
+            max_per_user: Sockets a user may have open at once; 0 disables
+                the limit.
+        """
+        self.max_per_user = max_per_user
+        self._open: Dict[int, int] = {}
+
+    def count(self, user_id: int) -> int:
+        """Return the number of sockets the user has open."""
+        return self._open.get(user_id, 0)
+
+    @contextmanager
+    def track(self, user_id: int) -> Iterator[None]:
+        """Count a socket as open while the block runs.
+
+        Raises:
+            Overloaded: If the user already has ``max_per_user`` sockets open.
+        """
+        open_now = self.count(user_id)
+        if self.max_per_user and open_now >= self.max_per_user:
+            raise Overloaded(f"user {user_id} has {open_now} connections open")
+        self._open[user_id] = open_now + 1
+        WS_CONNECTIONS_ACTIVE.inc()
+        try:
+            yield
+        finally:
+            WS_CONNECTIONS_ACTIVE.dec()
+            remaining = self._open[user_id] - 1
+            if remaining:
+                self._open[user_id] = remaining
+            else:
+                del self._open[user_id]
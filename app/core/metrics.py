@@ -0,0 +1,168 @@
+"""Prometheus metrics for ingestion, startup, the embedding API and the DB pool.
+
+Metrics are module-level singletons so they are registered exactly once in the
+default registry, which is the one exposed on ``/metrics`` by
+``prometheus_fastapi_instrumentator``.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from prometheus_client import Counter, Gauge, Histogram
+
+INGEST_STAGE_SECONDS = Histogram(
+    "cowrite_ingest_stage_seconds",
+    "Time spent in each ingestion stage.",
+    ["stage"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+
+INGEST_FILES_TOTAL = Counter(
+    "cowrite_ingest_files_total",
+    "Files processed successfully by the ingestion pipeline.",
+    ["event_type"],
+)
+
+INGEST_CHUNKS_TOTAL = Counter(
+    "cowrite_ingest_chunks_total",
+    "Text chunks embedded and stored by the ingestion pipeline.",
+    ["event_type"],
+)
+
+INGEST_FAILURES_TOTAL = Counter(
+    "cowrite_ingest_failures_total",
+    "Files whose ingestion failed.",
+    ["event_type"],
+)
+
+INGEST_IN_FLIGHT = Gauge(
+    "cowrite_ingest_in_flight",
+    "Files currently being ingested.",
+    ["pipeline"],
+)
+
+INGEST_QUEUED = Gauge(
+    "cowrite_ingest_queued",
+    "Messages received from the queue and waiting to be processed.",
+    ["source"],
+)
+
+STARTUP_SECONDS = Gauge(
+    "cowrite_startup_seconds",
+    "Seconds from process start until the application was ready to serve.",
+)
+
+STARTUP_PHASE_SECONDS = Gauge(
+    "cowrite_startup_phase_seconds",
+    "Duration of each startup phase of the last start.",
+    ["phase"],
+)
+
+EMBED_API_TEXTS_TOTAL = Counter(
+    "cowrite_embed_api_texts_total",
+    "Texts embedded through the internal embedding endpoint.",
+    ["mode"],
+)
+
+EMBED_API_REJECTED_TOTAL = Counter(
+    "cowrite_embed_api_rejected_total",
+    "Internal embedding requests rejected before encoding.",
+    ["reason"],
+)
+
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "cowrite_db_pool_checkout_seconds",
+    "Time to check a connection out of the pool, including waiting for one.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+DB_POOL_TIMEOUTS_TOTAL = Counter(
+    "cowrite_db_pool_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT_SECS.",
+)
+
+DB_POOL_IN_USE = Gauge(
+    "cowrite_db_pool_in_use",
+    "Connections currently checked out of the pool.",
+)
+
+DB_POOL_OVERFLOW = Gauge(
+    "cowrite_db_pool_overflow",
+    "Connections open beyond DB_POOL_SIZE.",
+)
+
+CHAT_TURNS_BUFFERED = Gauge(
+    "cowrite_chat_turns_buffered",
+    "Chat turns recorded but not yet written to the database.",
+)
+
+CHAT_TURN_FLUSH_SECONDS = Histogram(
+    "cowrite_chat_turn_flush_seconds",
+    "Time to write one batch of buffered chat turns.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+CHAT_TURN_FLUSH_FAILURES_TOTAL = Counter(
+    "cowrite_chat_turn_flush_failures_total",
+    "Batches of chat turns that failed to write and were kept for a retry.",
+)
+
+CHAT_TURNS_DROPPED_TOTAL = Counter(
+    "cowrite_chat_turns_dropped_total",
+    "Chat turns never written, by reason (buffer_full or rejected by the database).",
+    ["reason"],
+)
+
+FILE_STATUS_LOOKUPS_TOTAL = Counter(
+    "cowrite_file_status_lookups_total",
+    "File processing status lookups, by where the answer came from.",
+    ["source"],
+)
+
+WS_CONNECTIONS_ACTIVE = Gauge(
+    "cowrite_ws_connections_active",
+    "Authenticated chat WebSockets currently open.",
+)
+
+WS_CONNECTIONS_CLOSED_TOTAL = Counter(
+    "cowrite_ws_connections_closed_total",
+    "Chat WebSockets closed, by reason (disconnect, idle or limit).",
+    ["reason"],
+)
+
+AUTH_TOKEN_CACHE_LOOKUPS_TOTAL = Counter(
+    "cowrite_auth_token_cache_lookups_total",
+    "Session token verifications, by whether the verified-token cache answered.",
+    ["result"],
+)
+
+
+@contextmanager
+def observe_stage(stage: str) -> Iterator[None]:
+    """Record the duration of an ingestion stage.
+
+    Args:
+        stage: Stage name (``download``, ``extract``, ``chunk``, ``encode``,
+            ``upsert`` or ``delete``).
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        INGEST_STAGE_SECONDS.labels(stage=stage).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def track_in_flight(pipeline: str) -> Iterator[None]:
+    """Count a unit of ingestion work as in flight while the block runs.
+
+    Args:
+        pipeline: Pipeline name (``workspace`` or ``chat``).
+    """
+    gauge = INGEST_IN_FLIGHT.labels(pipeline=pipeline)
+    gauge.inc()
+    try:
+        yield
+    finally:
+        gauge.dec()
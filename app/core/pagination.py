@@ -0,0 +1,66 @@
+"""Opaque cursors for keyset pagination.
+
+A cursor holds the sort key of the last row of a page, e.g. ``(created_at,
+id)``; the next page is everything strictly after it in sort order. Unlike
+OFFSET, fetching page N costs the same as fetching page 1, and rows inserted
+meanwhile never shift a page. Clients treat cursors as opaque strings.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Sequence
+
+_DATETIME = "dt:"
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return _DATETIME + value.isoformat()
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, str) and value.startswith(_DATETIME):
+        return datetime.fromisoformat(value[len(_DATETIME) :])
+    return value
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode a row's sort key as a URL-safe cursor.
+
+    Args:
+        *values: Sort key columns of the last row of a page (ints, strings
+            or datetimes).
+    """
+    payload = json.dumps([_encode_value(value) for value in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> List[Any]:
+    """Decode a cursor produced by ``encode_cursor``.
+
+    Args:
+        cursor: Cursor from a previous page.
+        types: Expected type of each sort key column, e.g. ``(datetime, int)``.
+
+    Raises:
+        ValueError: If the cursor is malformed or its values do not have the
+            expected number and types.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("wrong number of values")
+        decoded = [_decode_value(value) for value in values]
+        for value, expected in zip(decoded, types):
+            # bool is an int subclass, but never a valid sort key.
+            if isinstance(value, bool) or not isinstance(value, expected):
+                raise ValueError(f"expected {expected.__name__}")
+            # Sort keys come from naive TIMESTAMP columns, never aware values.
+            if isinstance(value, datetime) and value.tzinfo is not None:
+                raise ValueError("unexpected time zone")
+        return decoded
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
@@ -6,21 +6,24 @@ import ssl
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.settings import settings
+from app.db.pool import engine_options, observe_pool, statement_cache_args
 
 
-connect_args = {}
+connect_args = statement_cache_args(settings.database_url)
 if "azure.com" in settings.database_url:
     ssl_context = ssl.create_default_context()
     ssl_context.check_hostname = False
     ssl_context.verify_mode = ssl.CERT_NONE
 
-    connect_args = {
-        "ssl": ssl_context,
-    }
+    connect_args["ssl"] = ssl_context
 
 engine = create_async_engine(
-    settings.database_url, echo=False, connect_args=connect_args
+    settings.database_url,
+    echo=False,
+    connect_args=connect_args,
+    **engine_options(settings.database_url),
 )
+observe_pool(engine)
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
@@ -30,3 +33,11 @@ async def get_db():
     """
     async with async_session() as session:
         yield session
+
+
+def get_session_factory():
+    """
+    Provide the session factory for work that outlives the request scope, such
+    as streamed responses and WebSocket turns.
+    """
+    return async_session
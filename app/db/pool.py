@@ -0,0 +1,106 @@
+"""
+Connection pool configuration and instrumentation.
+
+``engine_options`` turns the ``db_*`` settings into ``create_async_engine``
+arguments: pool size, overflow, timeout, recycle and pre-ping, plus asyncpg's
+prepared-statement caches. Behind PgBouncer in transaction mode a prepared
+statement may be missing on the next server connection, so with
+``settings.db_pgbouncer`` the caches are disabled and statements get unique
+names instead.
+"""
+
+import time
+import uuid
+from typing import Any, Dict
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.metrics import (
+    DB_POOL_CHECKOUT_SECONDS,
+    DB_POOL_IN_USE,
+    DB_POOL_OVERFLOW,
+    DB_POOL_TIMEOUTS_TOTAL,
+)
+from app.core.settings import settings
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout takes."""
+
+    def connect(self):
+        """Check a connection out, timing the wait and counting timeouts."""
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            DB_POOL_TIMEOUTS_TOTAL.inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def statement_cache_args(database_url: str) -> Dict[str, Any]:
+    """Return the prepared-statement cache ``connect_args`` for the driver.
+
+    Args:
+        database_url: SQLAlchemy database URL.
+
+    Returns:
+        Dict[str, Any]: asyncpg cache settings; empty for other drivers.
+    """
+    if not database_url.startswith("postgresql+asyncpg"):
+        return {}
+    if settings.db_pgbouncer:
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": _unique_statement_name,
+        }
+    return {
+        "statement_cache_size": settings.db_statement_cache_size,
+        "prepared_statement_cache_size": settings.db_statement_cache_size,
+    }
+
+
+def engine_options(database_url: str) -> Dict[str, Any]:
+    """Return the pool arguments of ``create_async_engine``.
+
+    In-memory SQLite keeps SQLAlchemy's single shared connection, since every
+    new connection would open an empty database.
+
+    Args:
+        database_url: SQLAlchemy database URL.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncPool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_secs,
+        "pool_recycle": settings.db_pool_recycle_secs,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def observe_pool(engine: AsyncEngine) -> None:
+    """Export the engine pool's in-use and overflow connection counts as gauges.
+
+    The pool is looked up at scrape time, since ``engine.dispose()`` replaces it.
+
+    Args:
+        engine: Application engine.
+    """
+    if not isinstance(engine.pool, AsyncAdaptedQueuePool):
+        return
+    # pylint: disable-next=unnecessary-lambda
+    DB_POOL_IN_USE.set_function(lambda: engine.pool.checkedout())
+    DB_POOL_OVERFLOW.set_function(lambda: max(engine.pool.overflow(), 0))
@@ -5,64 +5,133 @@ Exposes:
     app (FastAPI): The FastAPI application object used by ASGI servers.
 """
 
+import asyncio
 from contextlib import asynccontextmanager
+from functools import partial
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from prometheus_fastapi_instrumentator import Instrumentator
-from sentence_transformers import SentenceTransformer
 from app.api.v1.chat import router as chat_router
 from app.api.v1.ws_chat import router as ws_chat_router
 from app.api.v1.upload import router as upload_router
+from app.api.v1.internal_embed import router as internal_embed_router
 
 from app.middleware.auth_middleware import AuthMiddleware
+from app.core.admission import AdmissionLimiter
+from app.core.connections import ConnectionTracker
+from app.core.settings import settings
+from app.core.startup import StartupProfiler, process_uptime
+from app.db.database import async_session
 from app.services.ai.chroma_client import ChromaClient
+from app.services.ai.context_assembly import ChunkStore
 from app.services.ai.embedding_service import EmbeddingService
+from app.services.ai.model_registry import model_registry
 from app.services.ai.workspace_context_service import WorkspaceContextService
+from app.services.chat.conversation_memory import ConversationMemory
+from app.services.chat.turn_writer import ChatTurnWriter
 from app.services.files.s3_service import S3Client
 from app.services.files.sqs_client import SQSClient
+from app.services.files.sqs_publisher import SQSPublisher
 from app.services.files.sqs_message_handler import SqsMessageHandler
 from app.services.files.text_extraction_service import TextExtractionService
 
 
+async def _connect_chroma() -> ChromaClient:
+    """Build the vector store client and open its connection."""
+    chroma_client = await asyncio.to_thread(ChromaClient)
+    await chroma_client.warm_up()
+    return chroma_client
+
+
+def _track_model_load(profiler: StartupProfiler, task: asyncio.Task) -> None:
+    """Record the background model load as a startup phase once it finishes."""
+    if not task.cancelled() and task.exception() is None:
+        profiler.record("model_load", model_registry.load_secs or 0.0)
+
+
 @asynccontextmanager
 async def lifespan(_app: FastAPI):  # pylint redefines-outer-name
     """
     FastAPI lifespan context manager.
-    Preload heavy resources like embedding models and clients.
+    Create shared clients, timing every phase (``cowrite_startup_*`` metrics).
+    Independent clients are initialized concurrently. The embedding model is
+    loaded by ``model_registry`` in a worker thread, in the background when
+    preloading is enabled or on the first encode otherwise; ``/ready`` reports
+    when it is available.
     """
-    print("📥 Loading embedding model…")
-    embedding_model = SentenceTransformer("intfloat/multilingual-e5-base")
-    print("✅ Model loaded successfully.")
-
-    chroma_client = ChromaClient(model=embedding_model)
-    s3_client = S3Client()
-    text_extractor_service = TextExtractionService()
-
-    embedding_service = EmbeddingService(
-        chroma_client=chroma_client,
-        s3_client=s3_client,
-        text_extractor_service=text_extractor_service,
-        db=None,
-        model=embedding_model,
-    )
+    profiler = StartupProfiler()
+    profiler.record("boot", process_uptime())
 
-    workspace_context_service = WorkspaceContextService(
-        embedding_service=embedding_service
-    )
+    preload = None
+    if settings.embedding_model_preload:
+        preload = asyncio.create_task(model_registry.get())
+        preload.add_done_callback(partial(_track_model_load, profiler))
 
-    message_handler = SqsMessageHandler(embedding_service=embedding_service)
-    sqs_client = SQSClient(message_handler=message_handler)
-    await sqs_client.start()
-
-    _app.state.embedding_model = embedding_model
+    clients = await profiler.gather(
+        chroma=_connect_chroma,
+        s3=lambda: asyncio.to_thread(S3Client),
+    )
+    chroma_client, s3_client = clients["chroma"], clients["s3"]
+
+    with profiler.phase("services"):
+        chunk_store = ChunkStore(
+            chroma_client,
+            max_files=settings.context_chunk_cache_files,
+            ttl_secs=settings.context_chunk_cache_ttl_secs,
+        )
+        text_extractor_service = TextExtractionService()
+
+        embedding_service = EmbeddingService(
+            chroma_client=chroma_client,
+            s3_client=s3_client,
+            text_extractor_service=text_extractor_service,
+            db=None,
+            chunk_store=chunk_store,
+        )
+
+        workspace_context_service = WorkspaceContextService(
+            embedding_service=embedding_service, chunk_store=chunk_store
+        )
+
+    sqs_client = None
+    if settings.ingestion_enabled_in_api:
+        with profiler.phase("sqs"):
+            message_handler = SqsMessageHandler(embedding_service=embedding_service)
+            sqs_client = SQSClient(message_handler=message_handler)
+            await sqs_client.start()
+    else:
+        print("[Startup] Ingestion disabled in the API; run `python -m app.worker`.")
+
+    _app.state.model_registry = model_registry
     _app.state.chroma_client = chroma_client
+    _app.state.chunk_store = chunk_store
     _app.state.s3_client = s3_client
     _app.state.text_extractor_service = text_extractor_service
+    _app.state.sqs_publisher = SQSPublisher()
+    _app.state.embed_limiter = AdmissionLimiter(
+        max_concurrent=settings.internal_embed_max_concurrency,
+        max_queued=settings.internal_embed_max_queued,
+    )
     _app.state.embedding_service = embedding_service
     _app.state.workspace_context_service = workspace_context_service
+    conversation_memory = ConversationMemory(async_session)
+    turn_writer = ChatTurnWriter(
+        async_session, on_flush=conversation_memory.schedule_update
+    )
+    await turn_writer.start()
+    _app.state.conversation_memory = conversation_memory
+    _app.state.turn_writer = turn_writer
+    _app.state.ws_connections = ConnectionTracker(settings.ws_max_connections_per_user)
 
+    profiler.finish()
     yield
-    await sqs_client.stop()
+    if sqs_client is not None:
+        await sqs_client.stop()
+    if preload is not None:
+        preload.cancel()
+    await turn_writer.stop()
+    await conversation_memory.close()
     print("🔒 Application shutdown cleanup.")
 
 
@@ -80,6 +149,8 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # Keyset-paginated listings return the next page's cursor in a header.
+        expose_headers=["X-Next-Cursor"],
     )
 
     Instrumentator().instrument(_app).expose(_app)
@@ -89,11 +160,22 @@ def create_app() -> FastAPI:
     _app.include_router(chat_router, prefix="", tags=["chat"])
     _app.include_router(ws_chat_router, tags=["websocket"])
     _app.include_router(upload_router, tags=["upload"])
+    _app.include_router(internal_embed_router, tags=["internal"])
 
     @_app.get("/health")
     async def health_check():
         return {"status": "ok"}
 
+    @_app.get("/ready")
+    async def readiness_check():
+        """Report whether the embedding model is loaded and requests can be served."""
+        if model_registry.is_loaded:
+            return {"status": "ready", "model": model_registry.model_name}
+        status = "failed" if model_registry.load_error else "loading"
+        return JSONResponse(
+            {"status": status, "model": model_registry.model_name}, status_code=503
+        )
+
     return _app
 
 
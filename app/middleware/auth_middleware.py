@@ -1,25 +1,74 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+"""Session authentication for HTTP requests and WebSockets.
+
+``AuthMiddleware`` is a plain ASGI middleware: it reads the session cookie from
+the scope headers, verifies it through the cached ``verify_user`` and stores
+the user in ``scope["state"]``, where both ``request.state.user`` and
+``websocket.state.user`` read it. Unlike ``BaseHTTPMiddleware`` it adds no
+task or body stream wrapping per request, and paths in ``auth_public_paths``
+(health, readiness, metrics, ...) skip it altogether.
+"""
+
+from typing import Iterable, Optional
+
+from starlette.requests import cookie_parser
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.settings import settings
 from app.services.auth.auth_service import verify_user
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        token = request.cookies.get("COWRITE_SESSION_ID")
+class AuthMiddleware:
+    """Attach the session's user to HTTP and WebSocket scopes."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        public_paths: Optional[Iterable[str]] = None,
+        cookie_name: Optional[str] = None,
+    ):
+        """Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI application.
+            public_paths: Paths served without authentication; entries ending
+                in ``/`` match every path below them. Defaults to
+                ``auth_public_paths``.
+            cookie_name: Session cookie name. Defaults to ``user_cookie_name``.
+        """
+        self.app = app
+        paths = settings.auth_public_paths if public_paths is None else public_paths
+        self.public_exact = frozenset(p for p in paths if not p.endswith("/"))
+        self.public_prefixes = tuple(p for p in paths if p.endswith("/"))
+        self.cookie_name = cookie_name or settings.user_cookie_name
+
+    def is_public(self, path: str) -> bool:
+        """Return whether ``path`` is served without authentication."""
+        return path in self.public_exact or path.startswith(self.public_prefixes)
 
-        if not token:
-            request.state.user = None
-            response = await call_next(request)
-            return response
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket") or self.is_public(scope["path"]):
+            await self.app(scope, receive, send)
+            return
 
-        user_data = await verify_user(token)
-        if not user_data:
-            return JSONResponse(
+        token = self._session_token(scope)
+        user = await verify_user(token) if token else None
+        if token and not user:
+            if scope["type"] == "websocket":
+                await send({"type": "websocket.close", "code": 1008})
+                return
+            response = JSONResponse(
                 {"detail": "Invalid or expired session"}, status_code=401
             )
+            await response(scope, receive, send)
+            return
 
-        request.state.user = user_data
+        scope.setdefault("state", {})["user"] = user
+        await self.app(scope, receive, send)
 
-        response = await call_next(request)
-        return response
+    def _session_token(self, scope: Scope) -> Optional[str]:
+        """Return the session cookie's value from the scope headers, if any."""
+        for name, value in scope["headers"]:
+            if name == b"cookie":
+                return cookie_parser(value.decode("latin-1")).get(self.cookie_name)
+        return None
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, String, Integer, ForeignKey, TIMESTAMP
+from sqlalchemy import Column, String, Integer, ForeignKey, Index, TIMESTAMP
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -10,6 +10,11 @@ from app.db.base import Base
 
 class ChatFile(Base):
     __tablename__ = "chat_files"
+    __table_args__ = (
+        Index(
+            "ix_chat_files_conversation_id_created_at", "conversation_id", "created_at"
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     conversation_id = Column(
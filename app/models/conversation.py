@@ -1,10 +1,13 @@
-from sqlalchemy import BigInteger, Column, Integer, String, TIMESTAMP, func
+from sqlalchemy import BigInteger, Column, Index, Integer, String, TIMESTAMP, func
 from app.db.base import Base
 from sqlalchemy.orm import relationship
 
 
 class Conversation(Base):
     __tablename__ = "conversations"
+    __table_args__ = (
+        Index("ix_conversations_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(BigInteger, nullable=False)
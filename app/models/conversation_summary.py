@@ -0,0 +1,14 @@
+from sqlalchemy import Column, ForeignKey, Integer, Text, TIMESTAMP, func
+from app.db.base import Base
+
+
+class ConversationSummary(Base):
+    __tablename__ = "conversation_summaries"
+
+    conversation_id = Column(
+        Integer, ForeignKey("conversations.id", ondelete="CASCADE"), primary_key=True
+    )
+    summary = Column(Text, nullable=False, default="")
+    # Id of the newest message folded into the summary.
+    summarized_through_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
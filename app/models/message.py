@@ -1,9 +1,10 @@
-from sqlalchemy import BigInteger, Column, Integer, String, Text, TIMESTAMP, func
+from sqlalchemy import BigInteger, Column, Index, Integer, String, Text, TIMESTAMP, func
 from app.db.base import Base
 
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (Index("ix_messages_conversation_id_id", "conversation_id", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     conversation_id = Column(Integer, nullable=False)
@@ -1,7 +1,7 @@
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import delete
+from sqlalchemy import delete, insert, update
 
 from app.models.chat_file import ChatFile
 
@@ -20,18 +20,20 @@ class ChatFileRepository:
         key: str,
         storage_path: str,
     ) -> ChatFile:
-        chat_file = ChatFile(
-            conversation_id=conversation_id,
-            user_id=user_id,
-            filename=filename,
-            file_type=file_type,
-            size=size,
-            storage_path=storage_path,
-            key=key,
+        chat_file = await self.session.scalar(
+            insert(ChatFile)
+            .values(
+                conversation_id=conversation_id,
+                user_id=user_id,
+                filename=filename,
+                file_type=file_type,
+                size=size,
+                storage_path=storage_path,
+                key=key,
+            )
+            .returning(ChatFile)
         )
-        self.session.add(chat_file)
         await self.session.commit()
-        await self.session.refresh(chat_file)
         return chat_file
 
     async def get_by_id(self, file_id: str) -> Optional[ChatFile]:
@@ -72,11 +74,13 @@ class ChatFileRepository:
         return False
 
     async def update_status(self, file_id: str, status: str) -> Optional[ChatFile]:
-        chat_file = await self.get_by_id(file_id)
+        chat_file = await self.session.scalar(
+            update(ChatFile)
+            .where(ChatFile.id == file_id)
+            .values(status=status)
+            .returning(ChatFile)
+            .execution_options(populate_existing=True)
+        )
         if chat_file:
-            chat_file.status = status
-            self.session.add(chat_file)
             await self.session.commit()
-            await self.session.refresh(chat_file)
-            return chat_file
-        return None
+        return chat_file
@@ -1,3 +1,6 @@
+from datetime import datetime
+from typing import Optional, Tuple
+from sqlalchemy import insert, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.models.conversation import Conversation
@@ -8,10 +11,12 @@ class ConversationRepository:
         self.db = db
 
     async def create_conversation(self, user_id: str, title: str = None):
-        conversation = Conversation(user_id=user_id, title=title)
-        self.db.add(conversation)
+        conversation = await self.db.scalar(
+            insert(Conversation)
+            .values(user_id=user_id, title=title)
+            .returning(Conversation)
+        )
         await self.db.commit()
-        await self.db.refresh(conversation)
         return conversation
 
     async def get_conversation(self, conversation_id: int):
@@ -25,3 +30,29 @@ class ConversationRepository:
             select(Conversation).where(Conversation.user_id == user_id)
         )
         return result.scalars().all()
+
+    async def list_by_user(
+        self,
+        user_id: int,
+        limit: int,
+        before: Optional[Tuple[datetime, int]] = None,
+    ):
+        """Return up to ``limit`` conversations, newest first.
+
+        Args:
+            user_id: Owner of the conversations.
+            limit: Page size.
+            before: ``(created_at, id)`` of the last row of the previous page.
+        """
+        stmt = (
+            select(Conversation)
+            .where(Conversation.user_id == user_id)
+            .order_by(Conversation.created_at.desc(), Conversation.id.desc())
+            .limit(limit)
+        )
+        if before is not None:
+            stmt = stmt.where(
+                tuple_(Conversation.created_at, Conversation.id) < tuple_(*before)
+            )
+        result = await self.db.execute(stmt)
+        return result.scalars().all()
@@ -0,0 +1,32 @@
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.conversation_summary import ConversationSummary
+
+
+class ConversationSummaryRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, conversation_id: int) -> Optional[ConversationSummary]:
+        return await self.db.get(ConversationSummary, conversation_id)
+
+    async def save(
+        self, conversation_id: int, summary: str, summarized_through_id: int
+    ):
+        """Insert or replace the summary of a conversation in one statement."""
+        insert = (
+            sqlite_insert if self.db.get_bind().dialect.name == "sqlite" else pg_insert
+        )
+        values = {"summary": summary, "summarized_through_id": summarized_through_id}
+        await self.db.execute(
+            insert(ConversationSummary)
+            .values(conversation_id=conversation_id, **values)
+            .on_conflict_do_update(
+                index_elements=["conversation_id"],
+                set_={**values, "updated_at": func.now()},
+            )
+        )
+        await self.db.commit()
@@ -1,3 +1,5 @@
+from typing import Optional
+from sqlalchemy import insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.models.message import Message
@@ -8,27 +10,31 @@ class MessageRepository:
         self.db = db
 
     async def create_message(self, conversation_id: int, user_id: str, prompt: str):
-        message = Message(
-            conversation_id=conversation_id,
-            user_id=user_id,
-            prompt=prompt,
-            status="pending",
+        message = await self.db.scalar(
+            insert(Message)
+            .values(
+                conversation_id=conversation_id,
+                user_id=user_id,
+                prompt=prompt,
+                status="pending",
+            )
+            .returning(Message)
         )
-        self.db.add(message)
         await self.db.commit()
-        await self.db.refresh(message)
         return message
 
     async def update_message_response(
         self, message_id: int, response: str, status: str = "completed"
     ):
-        result = await self.db.execute(select(Message).where(Message.id == message_id))
-        message = result.scalars().first()
+        message = await self.db.scalar(
+            update(Message)
+            .where(Message.id == message_id)
+            .values(response=response, status=status)
+            .returning(Message)
+            .execution_options(populate_existing=True)
+        )
         if message:
-            message.response = response
-            message.status = status
             await self.db.commit()
-            await self.db.refresh(message)
         return message
 
     async def get_messages_by_conversation(self, conversation_id: int):
@@ -36,3 +42,68 @@ class MessageRepository:
             select(Message).where(Message.conversation_id == conversation_id)
         )
         return result.scalars().all()
+
+    async def list_by_conversation(
+        self, conversation_id: int, limit: int, after_id: Optional[int] = None
+    ):
+        """Return up to ``limit`` messages of a conversation, oldest first.
+
+        Message ids increase with insertion, so they order the history and are
+        the whole keyset.
+
+        Args:
+            conversation_id: Conversation to read.
+            limit: Page size.
+            after_id: Id of the last message of the previous page.
+        """
+        stmt = (
+            select(Message)
+            .where(Message.conversation_id == conversation_id)
+            .order_by(Message.id)
+            .limit(limit)
+        )
+        if after_id is not None:
+            stmt = stmt.where(Message.id > after_id)
+        result = await self.db.execute(stmt)
+        return result.scalars().all()
+
+    async def list_recent_turns(
+        self, conversation_id: int, limit: int, before_id: Optional[int] = None
+    ):
+        """Return the last ``limit`` answered messages, oldest first.
+
+        Args:
+            conversation_id: Conversation to read.
+            limit: Number of turns.
+            before_id: Only messages older than this one.
+        """
+        stmt = (
+            select(Message)
+            .where(
+                Message.conversation_id == conversation_id,
+                Message.status == "completed",
+            )
+            .order_by(Message.id.desc())
+            .limit(limit)
+        )
+        if before_id is not None:
+            stmt = stmt.where(Message.id < before_id)
+        result = await self.db.execute(stmt)
+        return list(reversed(result.scalars().all()))
+
+    async def list_turns_between(
+        self, conversation_id: int, after_id: int, before_id: int, limit: int
+    ):
+        """Return up to ``limit`` answered messages with ids in ``(after_id, before_id)``."""
+        result = await self.db.execute(
+            select(Message)
+            .where(
+                Message.conversation_id == conversation_id,
+                Message.status == "completed",
+                Message.id > after_id,
+                Message.id < before_id,
+            )
+            .order_by(Message.id)
+            .limit(limit)
+        )
+        return result.scalars().all()
@@ -0,0 +1,25 @@
+"""Request and response bodies of the internal embedding endpoint."""
+
+from typing import List, Literal
+
+from pydantic import BaseModel, Field
+
+
+class EmbedRequest(BaseModel):
+    """Batch of texts to embed.
+
+    ``mode`` states whether the texts are search queries or stored passages.
+    ``encoding`` selects base64 strings in JSON or one raw float32 body.
+    """
+
+    texts: List[str] = Field(min_length=1)
+    mode: Literal["query", "passage"] = "passage"
+    encoding: Literal["base64", "binary"] = "base64"
+
+
+class EmbedResponse(BaseModel):
+    """Embeddings as base64 strings of little-endian float32 vectors."""
+
+    model: str
+    dimensions: int
+    embeddings: List[str]
@@ -0,0 +1,14 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional
+from datetime import datetime
+
+
+class MessageDTO(BaseModel):
+    id: int
+    conversation_id: int
+    user_id: int
+    prompt: str
+    response: Optional[str]
+    status: Optional[str]
+    created_at: Optional[datetime]
+    model_config = ConfigDict(from_attributes=True)
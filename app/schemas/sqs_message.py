@@ -1,7 +1,8 @@
 """Schema for SQS message parsing."""
 
+import uuid
 from typing import Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 EventType = Literal["create", "update", "delete"]
@@ -21,3 +22,23 @@ class SqsMessageDto(BaseModel):
     file_id: int = Field(..., alias="fileId")
     s3_key: str = Field(..., alias="s3Key")
     event_type: EventType = Field(..., alias="eventType")
+
+
+class ChatFileMessageDto(BaseModel):
+    """Data transfer object for chat file ingestion messages.
+
+    Sent by the API when ingestion runs in a separate worker process.
+
+    Attributes:
+        file_id: Unique identifier of the chat file.
+        user_id: Identifier of the user who uploaded the file.
+        s3_key: S3 object key for file location.
+        file_name: Original file name, used to pick the text extractor.
+    """
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    file_id: uuid.UUID = Field(..., alias="fileId")
+    user_id: int = Field(..., alias="userId")
+    s3_key: str = Field(..., alias="s3Key")
+    file_name: str = Field(..., alias="fileName")
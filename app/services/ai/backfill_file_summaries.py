@@ -0,0 +1,67 @@
+"""
+Write summary vectors for workspace files indexed before hierarchical retrieval.
+
+Run before turning on ``WORKSPACE_HIERARCHICAL_RETRIEVAL``:
+
+    python -m app.services.ai.backfill_file_summaries --collection document
+
+Files without a summary are found from chunk metadata alone, and each summary is
+computed from the chunk vectors already stored, so no text is read or
+re-encoded. Files that have a summary are skipped, so the script can be re-run
+until it reports nothing left; ``--dry-run`` only lists what it would do.
+"""
+
+import argparse
+import asyncio
+
+from app.services.ai.chroma_client import ChromaClient
+from app.services.ai.file_summaries import files_without_summary, refresh_file_summary
+
+
+async def main(argv: list[str] | None = None) -> int:
+    """Summarise the workspace files that lack a summary and return their count."""
+    parser = argparse.ArgumentParser(description="Backfill workspace file summaries.")
+    parser.add_argument("--collection", default="document")
+    parser.add_argument(
+        "--workspace-id",
+        type=int,
+        default=None,
+        help="Only this workspace; defaults to every workspace",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=1_000_000,
+        help="Maximum number of chunk metadatas read",
+    )
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    client = ChromaClient(args.collection)
+    missing = await files_without_summary(
+        client.store, client.summaries, args.workspace_id, limit=args.limit
+    )
+
+    summarised = 0
+    for workspace_id, file_ids in missing.items():
+        print(
+            f"[SummaryBackfill] Workspace {workspace_id}: "
+            f"{len(file_ids)} files without a summary"
+        )
+        if args.dry_run:
+            continue
+        for file_id in file_ids:
+            if await refresh_file_summary(
+                client.store, client.summaries, workspace_id, file_id
+            ):
+                summarised += 1
+
+    print(
+        f"[SummaryBackfill] Summarised {summarised} files "
+        f"in {len(missing)} workspaces of '{args.collection}'"
+    )
+    return summarised
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
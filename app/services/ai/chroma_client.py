@@ -1,122 +1,569 @@
-"""Async-safe client to interact with ChromaDB for storing and querying text embeddings."""
+"""Async-safe client to interact with ChromaDB for storing and querying text embeddings.
+
+``chromadb`` is imported on first use rather than at module import, so processes
+using the local backend (and tests, CLIs, migrations) never pay for it.
+"""
 
 import asyncio
-from chromadb import HttpClient
-from sentence_transformers import SentenceTransformer
+import os
+import random
+import zlib
+from functools import partial
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence
+
+import httpx
+import numpy as np
 from app.core.settings import settings
+from app.services.ai.local_vector_store import LocalVectorStore
+from app.services.ai.model_registry import model_registry
+from app.services.ai.vector_compression import PcaProjection
+from app.services.ai.vector_store import (
+    VectorStore,
+    as_embedding_matrix,
+    build_where,
+    merge_query_results,
+    tenant_key,
+)
+
+SHARD_MODES = ("single", "tenant", "hashed")
+RETRYABLE_ERRORS = (asyncio.TimeoutError, httpx.TransportError)
+
+if TYPE_CHECKING:
+    from chromadb.api import AsyncClientAPI, ClientAPI
+    from sentence_transformers import SentenceTransformer
+
+
+class _ExecutorProxy:
+    """Expose a synchronous Chroma client or collection through awaitable methods.
+
+    Only used for in-process clients (``EphemeralClient``/``PersistentClient``) in
+    tests and benchmarks; the HTTP transport is natively async.
+    """
+
+    def __init__(self, target: Any):
+        self._target = target
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            result = await asyncio.get_running_loop().run_in_executor(
+                None, partial(attr, *args, **kwargs)
+            )
+            # pylint: disable-next=import-outside-toplevel
+            from chromadb import Collection
+
+            return _ExecutorProxy(result) if isinstance(result, Collection) else result
+
+        return call
+
+
+def _wrap_client(client: Any) -> Any:
+    """Wrap synchronous in-process Chroma clients; async clients pass through."""
+    if client is None:
+        return None
+    # pylint: disable-next=import-outside-toplevel
+    from chromadb.api import ClientAPI
+
+    return _ExecutorProxy(client) if isinstance(client, ClientAPI) else client
+
+
+class ChromaVectorStore(VectorStore):  # pylint: disable=too-many-instance-attributes
+    """Vector store backed by Chroma collections, optionally sharded by tenant.
+
+    Talks to the server through ``chromadb.AsyncHttpClient``: one pooled httpx
+    connection pool with keep-alive, no executor threads. The client connects
+    lazily on first use and collection handles are resolved once and cached.
+    Every call is bounded by ``chroma_request_timeout_secs`` and transport
+    failures are retried with jittered exponential backoff.
+
+    Shard modes (``settings.chroma_shard_mode``):
+        ``single``: everything lives in ``collection_name`` (the legacy layout).
+        ``tenant``: one collection per workspace and per chat-file owner.
+        ``hashed``: tenants are spread over ``chroma_shard_count`` collections.
+
+    In the sharded modes the base collection is still read (and deleted from)
+    while ``chroma_shard_legacy_fallback`` is on, so data written before the
+    switch stays visible until ``migrate_legacy_collection`` has moved it.
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        client: "ClientAPI | AsyncClientAPI | None" = None,
+        shard_mode: str | None = None,
+        shard_count: int | None = None,
+        legacy_fallback: bool | None = None,
+    ):
+        """Configure the store; no network I/O happens until the first call.
+
+        Args:
+            collection_name: Base collection name; shard names are derived from it.
+            client: Pre-built Chroma client. Synchronous in-process clients (e.g.
+                ``EphemeralClient``) are wrapped to run in the default executor;
+                defaults to an ``AsyncHttpClient`` for the configured server.
+            shard_mode: Overrides ``settings.chroma_shard_mode``.
+            shard_count: Overrides ``settings.chroma_shard_count``.
+            legacy_fallback: Overrides ``settings.chroma_shard_legacy_fallback``.
+        """
+        self.collection_name = collection_name
+        self.client = _wrap_client(client)
+        self.shard_mode = shard_mode or settings.chroma_shard_mode
+        self.shard_count = shard_count or settings.chroma_shard_count
+        self.legacy_fallback = (
+            settings.chroma_shard_legacy_fallback
+            if legacy_fallback is None
+            else legacy_fallback
+        )
+        if self.shard_mode not in SHARD_MODES:
+            raise ValueError(f"Unknown shard mode: {self.shard_mode}")
+
+        self._collections: Dict[str, Any] = {}
+        self._lock = asyncio.Lock()
+        self._batch_size: int | None = None
+
+    # ---- transport -------------------------------------------------------------
+
+    async def _call(self, func, *args, **kwargs):
+        """Await a Chroma call with a timeout, retrying transport failures."""
+        attempts = settings.chroma_max_retries + 1
+        for attempt in range(attempts):
+            try:
+                return await asyncio.wait_for(
+                    func(*args, **kwargs), settings.chroma_request_timeout_secs
+                )
+            except RETRYABLE_ERRORS as e:
+                if attempt == attempts - 1:
+                    raise
+                delay = settings.chroma_retry_backoff_secs * 2**attempt
+                delay *= random.uniform(0.5, 1.5)
+                print(
+                    f"[ChromaVectorStore] {type(e).__name__} on attempt "
+                    f"{attempt + 1}/{attempts}, retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+        return None
+
+    async def _get_client(self) -> "AsyncClientAPI":
+        """Connect the pooled async HTTP client on first use."""
+        if self.client is None:
+            # pylint: disable-next=import-outside-toplevel
+            from chromadb import AsyncHttpClient, Settings
+
+            async with self._lock:
+                if self.client is None:
+                    self.client = await self._call(
+                        AsyncHttpClient,
+                        host=settings.chroma_host,
+                        port=settings.chroma_port,
+                        settings=Settings(
+                            chroma_http_keepalive_secs=settings.chroma_http_keepalive_secs,
+                            chroma_http_max_connections=settings.chroma_http_max_connections,
+                            chroma_http_max_keepalive_connections=(
+                                settings.chroma_http_max_keepalive_connections
+                            ),
+                        ),
+                    )
+        return self.client
+
+    async def _collection(self, name: str, create: bool = False):
+        """Return a cached collection handle, or None if it does not exist."""
+        collection = self._collections.get(name)
+        if collection is not None:
+            return collection
+
+        client = await self._get_client()
+        async with self._lock:
+            collection = self._collections.get(name)
+            if collection is not None:
+                return collection
+            if create:
+                collection = await self._call(client.get_or_create_collection, name)
+            else:
+                # pylint: disable-next=import-outside-toplevel
+                from chromadb.errors import NotFoundError
+
+                try:
+                    collection = await self._call(client.get_collection, name)
+                except NotFoundError:
+                    return None
+            self._collections[name] = collection
+            return collection
+
+    async def _max_batch_size(self) -> int:
+        """Return (and cache) the largest write the server accepts in one call."""
+        if self._batch_size is None:
+            client = await self._get_client()
+            self._batch_size = await self._call(client.get_max_batch_size)
+        return self._batch_size
+
+    # ---- routing -------------------------------------------------------------
+
+    def shard_name(self, values: Dict[str, Any] | None) -> str | None:
+        """Return the collection that owns a document or filter set.
+
+        Args:
+            values: Document metadata or query filters.
+
+        Returns:
+            str | None: Collection name, or None when the values do not pin one
+            tenant and every shard has to be consulted.
+        """
+        if self.shard_mode == "single":
+            return self.collection_name
+        key = tenant_key(values)
+        if key is None:
+            return None
+        if self.shard_mode == "hashed":
+            shard = zlib.crc32(key.encode("utf-8")) % self.shard_count
+            return f"{self.collection_name}-shard-{shard:04d}"
+        return f"{self.collection_name}-{key}"
+
+    async def _read_collections(self, filters: Dict[str, Any] | None) -> List[Any]:
+        """Return the existing collections that can hold matches for the filters."""
+        name = self.shard_name(filters)
+        if name is not None:
+            names = [name]
+        else:
+            prefix = f"{self.collection_name}-"
+            names = [
+                name
+                for name in await self.list_collections()
+                if name.startswith(prefix)
+            ]
+        if self.shard_mode != "single" and self.legacy_fallback:
+            names.append(self.collection_name)
+
+        collections = [await self._collection(n) for n in dict.fromkeys(names)]
+        return [c for c in collections if c is not None]
+
+    # ---- VectorStore interface -------------------------------------------------
+
+    async def add(
+        self,
+        ids: List[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+        """Write documents to the collection of each document's shard.
+
+        Uses ``upsert`` so a retried request cannot fail on ids it already wrote,
+        split into batches no larger than the server's maximum batch size.
+        Vectors are passed to Chroma as float32 arrays, which it sends as packed
+        binary (base64) when the server supports it instead of JSON float lists.
+        """
+        vectors = as_embedding_matrix(embeddings)
+        groups: Dict[str, List[int]] = {}
+        for i, metadata in enumerate(metadatas):
+            name = self.shard_name(metadata) or self.collection_name
+            groups.setdefault(name, []).append(i)
+
+        batch_size = await self._max_batch_size()
+        for name, rows in groups.items():
+            collection = await self._collection(name, create=True)
+            # A single group keeps row order, so batches are zero-copy slices.
+            group_vectors = vectors if len(rows) == len(ids) else vectors[rows]
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start : start + batch_size]
+                await self._call(
+                    collection.upsert,
+                    ids=[ids[i] for i in batch],
+                    embeddings=group_vectors[start : start + batch_size],
+                    documents=[documents[i] for i in batch],
+                    metadatas=[metadatas[i] for i in batch],
+                )
+
+    async def query(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        n_results: int = 3,
+        filters: Dict[str, Any] | None = None,
+    ) -> dict:
+        """Query the shard(s) matching the filters with server-side filtering."""
+        where = build_where(filters)
+        collections = await self._read_collections(filters)
+        results = await asyncio.gather(
+            *(
+                self._call(
+                    collection.query,
+                    query_embeddings=query_embeddings,
+                    n_results=n_results,
+                    where=where,
+                )
+                for collection in collections
+            )
+        )
+        if len(results) == 1:
+            return results[0]
+        return merge_query_results(list(results), n_results, len(query_embeddings))
+
+    async def get(
+        self,
+        filters: Dict[str, Any] | None = None,
+        limit: int = 1000,
+        include_embeddings: bool = False,
+        include_documents: bool = True,
+    ) -> dict:
+        """Get documents by metadata filters."""
+        where = build_where(filters)
+        include = ["documents", "metadatas"] if include_documents else ["metadatas"]
+        if include_embeddings:
+            include.append("embeddings")
+        merged = {key: [] for key in ["ids", *include]}
+        for collection in await self._read_collections(filters):
+            result = await self._call(
+                collection.get,
+                where=where,
+                limit=limit - len(merged["ids"]),
+                include=include,
+            )
+            for key, values in merged.items():
+                found = result.get(key)
+                if found is not None:
+                    values.extend(found)
+            if len(merged["ids"]) >= limit:
+                break
+        if include_embeddings:
+            merged["embeddings"] = (
+                as_embedding_matrix(merged["embeddings"])
+                if merged["ids"]
+                else np.empty((0, 0), dtype=np.float32)
+            )
+        return merged
+
+    async def delete(
+        self, ids: List[str], filters: Dict[str, Any] | None = None
+    ) -> None:
+        """Delete documents by id from the shard(s) matching the filters."""
+        for collection in await self._read_collections(filters):
+            await self._call(collection.delete, ids=ids)
+
+    async def list_collections(self) -> List[str]:
+        """List all collections on the server."""
+        client = await self._get_client()
+        return [c.name for c in await self._call(client.list_collections)]
+
+    async def migrate_legacy_collection(self, batch_size: int = 500) -> int:
+        """Move every document from the base collection into its shard.
+
+        Documents are copied before they are deleted from the base collection,
+        so the migration can be interrupted and resumed safely.
+
+        Args:
+            batch_size: Number of documents moved per round trip.
+
+        Returns:
+            int: Number of documents moved.
+        """
+        if self.shard_mode == "single":
+            raise ValueError("Sharding is disabled; nothing to migrate.")
+
+        legacy = await self._collection(self.collection_name, create=True)
+        moved = 0
+        while True:
+            batch = await self._call(
+                legacy.get,
+                limit=batch_size,
+                include=["embeddings", "documents", "metadatas"],
+            )
+            ids = batch["ids"]
+            if not ids:
+                return moved
+
+            for metadata, doc_id in zip(batch["metadatas"], ids):
+                if self.shard_name(metadata) is None:
+                    raise ValueError(
+                        f"Document {doc_id} has no workspace_id or user_id to route by."
+                    )
+            await self.add(
+                ids, batch["embeddings"], batch["documents"], batch["metadatas"]
+            )
+            await self._call(legacy.delete, ids=ids)
+            moved += len(ids)
+
+
+def create_vector_store(
+    collection_name: str, client: "ClientAPI | AsyncClientAPI | None" = None
+) -> VectorStore:
+    """Build the vector store selected by ``settings.vector_store_backend``.
+
+    Args:
+        collection_name: Collection (or, for the local backend, directory) name.
+        client: Optional pre-built Chroma client for the Chroma backend.
+
+    Returns:
+        VectorStore: ``LocalVectorStore`` for ``"local"``, otherwise ``ChromaVectorStore``.
+
+    Raises:
+        ValueError: If ``vector_quantization`` is set for the Chroma backend, which
+            only stores float32 vectors.
+    """
+    if settings.vector_store_backend == "local":
+        return LocalVectorStore(
+            os.path.join(settings.vector_store_path, collection_name),
+            quantization=settings.vector_quantization,
+        )
+    if settings.vector_quantization != "float32":
+        raise ValueError(
+            "VECTOR_QUANTIZATION requires VECTOR_STORE_BACKEND=local; "
+            "use VECTOR_PCA_PATH to shrink vectors stored in Chroma."
+        )
+    return ChromaVectorStore(collection_name, client=client)
 
 
 class ChromaClient:
-    """Async-safe client for interacting with ChromaDB."""
+    """Async-safe client for storing and querying text embeddings.
+
+    Encodes query text with the embedding model and delegates storage to a
+    ``VectorStore`` backend (a Chroma server or the embedded local store). When a
+    PCA projection is configured it is applied to stored and query vectors alike.
+    Per-file summary vectors live in a sibling store, ``summaries``.
+    """
 
     def __init__(
         self,
         collection_name: str = "document",
-        model: SentenceTransformer = SentenceTransformer(
-            "intfloat/multilingual-e5-base"
-        ),
+        model: "SentenceTransformer | None" = None,
+        client: "ClientAPI | AsyncClientAPI | None" = None,
+        store: VectorStore | None = None,
+        projection: PcaProjection | None = None,
+        summaries: VectorStore | None = None,
     ):
-        self.host = settings.chroma_host
-        self.port = settings.chroma_port
-        self.collection_name = collection_name
+        """Initialize the client and resolve the vector store backend.
 
+        Args:
+            collection_name: Name of the collection to use.
+            model: Embedding model used to encode query text; defaults to the
+                shared model of ``model_registry``, loaded on first use.
+            client: Pre-built Chroma client (e.g. an in-process ``EphemeralClient``);
+                defaults to a pooled ``AsyncHttpClient`` for the configured server.
+            store: Explicit backend; overrides ``settings.vector_store_backend``.
+            projection: Dimensionality reduction for every vector; defaults to the
+                projection at ``settings.vector_pca_path``, if any.
+            summaries: Store for per-file summary vectors; defaults to the
+                ``<collection_name>_files`` collection of the same backend.
+        """
+        self.collection_name = collection_name
         self.model = model
-        self.client = HttpClient(host=self.host, port=self.port)
-        self.collection = self._get_or_create_collection()
+        self.store = store or create_vector_store(collection_name, client=client)
+        self.summaries = summaries or create_vector_store(
+            f"{collection_name}_files", client=client
+        )
+        if projection is None and settings.vector_pca_path:
+            projection = PcaProjection.load(settings.vector_pca_path)
+        self.projection = projection
 
-    def _get_or_create_collection(self):
-        existing = [c.name for c in self.client.list_collections()]
-        if self.collection_name in existing:
-            return self.client.get_collection(self.collection_name)
-        return self.client.create_collection(name=self.collection_name)
+    def _project(self, embeddings) -> np.ndarray:
+        """Return embeddings as float32, reduced by the projection if configured."""
+        vectors = as_embedding_matrix(embeddings)
+        return self.projection.transform(vectors) if self.projection else vectors
 
     async def add(self, items: dict):
         """Add documents asynchronously."""
         if not items:
             raise ValueError("Item cannot be empty.")
 
-        loop = asyncio.get_running_loop()
-        await loop.run_in_executor(
-            None,
-            lambda: self.collection.add(
-                ids=items["id"],
-                embeddings=items["embeddings"],
-                documents=items["texts"],
-                metadatas=items["metadata"],
-            ),
+        await self.store.add(
+            ids=items["id"],
+            embeddings=self._project(items["embeddings"]),
+            documents=items["texts"],
+            metadatas=items["metadata"],
         )
 
     async def query(
         self, query_text: str, n_results: int = 3, filters: dict | None = None
     ):
         """Query the collection asynchronously with optional metadata filters."""
-        if query_text and query_text.strip():
-            query_vec = await asyncio.get_running_loop().run_in_executor(
-                None, lambda: self.model.encode([query_text]).tolist()
-            )
-        else:
-            query_vec = None
+        query_vec = await self.encode_query(query_text)
+        return await self.store.query(
+            query_embeddings=query_vec, n_results=n_results, filters=filters
+        )
 
-        where = None
-        if filters:
-            if len(filters) == 1:
-                key, value = next(iter(filters.items()))
-                where = {key: {"$eq": value}}
-            else:
-                where = {"$and": [{k: {"$eq": v}} for k, v in filters.items()]}
-        else:
-            where = None
-
-        loop = asyncio.get_running_loop()
-        results = await loop.run_in_executor(
-            None,
-            lambda: self.collection.query(
-                query_embeddings=query_vec,
-                n_results=n_results,
-                where=where,
-            ),
+    async def encode_query(self, query_text: str) -> np.ndarray:
+        """Encode query text into the stored vector space.
+
+        Args:
+            query_text: Text to encode.
+
+        Returns:
+            np.ndarray: float32 matrix with one row, projected like stored vectors.
+        """
+        if not query_text or not query_text.strip():
+            raise ValueError("Query text cannot be empty.")
+
+        return await self.encode_texts([query_text])
+
+    async def encode_texts(self, texts: list[str]) -> np.ndarray:
+        """Encode a batch of texts into the stored vector space in one model call.
+
+        Args:
+            texts: Texts to encode.
+
+        Returns:
+            np.ndarray: float32 matrix with one row per text, projected like
+            stored vectors.
+        """
+        model = self.model if self.model is not None else await model_registry.get()
+        return await asyncio.get_running_loop().run_in_executor(
+            None, lambda: self._project(model.encode(texts, batch_size=32))
         )
-        return results
 
-    async def get(self, filters: dict | None = None, limit: int = 1000):
+    async def get(
+        self,
+        filters: dict | None = None,
+        limit: int = 1000,
+        include_embeddings: bool = False,
+        include_documents: bool = True,
+    ):
         """Get documents by filters without semantic search.
 
         Args:
             filters: Metadata filters to apply.
             limit: Maximum number of results to return.
+            include_embeddings: Also return the stored (projected) vectors.
+            include_documents: Also return the document text.
 
         Returns:
             dict: Documents matching the filters.
         """
-        where = None
-        if filters:
-            if len(filters) == 1:
-                key, value = next(iter(filters.items()))
-                where = {key: {"$eq": value}}
-            else:
-                where = {"$and": [{k: {"$eq": v}} for k, v in filters.items()]}
-
-        loop = asyncio.get_running_loop()
-        results = await loop.run_in_executor(
-            None,
-            lambda: self.collection.get(
-                where=where,
-                limit=limit,
-            ),
+        return await self.store.get(
+            filters=filters,
+            limit=limit,
+            include_embeddings=include_embeddings,
+            include_documents=include_documents,
         )
-        return results
 
-    async def delete(self, ids: list[str]):
-        """Delete documents asynchronously."""
+    async def delete(self, ids: list[str], filters: dict | None = None):
+        """Delete documents asynchronously.
+
+        Args:
+            ids: Identifiers of the documents to delete.
+            filters: Metadata shared by the documents, used to route the delete.
+        """
         if not ids:
             raise ValueError("IDs list cannot be empty.")
 
-        loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, lambda: self.collection.delete(ids=ids))
+        await self.store.delete(ids, filters=filters)
 
     async def list_collections(self) -> list[str]:
         """List all available collections asynchronously."""
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(
-            None, lambda: [c.name for c in self.client.list_collections()]
-        )
+        return await self.store.list_collections()
+
+    async def warm_up(self) -> bool:
+        """Open the backend connection ahead of the first request.
+
+        Failures are logged rather than raised: the store connects again on
+        first use, so an unavailable server does not block startup.
+
+        Returns:
+            bool: Whether the backend answered.
+        """
+        try:
+            await self.store.list_collections()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            print(f"[ChromaClient] Warm-up failed, connecting on first use: {e}")
+            return False
+        return True
@@ -0,0 +1,176 @@
+"""Assemble retrieved chunks into prompt context without overlap duplication.
+
+``EmbeddingService.chunk_text`` splits files with a 200-character overlap, so
+neighbouring hits of the same file (``chunk_index`` i and i+1) share text. Hits
+are grouped per file, ordered by ``chunk_index`` and consecutive chunks are
+merged into one span with the shared text kept once. Optionally every hit is
+widened to its neighbouring chunks, read from a ``ChunkStore``.
+"""
+
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    from app.services.ai.chroma_client import ChromaClient
+
+# Overlaps shorter than this are treated as coincidental rather than shared text.
+MIN_OVERLAP = 20
+# Upper bound for the overlap search; chunk_text overlaps by 200 characters.
+MAX_OVERLAP = 250
+
+SPAN_SEPARATOR = "\n---\n"
+
+
+def merge_overlap(
+    left: str,
+    right: str,
+    max_overlap: int = MAX_OVERLAP,
+    min_overlap: int = MIN_OVERLAP,
+) -> str:
+    """Concatenate two consecutive chunks, keeping their shared text once.
+
+    Args:
+        left: Chunk ``i``.
+        right: Chunk ``i + 1``.
+        max_overlap: Longest overlap to look for.
+        min_overlap: Shortest overlap accepted as shared text.
+
+    Returns:
+        str: The merged text; chunks without an overlap are joined by a newline.
+    """
+    for size in range(min(len(left), len(right), max_overlap), min_overlap - 1, -1):
+        if left.endswith(right[:size]):
+            return left + right[size:]
+    return f"{left}\n{right}"
+
+
+def stitch_chunks(hits: List[Tuple[int | None, str]]) -> List[str]:
+    """Merge the chunks of one file into contiguous, de-duplicated spans.
+
+    Args:
+        hits: ``(chunk_index, text)`` pairs in any order; duplicates are dropped.
+            Chunks without an index are kept as separate spans.
+
+    Returns:
+        List[str]: Spans in document order.
+    """
+    indexed = {index: text for index, text in hits if index is not None}
+    spans: List[str] = []
+    previous = None
+    for index in sorted(indexed):
+        if previous is not None and index == previous + 1:
+            spans[-1] = merge_overlap(spans[-1], indexed[index])
+        else:
+            spans.append(indexed[index])
+        previous = index
+    spans.extend(text for index, text in hits if index is None)
+    return spans
+
+
+class ChunkStore:
+    """LRU cache of every chunk of recently used files, for neighbour widening.
+
+    Entries expire after ``ttl_secs`` so chunks re-ingested by another process
+    are picked up; ``invalidate`` drops a file immediately.
+    """
+
+    def __init__(
+        self, chroma_client: "ChromaClient", max_files: int = 256, ttl_secs: float = 300
+    ):
+        """Initialize the store.
+
+        Args:
+            chroma_client: Client used to read a file's chunks.
+            max_files: Number of files kept in memory.
+            ttl_secs: Lifetime of a cached file.
+        """
+        self.chroma_client = chroma_client
+        self.max_files = max_files
+        self.ttl_secs = ttl_secs
+        self._files: OrderedDict[tuple, Tuple[float, Dict[int, str]]] = OrderedDict()
+
+    @staticmethod
+    def _key(filters: Dict[str, Any]) -> tuple:
+        return tuple(sorted((k, str(v)) for k, v in filters.items()))
+
+    async def get_file_chunks(self, filters: Dict[str, Any]) -> Dict[int, str]:
+        """Return ``{chunk_index: text}`` for the file matching the filters.
+
+        Args:
+            filters: Tenant and ``file_id`` filters identifying one file.
+        """
+        key = self._key(filters)
+        cached = self._files.get(key)
+        if cached and time.monotonic() - cached[0] < self.ttl_secs:
+            self._files.move_to_end(key)
+            return cached[1]
+
+        result = await self.chroma_client.get(filters=filters, limit=10000)
+        chunks = {
+            meta["chunk_index"]: doc
+            for doc, meta in zip(
+                result.get("documents") or [], result.get("metadatas") or []
+            )
+            if meta and meta.get("chunk_index") is not None
+        }
+        self._files[key] = (time.monotonic(), chunks)
+        self._files.move_to_end(key)
+        while len(self._files) > self.max_files:
+            self._files.popitem(last=False)
+        return chunks
+
+    def invalidate(self, filters: Dict[str, Any]) -> None:
+        """Forget a cached file after its chunks changed."""
+        self._files.pop(self._key(filters), None)
+
+
+async def assemble_file_sections(
+    documents: List[str],
+    metadatas: List[Dict[str, Any]],
+    scope: Dict[str, Any],
+    chunk_store: ChunkStore | None = None,
+    neighbour_window: int = 0,
+) -> List[Tuple[str, List[str]]]:
+    """Group search hits per file and stitch them into spans.
+
+    Args:
+        documents: Retrieved chunk texts, best match first.
+        metadatas: Metadata of each chunk (``file_id``, ``file_name``, ``chunk_index``).
+        scope: Tenant filters (``workspace_id`` or ``user_id``) used to read
+            neighbours from the chunk store.
+        chunk_store: Source of neighbouring chunks; widening is off without it.
+        neighbour_window: Number of chunks to add on each side of every hit.
+
+    Returns:
+        List[Tuple[str, List[str]]]: ``(file_name, spans)`` per file, ordered by
+        each file's best hit.
+    """
+    files: Dict[str, Dict[str, Any]] = {}
+    for doc, meta in zip(documents, metadatas):
+        meta = meta or {}
+        file_key = str(meta.get("file_id", meta.get("file_name", "Unknown")))
+        entry = files.setdefault(
+            file_key, {"name": meta.get("file_name", "Unknown"), "hits": []}
+        )
+        entry["hits"].append((meta.get("chunk_index"), doc))
+
+    sections = []
+    for file_id, entry in files.items():
+        hits = entry["hits"]
+        if chunk_store is not None and neighbour_window > 0:
+            chunks = await chunk_store.get_file_chunks({**scope, "file_id": file_id})
+            wanted = {
+                index + offset
+                for index, _ in hits
+                if index is not None
+                for offset in range(-neighbour_window, neighbour_window + 1)
+            }
+            hits = hits + [(i, chunks[i]) for i in sorted(wanted) if i in chunks]
+        sections.append((entry["name"], stitch_chunks(hits)))
+    return sections
+
+
+def format_file_section(file_name: str, spans: List[str]) -> str:
+    """Render one file's spans the way the prompt expects them."""
+    return f"📄 File: {file_name}\n" + SPAN_SEPARATOR.join(spans)
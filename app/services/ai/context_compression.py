@@ -0,0 +1,274 @@
+"""Extractive, chunk- then sentence-level compression of retrieved context.
+
+Retrieved chunks are up to 1000 characters long while often only one or two of
+their sentences answer the question. Compression runs in two passes so the
+encoder stays off the reply path whenever possible:
+
+1. Spans are ranked by the retrieval relevance of the chunks they contain,
+   which the vector store computed from the stored embeddings. The best spans
+   are kept whole while they fit the character budget, without encoding.
+2. Only the remaining spans are split into sentences. At most
+   ``max_sentences`` of them are encoded and scored by cosine similarity to the
+   query vector, and the best ones, widened by a few neighbouring sentences,
+   fill what is left of the budget.
+
+Kept sentences are cut from the original text, so their formatting is
+preserved; gaps between them are marked with ``GAP_MARKER``.
+"""
+
+import re
+from typing import Awaitable, Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Sentence boundaries: whitespace after terminal punctuation, or a line break.
+_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\s*\n\s*")
+
+GAP_MARKER = " [...] "
+
+Sections = List[Tuple[str, List[str]]]
+# ``(chunk text, relevance)`` of retrieval hits; higher relevance is closer.
+Hits = Sequence[Tuple[str, float]]
+
+
+def split_sentences(text: str) -> List[Tuple[int, int]]:
+    """Return the ``(start, end)`` offsets of the sentences in ``text``.
+
+    Args:
+        text: Span of retrieved context.
+
+    Returns:
+        List[Tuple[int, int]]: Offsets of the non-empty sentences, in order.
+    """
+    sentences = []
+    start = 0
+    for boundary in _BOUNDARY.finditer(text):
+        if boundary.start() > start:
+            sentences.append((start, boundary.start()))
+        start = boundary.end()
+    if start < len(text):
+        sentences.append((start, len(text)))
+    return sentences
+
+
+def cosine_scores(sentence_vectors: np.ndarray, query_vector: np.ndarray) -> np.ndarray:
+    """Return the cosine similarity of every sentence vector to the query.
+
+    Args:
+        sentence_vectors: Matrix of shape ``(n, dim)``.
+        query_vector: Query vector of shape ``(dim,)`` or ``(1, dim)``.
+
+    Returns:
+        np.ndarray: float32 scores of shape ``(n,)``.
+    """
+    query = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+    vectors = np.asarray(sentence_vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+    return (vectors @ query) / np.maximum(norms, 1e-12)
+
+
+def select_sentences(
+    scores: np.ndarray,
+    lengths: np.ndarray,
+    groups: np.ndarray,
+    budget_chars: int,
+    neighbours: int = 1,
+) -> np.ndarray:
+    """Pick the best-scoring sentences and their neighbours within a budget.
+
+    Sentences are taken in descending score order. Each one brings up to
+    ``neighbours`` sentences on either side from the same span (``groups``), so
+    the selected text keeps some local context. A window that no longer fits is
+    reduced to the sentence itself; selection stops once that does not fit.
+
+    Args:
+        scores: Relevance of every sentence.
+        lengths: Character length of every sentence.
+        groups: Span number of every sentence; windows never cross spans.
+        budget_chars: Maximum total length of the selected sentences.
+        neighbours: Sentences of context kept on each side of a selected one.
+
+    Returns:
+        np.ndarray: Sorted indices of the selected sentences.
+    """
+    selected = np.zeros(len(scores), dtype=bool)
+    used = 0
+    for index in np.argsort(-scores, kind="stable"):
+        if selected[index]:
+            continue
+        low, high = max(0, index - neighbours), min(len(scores), index + neighbours + 1)
+        window = np.arange(low, high)
+        window = window[(groups[window] == groups[index]) & ~selected[window]]
+        cost = int(lengths[window].sum())
+        if used + cost > budget_chars:
+            window = np.array([index])
+            cost = int(lengths[index])
+            if used + cost > budget_chars:
+                break
+        selected[window] = True
+        used += cost
+    return np.flatnonzero(selected)
+
+
+def _render(text: str, offsets: List[Tuple[int, int]], keep: Sequence[int]) -> str:
+    """Cut the kept sentences out of a span, marking the gaps between them."""
+    parts: List[str] = []
+    run_start = previous = None
+    for position in keep:
+        if previous is not None and position != previous + 1:
+            parts.append(text[offsets[run_start][0] : offsets[previous][1]])
+            run_start = None
+        if run_start is None:
+            run_start = position
+        previous = position
+    if run_start is not None:
+        parts.append(text[offsets[run_start][0] : offsets[previous][1]])
+
+    rendered = GAP_MARKER.join(parts)
+    if keep and text[: offsets[keep[0]][0]].strip():
+        rendered = GAP_MARKER.lstrip() + rendered
+    if keep and text[offsets[keep[-1]][1] :].strip():
+        rendered += GAP_MARKER.rstrip()
+    return rendered
+
+
+def span_relevance(texts: List[str], hits: Optional[Hits]) -> np.ndarray:
+    """Score every span by the most relevant retrieval hit it contains.
+
+    Stitched spans contain their hits verbatim. Without hits, spans keep the
+    order they were assembled in (each file's best hit first).
+
+    Args:
+        texts: Assembled spans.
+        hits: ``(chunk text, relevance)`` pairs from the vector store query.
+
+    Returns:
+        np.ndarray: float32 relevance of every span; spans containing no hit
+        rank last.
+    """
+    if not hits:
+        return -np.arange(len(texts), dtype=np.float32)
+    scores = np.full(len(texts), -np.inf, dtype=np.float32)
+    for position, text in enumerate(texts):
+        for chunk, relevance in hits:
+            if chunk and chunk in text:
+                scores[position] = max(scores[position], relevance)
+    return scores
+
+
+def _rebuild(sections: Sections, rendered: List[Optional[str]]) -> Sections:
+    """Put the rendered spans back into the ``(file_name, spans)`` layout."""
+    compressed: Sections = []
+    span_number = 0
+    for file_name, spans in sections:
+        kept_spans = [
+            text
+            for text in rendered[span_number : span_number + len(spans)]
+            if text is not None
+        ]
+        span_number += len(spans)
+        if kept_spans:
+            compressed.append((file_name, kept_spans))
+    return compressed
+
+
+async def _trim_spans(
+    texts: List[str],
+    query_vector: np.ndarray,
+    encode: Callable[[List[str]], Awaitable[np.ndarray]],
+    budget_chars: int,
+    neighbours: int,
+    max_sentences: int,
+) -> List[Optional[str]]:
+    """Cut spans, best first, down to their sentences closest to the query.
+
+    Only the first ``max_sentences`` sentences of the spans, in span order, are
+    encoded and can be kept.
+
+    Returns:
+        List[Optional[str]]: The rendered text of every span, or None when none
+        of its sentences were kept.
+    """
+    offsets: List[List[Tuple[int, int]]] = []
+    for text in texts:
+        cap = max_sentences - sum(len(spans) for spans in offsets)
+        offsets.append(split_sentences(text)[:cap] if cap > 0 else [])
+
+    sentences = [
+        text[start:end] for text, spans in zip(texts, offsets) for start, end in spans
+    ]
+    if not sentences:
+        return [None] * len(texts)
+
+    counts = [len(spans) for spans in offsets]
+    selected = select_sentences(
+        cosine_scores(await encode(sentences), query_vector),
+        np.fromiter((len(s) for s in sentences), dtype=np.int64),
+        np.repeat(np.arange(len(texts)), counts),
+        budget_chars,
+        neighbours,
+    )
+
+    first = np.concatenate(([0], np.cumsum(counts)))
+    rendered: List[Optional[str]] = []
+    for number, text in enumerate(texts):
+        low, high = first[number], first[number + 1]
+        keep = selected[(selected >= low) & (selected < high)] - low
+        rendered.append(
+            _render(text, offsets[number], keep.tolist()) if len(keep) else None
+        )
+    return rendered
+
+
+async def compress_sections(
+    sections: Sections,
+    query_vector: np.ndarray,
+    encode: Callable[[List[str]], Awaitable[np.ndarray]],
+    budget_chars: int,
+    neighbours: int = 1,
+    hits: Optional[Hits] = None,
+    max_sentences: int = 64,
+) -> Sections:
+    """Keep only the spans and sentences of the context most relevant to the query.
+
+    Context that already fits the budget is returned unchanged, and spans kept
+    whole are never encoded.
+
+    Args:
+        sections: ``(file_name, spans)`` pairs from ``assemble_file_sections``.
+        query_vector: Encoded query, in the same space as ``encode`` output.
+        encode: Encodes a batch of sentences in one model call.
+        budget_chars: Maximum length of the kept text.
+        neighbours: Sentences of context kept around each selected sentence.
+        hits: Retrieval relevance of the chunks, used to rank spans.
+        max_sentences: Most sentences encoded to trim the remaining spans.
+
+    Returns:
+        Sections: The same files and spans, reduced to the kept text; spans
+        without kept text and files without spans are dropped.
+    """
+    texts = [span for _, spans in sections for span in spans]
+    if sum(len(text) for text in texts) <= budget_chars:
+        return sections
+
+    order = np.argsort(-span_relevance(texts, hits), kind="stable").tolist()
+    rendered: List[Optional[str]] = [None] * len(texts)
+    remaining = budget_chars
+    while order and len(texts[order[0]]) <= remaining:
+        position = order.pop(0)
+        rendered[position] = texts[position]
+        remaining -= len(texts[position])
+
+    if remaining > 0 and order:
+        trimmed = await _trim_spans(
+            [texts[position] for position in order],
+            query_vector,
+            encode,
+            remaining,
+            neighbours,
+            max_sentences,
+        )
+        for position, text in zip(order, trimmed):
+            rendered[position] = text
+
+    return _rebuild(sections, rendered)
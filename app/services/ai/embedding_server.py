@@ -0,0 +1,290 @@
+"""Local embedding server shared by several API or worker processes.
+
+``uvicorn --workers N`` would otherwise load one copy of the model per process,
+each with its own torch thread pool competing for the same cores. Instead one
+server process owns the model and the processes send it text over a Unix
+socket. Requests that arrive within ``max_wait_ms`` of each other are merged
+into a single ``encode`` call of up to ``max_batch`` texts.
+
+Set ``EMBEDDING_SERVER_SOCKET`` in the client processes and ``model_registry``
+hands out a ``RemoteEmbeddingModel`` instead of loading the model.
+
+Wire format: every message is a frame (4-byte big-endian length, then payload).
+A request is one JSON frame ``{"texts": [...]}``; the response is a JSON header
+frame ``{"shape": [n, dim]}`` (or ``{"error": "..."}``) followed by a frame with
+the float32 vectors in C order.
+
+Usage:
+    python -m app.services.ai.embedding_server --socket /tmp/cowrite-embed.sock
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, List, Tuple
+
+import numpy as np
+
+from app.core.settings import settings
+
+_LENGTH = struct.Struct(">I")
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> bytes:
+    (length,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+    return await reader.readexactly(length)
+
+
+def _write_frame(writer: asyncio.StreamWriter, payload: bytes) -> None:
+    writer.write(_LENGTH.pack(len(payload)) + payload)
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if not count:
+            raise ConnectionError("Embedding server closed the connection.")
+        received += count
+    return bytes(buffer)
+
+
+def _recv_frame(sock: socket.socket) -> bytes:
+    (length,) = _LENGTH.unpack(_recv_exactly(sock, _LENGTH.size))
+    return _recv_exactly(sock, length)
+
+
+class EmbeddingServer:  # pylint: disable=too-many-instance-attributes
+    """Serves ``model.encode`` over a Unix socket with request micro-batching."""
+
+    def __init__(
+        self,
+        model: Any,
+        socket_path: str,
+        max_batch: int = 64,
+        max_wait_ms: float = 5.0,
+    ):
+        """Configure the server; nothing is bound until ``start``.
+
+        Args:
+            model: Loaded model exposing ``encode(texts, batch_size=...)``.
+            socket_path: Path of the Unix socket to listen on.
+            max_batch: Most texts merged into one ``encode`` call.
+            max_wait_ms: How long the first request of a batch waits for more.
+        """
+        self.model = model
+        self.socket_path = socket_path
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.encode_calls = 0
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._server: asyncio.AbstractServer | None = None
+        self._batcher: asyncio.Task | None = None
+        # torch parallelises a single encode call itself; running several
+        # at once would only oversubscribe the cores.
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    async def start(self) -> None:
+        """Bind the socket and start batching requests."""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = await asyncio.start_unix_server(
+            self._serve_connection, path=self.socket_path
+        )
+        self._batcher = asyncio.create_task(self._run_batches())
+        print(f"[EmbeddingServer] Listening on {self.socket_path}")
+
+    async def stop(self) -> None:
+        """Stop accepting requests and remove the socket."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._batcher is not None:
+            self._batcher.cancel()
+        self._executor.shutdown(wait=False)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    async def _serve_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Answer requests on one connection until the client closes it."""
+        try:
+            while True:
+                try:
+                    request = json.loads(await _read_frame(reader))
+                except asyncio.IncompleteReadError:
+                    break
+
+                future = asyncio.get_running_loop().create_future()
+                await self._queue.put((list(request["texts"]), future))
+                try:
+                    vectors = await future
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    _write_frame(writer, json.dumps({"error": str(e)}).encode())
+                else:
+                    header = {"shape": list(vectors.shape)}
+                    _write_frame(writer, json.dumps(header).encode())
+                    _write_frame(writer, vectors.tobytes())
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def _next_batch(self) -> List[Tuple[List[str], asyncio.Future]]:
+        """Wait for a request, then collect more until the batch is full or due."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        size = len(batch[0][0])
+        deadline = loop.time() + self.max_wait
+        while size < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    async def _run_batches(self) -> None:
+        """Encode merged batches and hand each request its rows."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            texts = [text for request_texts, _ in batch for text in request_texts]
+            try:
+                self.encode_calls += 1
+                vectors = await loop.run_in_executor(
+                    self._executor,
+                    partial(self.model.encode, texts, batch_size=self.max_batch),
+                )
+                vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            offset = 0
+            for request_texts, future in batch:
+                rows = vectors[offset : offset + len(request_texts)]
+                offset += len(request_texts)
+                if not future.done():
+                    future.set_result(rows)
+
+
+class RemoteEmbeddingModel:
+    """Drop-in replacement for ``SentenceTransformer.encode`` backed by the server.
+
+    ``encode`` is blocking, like the model it replaces, and is called from
+    executor threads; every call uses its own short-lived socket connection.
+    """
+
+    def __init__(self, socket_path: str, timeout_secs: float = 120.0):
+        """Initialize the client without connecting.
+
+        Args:
+            socket_path: Path of the server's Unix socket.
+            timeout_secs: Socket timeout of each request.
+        """
+        self.socket_path = socket_path
+        self.timeout_secs = timeout_secs
+
+    def wait_ready(self, timeout_secs: float) -> "RemoteEmbeddingModel":
+        """Block until the server accepts connections.
+
+        The server binds its socket only after the model is loaded.
+
+        Raises:
+            TimeoutError: If the server is not up within ``timeout_secs``.
+        """
+        deadline = time.monotonic() + timeout_secs
+        while True:
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                    sock.connect(self.socket_path)
+                return self
+            except (FileNotFoundError, ConnectionRefusedError) as e:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(
+                        f"Embedding server not available at {self.socket_path}"
+                    ) from e
+                time.sleep(0.2)
+
+    def encode(
+        self,
+        sentences: List[str] | str,
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        **_kwargs,
+    ) -> np.ndarray:
+        """Encode texts on the server.
+
+        Returns:
+            np.ndarray: float32 matrix with one row per text.
+
+        Raises:
+            RuntimeError: If the server failed to encode the texts.
+        """
+        del batch_size, convert_to_numpy
+        if isinstance(sentences, str):
+            sentences = [sentences]
+
+        payload = json.dumps({"texts": list(sentences)}).encode()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout_secs)
+            sock.connect(self.socket_path)
+            sock.sendall(_LENGTH.pack(len(payload)) + payload)
+            header = json.loads(_recv_frame(sock))
+            if "error" in header:
+                raise RuntimeError(f"Embedding server error: {header['error']}")
+            data = _recv_frame(sock)
+        return np.frombuffer(data, dtype=np.float32).reshape(header["shape"])
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument(
+        "--socket",
+        default=settings.embedding_server_socket or "/tmp/cowrite-embed.sock",
+    )
+    parser.add_argument(
+        "--max-batch", type=int, default=settings.embedding_server_max_batch
+    )
+    parser.add_argument(
+        "--max-wait-ms", type=float, default=settings.embedding_server_max_wait_ms
+    )
+    return parser.parse_args(argv)
+
+
+async def serve(argv: List[str] | None = None) -> None:
+    """Load the model, then serve it until cancelled."""
+    # pylint: disable-next=import-outside-toplevel
+    from app.services.ai.model_registry import load_local_model
+
+    args = parse_args(argv)
+    model = await asyncio.to_thread(load_local_model, settings.embedding_model_name)
+    server = EmbeddingServer(model, args.socket, args.max_batch, args.max_wait_ms)
+    await server.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
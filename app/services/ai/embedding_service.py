@@ -1,14 +1,35 @@
 """Service to handle text embeddings and storage in ChromaDB."""
 
 import asyncio
-from typing import List
-from sentence_transformers import SentenceTransformer
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from typing import TYPE_CHECKING, List, Sequence, Tuple
+
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.ai.chroma_client import ChromaClient
+from app.services.ai.context_assembly import ChunkStore
+from app.services.ai.context_compression import Sections, compress_sections
+from app.services.ai.file_summaries import (
+    cap_hits_per_file,
+    delete_file_summary,
+    refresh_file_summary,
+)
+from app.services.ai.model_registry import model_registry
+from app.services.ai.vector_store import as_embedding_matrix
+from app.services.files.ingest_events import IngestEvent, ingest_events
 from app.services.files.s3_service import S3Client
 from app.services.files.text_extraction_service import TextExtractionService
 from app.repositories.chat_files_repository import ChatFileRepository
+from app.core.settings import settings
+from app.core.metrics import (
+    INGEST_CHUNKS_TOTAL,
+    INGEST_FAILURES_TOTAL,
+    INGEST_FILES_TOTAL,
+    observe_stage,
+    track_in_flight,
+)
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 
 class EmbeddingService:
@@ -20,14 +41,27 @@ class EmbeddingService:
         s3_client: S3Client,
         text_extractor_service: TextExtractionService,
         db: AsyncSession,
-        model: SentenceTransformer,
+        model: "SentenceTransformer | None" = None,
+        chunk_store: ChunkStore | None = None,
     ):
         self.chroma_client = chroma_client
+        self.chunk_store = chunk_store
         self.model = model
         self.s3_client = s3_client
         self.text_extractor = text_extractor_service
         self.chat_file_repository = ChatFileRepository(db)
 
+    def with_session(self, db: AsyncSession) -> "EmbeddingService":
+        """Return a service sharing these clients that records status through ``db``."""
+        return EmbeddingService(
+            chroma_client=self.chroma_client,
+            s3_client=self.s3_client,
+            text_extractor_service=self.text_extractor,
+            db=db,
+            model=self.model,
+            chunk_store=self.chunk_store,
+        )
+
     def chunk_text(
         self, text: str, max_chunk_size: int = 1000, overlap: int = 200
     ) -> List[str]:
@@ -35,6 +69,10 @@ class EmbeddingService:
         Split text into semantically meaningful chunks with overlap
         using LangChain RecursiveCharacterTextSplitter.
         """
+        # Imported on first use to keep langchain out of startup.
+        # pylint: disable-next=import-outside-toplevel
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+
         splitter = RecursiveCharacterTextSplitter(
             chunk_size=max_chunk_size,
             chunk_overlap=overlap,
@@ -53,29 +91,70 @@ class EmbeddingService:
 
         return chunks
 
+    def _invalidate_chunks(self, filters: dict) -> None:
+        """Drop a file from the neighbour chunk cache after its chunks changed."""
+        if self.chunk_store is not None:
+            self.chunk_store.invalidate(filters)
+
+    async def encode_chunks(self, chunks: List[str]) -> np.ndarray:
+        """Encode chunks in the default executor.
+
+        Returns:
+            np.ndarray: Contiguous float32 matrix with one row per chunk. It is
+            handed to the vector store as is; converting it to nested Python
+            lists would box every component into a separate float object.
+        """
+        model = self.model if self.model is not None else await model_registry.get()
+        loop = asyncio.get_running_loop()
+        embeddings = await loop.run_in_executor(
+            None,
+            lambda: model.encode(chunks, batch_size=16, convert_to_numpy=True),
+        )
+        return as_embedding_matrix(embeddings)
+
     async def add_file_embeddings(
         self, file_key: str, file_name: str, user_id: int, file_id: str
     ) -> dict:
         """Extract text from a file, generate embeddings, and store them in ChromaDB."""
-        file_bytes = await self.s3_client.download_file_as_bytes(
-            file_key, bucket=self.s3_client.bucket
-        )
+        # Chat uploads run from BackgroundTasks rather than a message handler,
+        # so file-level counters are recorded here.
+        try:
+            with track_in_flight("chat"):
+                result = await self._add_file_embeddings(
+                    file_key, file_name, user_id, file_id
+                )
+        except Exception as e:
+            INGEST_FAILURES_TOTAL.labels(event_type="chat_upload").inc()
+            await self._record_failure(file_id, user_id, e)
+            raise
 
-        text = await self.text_extractor.extract_text(file_name, file_bytes)
+        INGEST_FILES_TOTAL.labels(event_type="chat_upload").inc()
+        INGEST_CHUNKS_TOTAL.labels(event_type="chat_upload").inc(result["chunks"])
+        return result
+
+    async def _add_file_embeddings(
+        self, file_key: str, file_name: str, user_id: int, file_id: str
+    ) -> dict:
+        """Run the timed download/extract/chunk/encode/upsert stages for a chat file."""
+        ingest_events.publish(IngestEvent(file_id, user_id, "extracting", 0.1))
+        with observe_stage("download"):
+            file_bytes = await self.s3_client.download_file_as_bytes(
+                file_key, bucket=self.s3_client.bucket
+            )
+
+        with observe_stage("extract"):
+            text = await self.text_extractor.extract_text(file_name, file_bytes)
         if not text.strip():
             raise ValueError(f"File {file_name} is empty.")
 
-        chunks = self.chunk_text(text)
+        with observe_stage("chunk"):
+            chunks = self.chunk_text(text)
         if not chunks:
             raise ValueError("Failed to chunk text.")
 
-        loop = asyncio.get_running_loop()
-        embeddings = await loop.run_in_executor(
-            None,
-            lambda: self.model.encode(
-                chunks, batch_size=16, convert_to_numpy=True
-            ).tolist(),
-        )
+        ingest_events.publish(IngestEvent(file_id, user_id, "embedding", 0.4))
+        with observe_stage("encode"):
+            embeddings = await self.encode_chunks(chunks)
 
         ids = [f"{file_id}_{i}" for i in range(len(chunks))]
         metadatas = [
@@ -96,12 +175,25 @@ class EmbeddingService:
             "metadata": metadatas,
         }
 
-        await self.chroma_client.add(items)
+        with observe_stage("upsert"):
+            await self.chroma_client.add(items)
+        self._invalidate_chunks({"user_id": user_id, "file_id": file_id})
 
         await self.chat_file_repository.update_status(file_id, "completed")
+        ingest_events.publish(IngestEvent(file_id, user_id, "completed", 1.0))
 
         return {"status": "ok", "chunks": len(chunks), "file_id": file_id}
 
+    async def _record_failure(self, file_id: str, user_id: int, error: Exception):
+        """Mark a chat file as failed in the database and notify its owner."""
+        ingest_events.publish(
+            IngestEvent(file_id, user_id, "failed", 1.0, detail=str(error))
+        )
+        try:
+            await self.chat_file_repository.update_status(file_id, "failed")
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            print(f"[EmbeddingService] Could not mark file {file_id} as failed: {e}")
+
     async def add_workspace_file_embeddings(
         self, file_key: str, workspace_id: int, file_id: str, bucket: str
     ) -> dict:
@@ -116,27 +208,34 @@ class EmbeddingService:
         Returns:
             dict: Processing result with status and metadata.
         """
-        file_bytes = await self.s3_client.download_file_as_bytes(
-            file_key, bucket=bucket
-        )
+        with track_in_flight("workspace"):
+            return await self._add_workspace_file_embeddings(
+                file_key, workspace_id, file_id, bucket
+            )
+
+    async def _add_workspace_file_embeddings(
+        self, file_key: str, workspace_id: int, file_id: str, bucket: str
+    ) -> dict:
+        """Run the timed download/extract/chunk/encode/upsert stages for a workspace file."""
+        with observe_stage("download"):
+            file_bytes = await self.s3_client.download_file_as_bytes(
+                file_key, bucket=bucket
+            )
 
         file_name = file_key.split("/")[-1]
 
-        text = await self.text_extractor.extract_text(file_name, file_bytes)
+        with observe_stage("extract"):
+            text = await self.text_extractor.extract_text(file_name, file_bytes)
         if not text.strip():
             raise ValueError(f"File {file_name} is empty.")
 
-        chunks = self.chunk_text(text)
+        with observe_stage("chunk"):
+            chunks = self.chunk_text(text)
         if not chunks:
             raise ValueError("Failed to chunk text.")
 
-        loop = asyncio.get_running_loop()
-        embeddings = await loop.run_in_executor(
-            None,
-            lambda: self.model.encode(
-                chunks, batch_size=16, convert_to_numpy=True
-            ).tolist(),
-        )
+        with observe_stage("encode"):
+            embeddings = await self.encode_chunks(chunks)
 
         ids = [
             f"workspace_{workspace_id}_file_{file_id}_{i}" for i in range(len(chunks))
@@ -160,7 +259,9 @@ class EmbeddingService:
             "metadata": metadatas,
         }
 
-        await self.chroma_client.add(items)
+        with observe_stage("upsert"):
+            await self.chroma_client.add(items)
+        self._invalidate_chunks({"workspace_id": workspace_id, "file_id": file_id})
 
         return {
             "status": "ok",
@@ -169,33 +270,142 @@ class EmbeddingService:
             "workspace_id": workspace_id,
         }
 
+    async def encode_query(self, query_text: str) -> np.ndarray:
+        """Encode a question once so every retrieval step can reuse the vector."""
+        return await self.chroma_client.encode_query(query_text)
+
+    async def compress_context(
+        self,
+        sections: Sections,
+        query_vec: np.ndarray,
+        distances: Sequence[Tuple[str, float]] | None = None,
+    ) -> Sections:
+        """Reduce assembled context to the spans and sentences closest to the query.
+
+        A no-op unless ``settings.context_compression`` is enabled. Spans are
+        ranked by the query distances of their chunks, which the vector store
+        computed from the stored embeddings, and the best ones are kept whole.
+        Only the spans left over are split into sentences, of which at most
+        ``settings.context_compression_max_sentences`` are encoded in one batch.
+
+        Args:
+            sections: ``(file_name, spans)`` pairs from ``assemble_file_sections``.
+            query_vec: Encoded question, as returned by ``encode_query``.
+            distances: ``(chunk text, distance)`` of the retrieved chunks.
+
+        Returns:
+            Sections: The compressed sections.
+        """
+        if not settings.context_compression:
+            return sections
+        hits = [(chunk, -distance) for chunk, distance in distances or ()]
+        return await compress_sections(
+            sections,
+            query_vec,
+            encode=self.chroma_client.encode_texts,
+            budget_chars=settings.context_compression_budget_chars,
+            neighbours=settings.context_compression_neighbours,
+            hits=hits,
+            max_sentences=settings.context_compression_max_sentences,
+        )
+
     async def query_user_file_context(
-        self, user_id: int, file_id: str, query_text: str, n_results: int = 3
+        self,
+        user_id: int,
+        file_id: str,
+        query_text: str,
+        n_results: int = 3,
+        query_vec: np.ndarray | None = None,
     ) -> dict:
         """Search for similar text chunks in ChromaDB for a given user's file."""
         filters = {"user_id": user_id, "file_id": file_id}
-        return await self.chroma_client.query(
-            query_text=query_text, n_results=n_results, filters=filters
+        if query_vec is None:
+            query_vec = await self.encode_query(query_text)
+        return await self.chroma_client.store.query(
+            query_embeddings=query_vec, n_results=n_results, filters=filters
         )
 
     async def query_workspace_context(
-        self, workspace_id: int, query_text: str, n_results: int = 3
+        self,
+        workspace_id: int,
+        query_text: str,
+        n_results: int = 3,
+        query_vec: np.ndarray | None = None,
     ) -> dict:
         """Search for similar text chunks across all files in a workspace.
 
+        With ``settings.workspace_hierarchical_retrieval`` the workspace's files
+        are ranked by their summary vectors first and chunks are searched only
+        inside the ``workspace_top_files`` best files, at most
+        ``workspace_chunks_per_file`` per file while other files have hits.
+        Workspaces without summaries fall back to one search over all chunks.
+
         Args:
             workspace_id: Workspace identifier.
             query_text: Query string for semantic search.
             n_results: Number of top results to return (default: 3).
+            query_vec: Already encoded ``query_text``; encoded here when omitted.
 
         Returns:
             dict: ChromaDB query results with documents, metadatas, and distances.
         """
         filters = {"workspace_id": workspace_id}
-        return await self.chroma_client.query(
-            query_text=query_text, n_results=n_results, filters=filters
+        if query_vec is None:
+            query_vec = await self.encode_query(query_text)
+
+        if settings.workspace_hierarchical_retrieval:
+            files = await self.chroma_client.summaries.query(
+                query_embeddings=query_vec,
+                n_results=settings.workspace_top_files,
+                filters=filters,
+            )
+            file_ids = [meta["file_id"] for meta in files["metadatas"][0]]
+            if file_ids:
+                per_file = settings.workspace_chunks_per_file
+                result = await self.chroma_client.store.query(
+                    query_embeddings=query_vec,
+                    n_results=n_results * per_file,
+                    filters={**filters, "file_id": file_ids},
+                )
+                return cap_hits_per_file(result, n_results, per_file)
+
+        return await self.chroma_client.store.query(
+            query_embeddings=query_vec, n_results=n_results, filters=filters
         )
 
+    async def refresh_workspace_file_summary(
+        self, workspace_id: int, file_id: str
+    ) -> dict:
+        """Recompute the summary vector of a workspace file from its chunks.
+
+        Args:
+            workspace_id: Workspace identifier.
+            file_id: File identifier.
+
+        Returns:
+            dict: Result with the number of chunks summarised.
+        """
+        with observe_stage("summarize"):
+            chunks = await refresh_file_summary(
+                self.chroma_client.store,
+                self.chroma_client.summaries,
+                workspace_id,
+                file_id,
+            )
+        status = "ok" if chunks else "not_found"
+        return {"status": status, "chunks": chunks, "file_id": file_id}
+
+    async def delete_workspace_file_summary(
+        self, workspace_id: int, file_id: str
+    ) -> None:
+        """Remove the summary vector of a deleted workspace file.
+
+        Args:
+            workspace_id: Workspace identifier.
+            file_id: File identifier.
+        """
+        await delete_file_summary(self.chroma_client.summaries, workspace_id, file_id)
+
     async def delete_workspace_file_embeddings(
         self, workspace_id: int, file_id: str
     ) -> dict:
@@ -210,14 +420,17 @@ class EmbeddingService:
         """
         try:
             # Get all embeddings for this file using metadata filters
-            result = await self.chroma_client.get(
-                filters={"workspace_id": workspace_id, "file_id": file_id}, limit=1000
-            )
+            filters = {"workspace_id": workspace_id, "file_id": file_id}
+            with observe_stage("delete"):
+                result = await self.chroma_client.get(filters=filters, limit=1000)
+
+                ids = result.get("ids", [])
 
-            ids = result.get("ids", [])
+                if ids:
+                    await self.chroma_client.delete(ids, filters=filters)
+            self._invalidate_chunks(filters)
 
             if ids:
-                await self.chroma_client.delete(ids)
                 print(
                     f"[EmbeddingService] Deleted {len(ids)} embeddings for file_id={file_id}"
                 )
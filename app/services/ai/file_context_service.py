@@ -1,7 +1,14 @@
 """ "Service to extract and compile context from user-uploaded files stored in S3."""
 
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.settings import settings
+from app.services.ai.context_assembly import (
+    ChunkStore,
+    assemble_file_sections,
+    format_file_section,
+)
 from app.services.ai.embedding_service import EmbeddingService
 from app.repositories.chat_files_repository import ChatFileRepository
 
@@ -13,9 +20,11 @@ class FileContextService:
         self,
         embedding_service: EmbeddingService,
         db: AsyncSession,
+        chunk_store: ChunkStore | None = None,
     ):
         self.embedding_service = embedding_service
         self.db = db
+        self.chunk_store = chunk_store
         self.chat_file_repo = ChatFileRepository(db)
 
     async def get_external_file_context(
@@ -26,10 +35,16 @@ class FileContextService:
         max_files: int = 50,
         max_tokens: int = 10000,
         top_k: int = 3,
+        query_vec: np.ndarray | None = None,
     ) -> str:
         """
         Retrieve relevant semantic context for a query based on embeddings
         from all files in the given conversation.
+
+        Hits of the same file are stitched into contiguous spans so the text
+        shared by overlapping chunks appears only once. The query is encoded
+        once (or ``query_vec`` is reused) for all files, and with
+        ``settings.context_compression`` only its closest sentences are kept.
         """
         chat_files = await self.chat_file_repo.list_user_files(
             conversation_id, max_files
@@ -38,29 +53,50 @@ class FileContextService:
         if not chat_files:
             return ""
 
-        external_texts: list[str] = []
+        documents: list[str] = []
+        metadatas: list[dict] = []
+        distances: list[float] = []
 
         print(f"Found {len(chat_files)} files for context retrieval.")
 
+        if query_vec is None:
+            query_vec = await self.embedding_service.encode_query(query_text)
+
         for f in chat_files:
             result = await self.embedding_service.query_user_file_context(
                 user_id=user_id,
                 file_id=str(f.id),
                 query_text=query_text,
                 n_results=top_k,
+                query_vec=query_vec,
             )
 
             docs = result.get("documents", [[]])[0]
+            metas = result.get("metadatas", [[]])[0] or [{}] * len(docs)
+            documents.extend(docs)
+            distances.extend((result.get("distances") or [[]])[0] or [0.0] * len(docs))
+            metadatas.extend(
+                {"file_id": str(f.id), "file_name": f.filename, **(meta or {})}
+                for meta in metas
+            )
 
-            if not docs:
-                continue
-
-            text = f"📄 File: {f.filename}\n" + "\n---\n".join(docs)
-            external_texts.append(text)
-
-        if not external_texts:
+        sections = await assemble_file_sections(
+            documents,
+            metadatas,
+            scope={"user_id": user_id},
+            chunk_store=self.chunk_store,
+            neighbour_window=settings.context_neighbour_window,
+        )
+        if not sections:
             return ""
 
+        sections = await self.embedding_service.compress_context(
+            sections, query_vec, distances=list(zip(documents, distances))
+        )
+        external_texts = [
+            format_file_section(file_name, spans) for file_name, spans in sections
+        ]
+
         context = "\n\n===========================\n\n".join(external_texts)
 
         if len(context) > max_tokens:
@@ -0,0 +1,173 @@
+"""Two-level (file, then chunk) retrieval helpers for large workspaces.
+
+Every workspace file gets one summary vector, the mean of its chunk vectors, in a
+sibling collection (``<collection>_files``). A workspace query first ranks
+files by their summary and then searches chunks only inside the best files,
+which keeps latency proportional to the number of files searched rather than
+to every chunk in the workspace. The per-file cap stops one long document from
+taking every slot.
+"""
+
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.services.ai.vector_store import VectorStore, as_embedding_matrix
+
+
+def summary_vector(chunk_vectors: np.ndarray) -> np.ndarray:
+    """Return the summary vector of a file from its chunk vectors.
+
+    The mean is rescaled to the average chunk norm so that files whose chunks
+    point in many directions (and therefore have a short mean) are not pulled
+    towards every query under L2 distance.
+
+    Args:
+        chunk_vectors: Matrix of shape ``(n_chunks, dim)``.
+
+    Returns:
+        np.ndarray: float32 vector of shape ``(dim,)``.
+    """
+    vectors = as_embedding_matrix(chunk_vectors)
+    mean = vectors.mean(axis=0)
+    norm = float(np.linalg.norm(mean))
+    if norm > 0:
+        mean *= float(np.linalg.norm(vectors, axis=1).mean()) / norm
+    return mean.astype(np.float32)
+
+
+def summary_id(workspace_id: int, file_id: str) -> str:
+    """Return the id of a workspace file's summary vector."""
+    return f"workspace_{workspace_id}_file_{file_id}"
+
+
+async def refresh_file_summary(
+    chunks: VectorStore, summaries: VectorStore, workspace_id: int, file_id: str
+) -> int:
+    """Recompute a workspace file's summary vector from its stored chunk vectors.
+
+    A file without chunks loses its summary instead.
+
+    Args:
+        chunks: Store holding the file's chunks.
+        summaries: Store holding the summary vectors.
+        workspace_id: Workspace identifier.
+        file_id: File identifier.
+
+    Returns:
+        int: Number of chunks summarised.
+    """
+    found = await chunks.get(
+        filters={"workspace_id": workspace_id, "file_id": file_id},
+        limit=10000,
+        include_embeddings=True,
+        include_documents=False,
+    )
+    if not found["ids"]:
+        await delete_file_summary(summaries, workspace_id, file_id)
+        return 0
+
+    file_name = found["metadatas"][0].get("file_name", "")
+    await summaries.add(
+        ids=[summary_id(workspace_id, file_id)],
+        embeddings=summary_vector(found["embeddings"])[None, :],
+        documents=[file_name],
+        metadatas=[
+            {
+                "workspace_id": workspace_id,
+                "file_id": file_id,
+                "file_name": file_name,
+                "chunks": len(found["ids"]),
+            }
+        ],
+    )
+    return len(found["ids"])
+
+
+async def delete_file_summary(
+    summaries: VectorStore, workspace_id: int, file_id: str
+) -> None:
+    """Remove the summary vector of a workspace file."""
+    await summaries.delete(
+        [summary_id(workspace_id, file_id)],
+        filters={"workspace_id": workspace_id, "file_id": file_id},
+    )
+
+
+async def files_without_summary(
+    chunks: VectorStore,
+    summaries: VectorStore,
+    workspace_id: int | None = None,
+    limit: int = 1_000_000,
+) -> Dict[int, List[str]]:
+    """Return the indexed workspace files that have no summary vector yet.
+
+    Only metadata is read from either store. Chunks without a ``workspace_id``
+    (chat files) are ignored.
+
+    Args:
+        chunks: Store holding the chunks.
+        summaries: Store holding the summary vectors.
+        workspace_id: Only look at this workspace; defaults to every workspace.
+        limit: Maximum number of chunks (and summaries) read.
+
+    Returns:
+        Dict[int, List[str]]: Sorted file ids per workspace id.
+    """
+    filters = None if workspace_id is None else {"workspace_id": workspace_id}
+    indexed = await chunks.get(filters=filters, limit=limit, include_documents=False)
+    summarised = await summaries.get(
+        filters=filters, limit=limit, include_documents=False
+    )
+    if len(indexed["ids"]) >= limit:
+        print(
+            f"[FileSummaries] Read only the first {limit} chunks; "
+            "raise the limit or select one workspace at a time"
+        )
+
+    done = {(m.get("workspace_id"), m.get("file_id")) for m in summarised["metadatas"]}
+    missing: Dict[int, set] = {}
+    for metadata in indexed["metadatas"]:
+        key = (metadata.get("workspace_id"), metadata.get("file_id"))
+        if key[0] is not None and key not in done:
+            missing.setdefault(key[0], set()).add(key[1])
+    return {ws: sorted(file_ids) for ws, file_ids in sorted(missing.items())}
+
+
+def cap_hits_per_file(result: dict, n_results: int, per_file: int) -> dict:
+    """Keep the best hits of a single-query result, at most ``per_file`` per file.
+
+    Slots left free because of the cap are filled with the best skipped hits,
+    so fewer than ``n_results`` hits are only returned when fewer were found.
+
+    Args:
+        result: Chroma-style query response for one query embedding.
+        n_results: Number of hits to keep.
+        per_file: Maximum hits per ``file_id`` before falling back.
+
+    Returns:
+        dict: Response with the same keys, in distance order.
+    """
+    keys = [
+        key for key in ("ids", "documents", "metadatas", "distances") if key in result
+    ]
+    hits = list(zip(*(result[key][0] for key in keys)))
+    file_position = keys.index("metadatas")
+
+    taken: List[tuple] = []
+    skipped: List[tuple] = []
+    per_file_count: Dict[Any, int] = {}
+    for hit in hits:
+        file_id = (hit[file_position] or {}).get("file_id")
+        if per_file_count.get(file_id, 0) < per_file:
+            per_file_count[file_id] = per_file_count.get(file_id, 0) + 1
+            taken.append(hit)
+        else:
+            skipped.append(hit)
+
+    order = {id(hit): i for i, hit in enumerate(hits)}
+    selected = sorted(
+        (taken + skipped)[:n_results] if len(taken) < n_results else taken[:n_results],
+        key=lambda hit: order[id(hit)],
+    )
+    return {key: [[hit[i] for hit in selected]] for i, key in enumerate(keys)}
@@ -5,8 +5,6 @@ It reads the API key from the application's settings and interfaces with the Goo
 """
 
 import asyncio
-from google import genai
-from google.genai import types
 
 from app.core.settings import settings
 from prompts.assistant_prompt_v1 import MARKDOWN_ASSISTANT_PROMPT_V1
@@ -17,13 +15,25 @@ class GeminiClient:
 
     def __init__(self):
         """Initialize the GeminiClient with API key from settings."""
+        # The SDK is imported on first use to keep it out of startup.
+        # pylint: disable-next=import-outside-toplevel
+        from google import genai
+
         self.api_key = settings.gemini_api_key
         self.default_model = "gemini-2.5-flash"
         self.client = genai.Client(api_key=self.api_key)
 
-    async def generate(self, prompt: str, model: str | None = None) -> str:
+    async def generate(
+        self,
+        prompt: str,
+        model: str | None = None,
+        system_instruction: str | None = None,
+    ) -> str:
         """Generate text asynchronously using Gemini API."""
         model = model or self.default_model
+        system_instruction = system_instruction or MARKDOWN_ASSISTANT_PROMPT_V1
+        # pylint: disable-next=import-outside-toplevel
+        from google.genai import types
 
         loop = asyncio.get_running_loop()
         response = await loop.run_in_executor(
@@ -31,7 +41,7 @@ class GeminiClient:
             lambda: self.client.models.generate_content(
                 model=model,
                 config=types.GenerateContentConfig(
-                    system_instruction=MARKDOWN_ASSISTANT_PROMPT_V1
+                    system_instruction=system_instruction
                 ),
                 contents=prompt,
             ),
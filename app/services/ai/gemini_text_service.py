@@ -14,16 +14,49 @@ class GeminiTextService:
         self,
         file_context_service: FileContextService,
         workspace_context_service: WorkspaceContextService,
+        client: GeminiClient | None = None,
     ):
         self.file_context_service = file_context_service
         self.workspace_context_service = workspace_context_service
-        self.client = GeminiClient()
+        self.client = client or GeminiClient()
 
-    async def generate(self, conversation_id: int, user_id: int, user_prompt: str):
+    async def generate(
+        self,
+        conversation_id: int,
+        user_id: int,
+        user_prompt: str,
+        conversation_history: str | None = None,
+    ):
         """
         Generate text from Gemini API using user prompt and semantic context
         from conversation files stored in ChromaDB.
         """
+        full_prompt = await self.build_prompt(
+            conversation_id=conversation_id,
+            user_id=user_id,
+            user_prompt=user_prompt,
+            conversation_history=conversation_history,
+        )
+        return await self.complete(full_prompt)
+
+    async def build_prompt(
+        self,
+        conversation_id: int,
+        user_id: int,
+        user_prompt: str,
+        conversation_history: str | None = None,
+    ) -> str:
+        """
+        Retrieve file and workspace context and compose the full prompt.
+
+        The prompt is encoded once and the vector is shared by every retrieval
+        and compression step. ``conversation_history`` is the bounded memory
+        built by ``ConversationMemory``. This is the only step that reads the
+        database, so callers can release their session before ``complete``.
+        """
+        query_vec = await self.workspace_context_service.embedding_service.encode_query(
+            user_prompt
+        )
         file_context = await self.file_context_service.get_external_file_context(
             conversation_id=conversation_id,
             user_id=user_id,
@@ -31,6 +64,7 @@ class GeminiTextService:
             max_files=3,
             max_tokens=8000,
             top_k=3,
+            query_vec=query_vec,
         )
         workspace_context = (
             await self.workspace_context_service.get_workspace_file_context(
@@ -38,16 +72,20 @@ class GeminiTextService:
                 query_text=user_prompt,
                 n_results=3,
                 max_tokens=10000,
+                query_vec=query_vec,
             )
         )
 
-        full_prompt = PromptComposer.compose(
+        return PromptComposer.compose(
             user_prompt=user_prompt,
             file_context=file_context,
             system_instruction=MARKDOWN_ASSISTANT_PROMPT_V2,
             workspace_context=workspace_context,
+            conversation_history=conversation_history,
         )
 
+    async def complete(self, full_prompt: str) -> str:
+        """Send a composed prompt to Gemini and return its answer."""
         print("=== Sending to Gemini ===")
         print(full_prompt)
         print("==========================")
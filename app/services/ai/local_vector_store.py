@@ -0,0 +1,529 @@
+"""Embedded vector store with per-tenant flat indexes in memory-mapped files.
+
+Each tenant (workspace or chat-file owner, see ``tenant_key``) gets its own directory
+holding append-only segments: ``<segment>.npy`` with the vectors, opened with
+``mmap_mode="r"``, and ``<segment>.json`` with ids, documents, metadata and the
+segment's quantization. ``int8`` segments also have ``<segment>.scales.npy``
+(see ``vector_compression``). A ``manifest.json`` lists the live segments and
+tombstoned ids. Search is exact
+(brute-force squared L2, the same metric as the default Chroma collection), which
+is fast enough for per-tenant indexes and keeps recall at 100%.
+"""
+
+import asyncio
+import json
+import os
+import re
+import threading
+import uuid
+from functools import partial
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.services.ai.vector_compression import QUANTIZATIONS, dequantize, quantize
+from app.services.ai.vector_store import (
+    VectorStore,
+    as_embedding_matrix,
+    tenant_key,
+)
+
+DEFAULT_TENANT = "default"
+
+# Merge segments once there are this many, or when this share of rows is deleted.
+_MAX_SEGMENTS = 16
+_MAX_DELETED_RATIO = 0.3
+
+_UNSAFE_PATH_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
+# Rows decoded at a time when computing norms, bounding the float32 scratch space.
+_DECODE_BLOCK = 4096
+
+
+class _Segment:  # pylint: disable=too-many-instance-attributes
+    """An immutable batch of vectors plus their documents and metadata."""
+
+    def __init__(
+        self,
+        name: str,
+        codes: np.ndarray,
+        scales: np.ndarray | None,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+    ):
+        self.name = name
+        self.codes = codes
+        self.scales = scales
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self.norms = np.empty(len(ids), dtype=np.float32)
+        for start in range(0, len(ids), _DECODE_BLOCK):
+            block = self.decode(slice(start, start + _DECODE_BLOCK))
+            self.norms[start : start + len(block)] = np.einsum("ij,ij->i", block, block)
+        self.alive = np.ones(len(ids), dtype=bool)
+        self._index: Dict[str, Dict[Any, np.ndarray]] = {}
+        self._columns: Dict[str, List[Any]] = {}
+
+    def decode(self, rows: np.ndarray | slice) -> np.ndarray:
+        """Return the given rows as float32 vectors."""
+        return dequantize(
+            self.codes[rows], None if self.scales is None else self.scales[rows]
+        )
+
+    def dot(self, rows: np.ndarray, queries: np.ndarray) -> np.ndarray:
+        """Return inner products of the given rows with each query, ``(rows, q)``."""
+        if self.codes.dtype == np.float32:
+            vectors = self.codes if rows.size == len(self.ids) else self.codes[rows]
+            return vectors @ queries.T
+        products = self.codes[rows].astype(np.float32) @ queries.T
+        if self.scales is not None:
+            products *= self.scales[rows, None]
+        return products
+
+    def _postings(self, key: str) -> Dict[Any, np.ndarray]:
+        """Return ``{value: rows}`` for one metadata field, built on first use."""
+        postings = self._index.get(key)
+        if postings is None:
+            groups: Dict[Any, List[int]] = {}
+            for row, metadata in enumerate(self.metadatas):
+                groups.setdefault(metadata.get(key), []).append(row)
+            postings = {
+                value: np.asarray(rows, dtype=np.int64)
+                for value, rows in groups.items()
+            }
+            self._index[key] = postings
+        return postings
+
+    def _column(self, key: str) -> List[Any]:
+        """Return one metadata field for every row, built on first use."""
+        column = self._columns.get(key)
+        if column is None:
+            column = [metadata.get(key) for metadata in self.metadatas]
+            self._columns[key] = column
+        return column
+
+    def matching_rows(self, filters: Dict[str, Any] | None) -> np.ndarray:
+        """Return the sorted live rows matching every filter.
+
+        The most selective filter is resolved from its posting lists and the
+        remaining filters are checked only on those rows, so the cost follows
+        the number of matches rather than the size of the segment.
+        """
+        if not filters:
+            return np.flatnonzero(self.alive)
+
+        candidates = []
+        for key, value in filters.items():
+            values = list(dict.fromkeys(value)) if isinstance(value, list) else [value]
+            postings = self._postings(key)
+            found = [postings[v] for v in values if v in postings]
+            if not found:
+                return np.empty(0, dtype=np.int64)
+            candidates.append((sum(len(rows) for rows in found), key, values, found))
+        candidates.sort(key=lambda candidate: candidate[0])
+
+        found = candidates[0][3]
+        rows = found[0] if len(found) == 1 else np.sort(np.concatenate(found))
+        for _, key, values, _ in candidates[1:]:
+            column, allowed = self._column(key), set(values)
+            rows = rows[
+                np.fromiter(
+                    (column[row] in allowed for row in rows),
+                    dtype=bool,
+                    count=len(rows),
+                )
+            ]
+        return rows[self.alive[rows]]
+
+
+class _TenantIndex:
+    """All segments of one tenant, guarded by a lock."""
+
+    def __init__(self, path: str, quantization: str = "float32"):
+        self.path = path
+        self.quantization = quantization
+        self.lock = threading.RLock()
+        self.dim: int | None = None
+        self.segments: List[_Segment] = []
+        self.deleted: set[str] = set()
+        self.locations: Dict[str, Tuple[_Segment, int]] = {}
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    # ---- persistence -------------------------------------------------------
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _load(self) -> None:
+        manifest_path = self._file("manifest.json")
+        if not os.path.exists(manifest_path):
+            return
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        self.dim = manifest.get("dim")
+        self.deleted = set(manifest.get("deleted", []))
+        for name in manifest.get("segments", []):
+            segment = self._open_segment(name)
+            self.segments.append(segment)
+            self._register(segment)
+
+    def _open_segment(self, name: str) -> _Segment:
+        codes = np.load(self._file(f"{name}.npy"), mmap_mode="r")
+        with open(self._file(f"{name}.json"), encoding="utf-8") as f:
+            payload = json.load(f)
+        scales = None
+        if payload.get("quantization", "float32") == "int8":
+            scales = np.load(self._file(f"{name}.scales.npy"))
+        return _Segment(
+            name,
+            codes,
+            scales,
+            payload["ids"],
+            payload["documents"],
+            payload["metadatas"],
+        )
+
+    def _write_segment(
+        self,
+        vectors: np.ndarray,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+    ) -> _Segment:
+        name = f"seg_{uuid.uuid4().hex[:16]}"
+        codes, scales = quantize(vectors, self.quantization)
+        np.save(self._file(f"{name}.npy"), codes)
+        if scales is not None:
+            np.save(self._file(f"{name}.scales.npy"), scales)
+        with open(self._file(f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "ids": ids,
+                    "documents": documents,
+                    "metadatas": metadatas,
+                    "quantization": self.quantization,
+                },
+                f,
+            )
+        return self._open_segment(name)
+
+    def _write_manifest(self) -> None:
+        manifest = {
+            "dim": self.dim,
+            "segments": [segment.name for segment in self.segments],
+            "deleted": sorted(self.deleted),
+        }
+        tmp_path = self._file("manifest.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self._file("manifest.json"))
+
+    def _register(self, segment: _Segment) -> None:
+        """Index a segment's rows; newer rows shadow older rows with the same id."""
+        for row, doc_id in enumerate(segment.ids):
+            if doc_id in self.deleted:
+                segment.alive[row] = False
+                continue
+            previous = self.locations.get(doc_id)
+            if previous:
+                previous[0].alive[previous[1]] = False
+            self.locations[doc_id] = (segment, row)
+
+    def _maybe_compact(self) -> None:
+        total = sum(len(segment.ids) for segment in self.segments)
+        dead = total - len(self.locations)
+        if len(self.segments) > _MAX_SEGMENTS or (
+            total and dead / total > _MAX_DELETED_RATIO
+        ):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite all live rows into a single segment and drop tombstones."""
+        old_segments = self.segments
+        live = [(segment, np.flatnonzero(segment.alive)) for segment in old_segments]
+        live = [(segment, rows) for segment, rows in live if rows.size]
+
+        self.segments = []
+        self.locations = {}
+        self.deleted = set()
+        if live:
+            merged = self._write_segment(
+                np.concatenate([segment.decode(rows) for segment, rows in live]),
+                [segment.ids[i] for segment, rows in live for i in rows],
+                [segment.documents[i] for segment, rows in live for i in rows],
+                [segment.metadatas[i] for segment, rows in live for i in rows],
+            )
+            self.segments.append(merged)
+            self._register(merged)
+        self._write_manifest()
+
+        for segment in old_segments:
+            for suffix in (".npy", ".scales.npy", ".json"):
+                try:
+                    os.remove(self._file(segment.name + suffix))
+                except FileNotFoundError:
+                    pass
+
+    # ---- operations --------------------------------------------------------
+
+    def add(
+        self,
+        ids: List[str],
+        vectors: np.ndarray,
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+        """Append a segment; ids that already exist are replaced."""
+        with self.lock:
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(
+                    f"Embedding dimension {vectors.shape[1]} does not match "
+                    f"index dimension {self.dim}."
+                )
+            segment = self._write_segment(vectors, ids, documents, metadatas)
+            self.deleted.difference_update(ids)
+            self.segments.append(segment)
+            self._register(segment)
+            self._write_manifest()
+            self._maybe_compact()
+
+    def delete(self, ids: List[str]) -> set[str]:
+        """Tombstone ids and return the ones that were present."""
+        with self.lock:
+            removed = set()
+            for doc_id in ids:
+                location = self.locations.pop(doc_id, None)
+                if location:
+                    location[0].alive[location[1]] = False
+                    self.deleted.add(doc_id)
+                    removed.add(doc_id)
+            if removed:
+                self._write_manifest()
+                self._maybe_compact()
+            return removed
+
+    def search(
+        self, queries: np.ndarray, n_results: int, filters: Dict[str, Any] | None
+    ) -> List[List[Tuple[float, str, str, dict]]]:
+        """Return the ``n_results`` nearest rows for each query vector."""
+        if n_results <= 0:
+            return [[] for _ in range(len(queries))]
+        with self.lock:
+            if self.dim is not None and queries.shape[1] != self.dim:
+                raise ValueError(
+                    f"Query dimension {queries.shape[1]} does not match "
+                    f"index dimension {self.dim}."
+                )
+            query_norms = np.einsum("ij,ij->i", queries, queries)
+            candidates = []
+            for segment in self.segments:
+                rows = segment.matching_rows(filters)
+                if not rows.size:
+                    continue
+                distances = (
+                    segment.norms[rows][:, None]
+                    - 2.0 * segment.dot(rows, queries)
+                    + query_norms[None, :]
+                )
+                candidates.append((segment, rows, distances))
+
+            results = []
+            for q in range(len(queries)):
+                hits = []
+                for segment, rows, distances in candidates:
+                    column = distances[:, q]
+                    k = min(n_results, column.size)
+                    top = np.argpartition(column, k - 1)[:k]
+                    for i in top:
+                        row = rows[i]
+                        hits.append(
+                            (
+                                float(max(column[i], 0.0)),
+                                segment.ids[row],
+                                segment.documents[row],
+                                segment.metadatas[row],
+                            )
+                        )
+                hits.sort(key=lambda hit: hit[0])
+                results.append(hits[:n_results])
+            return results
+
+    def get(
+        self, filters: Dict[str, Any] | None, limit: int
+    ) -> List[Tuple[_Segment, int]]:
+        """Return up to ``limit`` live ``(segment, row)`` pairs matching the filters."""
+        with self.lock:
+            rows_out = []
+            for segment in self.segments:
+                for row in segment.matching_rows(filters):
+                    if len(rows_out) >= limit:
+                        return rows_out
+                    rows_out.append((segment, int(row)))
+            return rows_out
+
+
+class LocalVectorStore(VectorStore):
+    """In-process vector store that removes the network hop to a Chroma server."""
+
+    def __init__(self, root: str, quantization: str = "float32"):
+        """Open (or create) a store rooted at a directory.
+
+        Args:
+            root: Directory holding one sub-directory per tenant.
+            quantization: Storage format of new segments, one of
+                ``vector_compression.QUANTIZATIONS``. Existing segments keep the
+                format they were written with.
+        """
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization: {quantization}")
+        self.root = root
+        self.quantization = quantization
+        os.makedirs(root, exist_ok=True)
+        self._tenants: Dict[str, _TenantIndex] = {}
+        self._lock = threading.Lock()
+
+    def _tenant(self, name: str, create: bool = True) -> _TenantIndex | None:
+        """Return the index of a tenant, loading it from disk on first use."""
+        name = _UNSAFE_PATH_CHARS.sub("_", name)
+        with self._lock:
+            index = self._tenants.get(name)
+            if index is None:
+                path = os.path.join(self.root, name)
+                if not create and not os.path.isdir(path):
+                    return None
+                index = _TenantIndex(path, self.quantization)
+                self._tenants[name] = index
+            return index
+
+    def _tenants_for(self, filters: Dict[str, Any] | None) -> List[_TenantIndex]:
+        """Return the tenants a filter set can match."""
+        key = tenant_key(filters)
+        if key:
+            index = self._tenant(key, create=False)
+            return [index] if index else []
+        return [
+            self._tenant(name)
+            for name in sorted(os.listdir(self.root))
+            if os.path.isdir(os.path.join(self.root, name))
+        ]
+
+    def _add(self, ids, embeddings, documents, metadatas) -> None:
+        vectors = as_embedding_matrix(embeddings)
+        if len(vectors) != len(ids):
+            raise ValueError("Expected one embedding row per id.")
+
+        groups: Dict[str, List[int]] = {}
+        for i, metadata in enumerate(metadatas):
+            groups.setdefault(tenant_key(metadata) or DEFAULT_TENANT, []).append(i)
+
+        for name, rows in groups.items():
+            self._tenant(name).add(
+                [ids[i] for i in rows],
+                vectors[rows] if len(rows) != len(ids) else vectors,
+                [documents[i] for i in rows],
+                [metadatas[i] for i in rows],
+            )
+
+    def _query(self, query_embeddings, n_results, filters) -> dict:
+        queries = as_embedding_matrix(query_embeddings)
+        merged: List[List[tuple]] = [[] for _ in range(len(queries))]
+        for index in self._tenants_for(filters):
+            for q, hits in enumerate(index.search(queries, n_results, filters)):
+                merged[q].extend(hits)
+
+        result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for hits in merged:
+            hits = sorted(hits, key=lambda hit: hit[0])[:n_results]
+            result["distances"].append([hit[0] for hit in hits])
+            result["ids"].append([hit[1] for hit in hits])
+            result["documents"].append([hit[2] for hit in hits])
+            result["metadatas"].append([hit[3] for hit in hits])
+        return result
+
+    def _get(self, filters, limit, include_embeddings, include_documents) -> dict:
+        rows = []
+        for index in self._tenants_for(filters):
+            rows.extend(index.get(filters, limit - len(rows)))
+            if len(rows) >= limit:
+                break
+        result = {
+            "ids": [segment.ids[row] for segment, row in rows],
+            "metadatas": [segment.metadatas[row] for segment, row in rows],
+        }
+        if include_documents:
+            result["documents"] = [segment.documents[row] for segment, row in rows]
+        if include_embeddings:
+            result["embeddings"] = (
+                np.concatenate([segment.decode([row]) for segment, row in rows])
+                if rows
+                else np.empty((0, 0), dtype=np.float32)
+            )
+        return result
+
+    def _delete(self, ids, filters) -> None:
+        remaining = list(ids)
+        for index in self._tenants_for(filters):
+            if not remaining:
+                break
+            removed = index.delete(remaining)
+            remaining = [i for i in remaining if i not in removed]
+
+    async def add(
+        self,
+        ids: List[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+        """Store embeddings in the index of each document's tenant."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            None, partial(self._add, ids, embeddings, documents, metadatas)
+        )
+
+    async def query(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        n_results: int = 3,
+        filters: Dict[str, Any] | None = None,
+    ) -> dict:
+        """Return the nearest neighbours, searching only the filtered tenant."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, partial(self._query, query_embeddings, n_results, filters)
+        )
+
+    async def get(
+        self,
+        filters: Dict[str, Any] | None = None,
+        limit: int = 1000,
+        include_embeddings: bool = False,
+        include_documents: bool = True,
+    ) -> dict:
+        """Return documents matching the filters."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            partial(self._get, filters, limit, include_embeddings, include_documents),
+        )
+
+    async def delete(
+        self, ids: List[str], filters: Dict[str, Any] | None = None
+    ) -> None:
+        """Delete documents, scanning every tenant unless the filters pin one."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, partial(self._delete, ids, filters))
+
+    async def list_collections(self) -> List[str]:
+        """Return the tenant partitions present on disk."""
+        return sorted(
+            name
+            for name in os.listdir(self.root)
+            if os.path.isdir(os.path.join(self.root, name))
+        )
@@ -0,0 +1,46 @@
+"""
+Move embeddings from the single Chroma collection into per-tenant shards.
+
+Run once after switching ``CHROMA_SHARD_MODE`` to ``tenant`` or ``hashed``:
+
+    python -m app.services.ai.migrate_vector_shards --collection document
+
+Reads keep falling back to the legacy collection while
+``CHROMA_SHARD_LEGACY_FALLBACK`` is on, so the service can stay up during the
+migration; turn the fallback off once this script reports nothing left to move.
+"""
+
+import argparse
+import asyncio
+
+from app.core.settings import settings
+from app.services.ai.chroma_client import ChromaVectorStore
+
+
+async def main(argv: list[str] | None = None) -> int:
+    """Migrate the legacy collection and return the number of moved documents."""
+    parser = argparse.ArgumentParser(description="Migrate Chroma data into shards.")
+    parser.add_argument("--collection", default="document")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument(
+        "--shard-mode",
+        choices=("tenant", "hashed"),
+        default=None,
+        help="Defaults to CHROMA_SHARD_MODE",
+    )
+    args = parser.parse_args(argv)
+
+    store = ChromaVectorStore(args.collection, shard_mode=args.shard_mode)
+    if store.shard_mode == "single":
+        parser.error("Set CHROMA_SHARD_MODE or --shard-mode to tenant or hashed.")
+
+    moved = await store.migrate_legacy_collection(batch_size=args.batch_size)
+    print(
+        f"[ShardMigration] Moved {moved} documents from '{args.collection}' "
+        f"into {store.shard_mode} shards on {settings.chroma_host}:{settings.chroma_port}"
+    )
+    return moved
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
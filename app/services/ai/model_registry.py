@@ -0,0 +1,120 @@
+"""Process-wide, lazily loaded embedding model.
+
+``sentence_transformers`` (and torch behind it) is imported and the model is
+loaded only when something first needs to encode text, never at import time.
+The load runs in a worker thread so the event loop keeps serving requests
+(``/health`` stays responsive while ``/ready`` reports the model as loading),
+and concurrent callers share a single load.
+
+With ``settings.embedding_server_socket`` set, no model is loaded in this
+process at all: the registry hands out a client of the shared embedding server
+(``app.services.ai.embedding_server``). Processes that do load the model apply
+``settings.torch_num_threads``/``torch_num_interop_threads`` first.
+"""
+
+import asyncio
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable
+
+from app.core.settings import settings
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+    from app.services.ai.embedding_server import RemoteEmbeddingModel
+
+
+def load_local_model(model_name: str) -> "SentenceTransformer":
+    """Load the model in this process, with the configured torch thread pools.
+
+    Args:
+        model_name: sentence-transformers model to load.
+    """
+    # pylint: disable=import-outside-toplevel
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    if settings.torch_num_threads:
+        torch.set_num_threads(settings.torch_num_threads)
+    if settings.torch_num_interop_threads:
+        try:
+            torch.set_num_interop_threads(settings.torch_num_interop_threads)
+        except RuntimeError as e:
+            # Only allowed before torch runs any parallel work.
+            print(f"[ModelRegistry] Could not set interop threads: {e}")
+    return SentenceTransformer(model_name)
+
+
+def load_embedding_model(
+    model_name: str,
+) -> "SentenceTransformer | RemoteEmbeddingModel":
+    """Return the shared embedding server's client if configured, else load locally.
+
+    Args:
+        model_name: sentence-transformers model to load locally.
+    """
+    if settings.embedding_server_socket:
+        # pylint: disable-next=import-outside-toplevel
+        from app.services.ai.embedding_server import RemoteEmbeddingModel
+
+        return RemoteEmbeddingModel(settings.embedding_server_socket).wait_ready(
+            settings.embedding_server_wait_secs
+        )
+    return load_local_model(model_name)
+
+
+class ModelRegistry:
+    """Loads one embedding model on first use and hands out the shared instance."""
+
+    def __init__(
+        self,
+        model_name: str,
+        loader: Callable[[str], Any] = load_embedding_model,
+    ):
+        """Initialize the registry without loading anything.
+
+        Args:
+            model_name: sentence-transformers model to load.
+            loader: Builds the model from its name; replaceable in tests.
+        """
+        self.model_name = model_name
+        self._loader = loader
+        self._model = None
+        self._lock = threading.Lock()
+        self.load_error: Exception | None = None
+        self.load_secs: float | None = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the model is ready to encode."""
+        return self._model is not None
+
+    def load(self) -> "SentenceTransformer":
+        """Return the model, loading it in the calling thread if needed."""
+        if self._model is not None:
+            return self._model
+
+        with self._lock:
+            if self._model is None:
+                print(f"[ModelRegistry] Loading embedding model {self.model_name}…")
+                start = time.perf_counter()
+                try:
+                    self._model = self._loader(self.model_name)
+                except Exception as e:
+                    self.load_error = e
+                    print(f"[ModelRegistry] Failed to load {self.model_name}: {e}")
+                    raise
+                self.load_error = None
+                self.load_secs = time.perf_counter() - start
+                print(f"[ModelRegistry] Model loaded in {self.load_secs:.1f}s")
+        return self._model
+
+    async def get(self) -> "SentenceTransformer":
+        """Return the model, loading it in a worker thread if needed."""
+        if self._model is not None:
+            return self._model
+        return await asyncio.to_thread(self.load)
+
+
+model_registry = ModelRegistry(settings.embedding_model_name)
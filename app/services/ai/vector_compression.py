@@ -0,0 +1,137 @@
+"""Vector compression used by the embedding pipeline and the local vector store.
+
+Two independent, composable techniques:
+
+* Quantization (storage only, ``LocalVectorStore``): ``float16`` halves the
+  size of each vector. ``int8`` stores one signed byte per component plus one
+  float32 scale per vector (symmetric, per-vector max-abs scaling), so a
+  768-dim vector takes 772 bytes instead of 3072.
+* PCA reduction (``PcaProjection``): a linear projection fitted on a sample of
+  our own embeddings. It is applied to stored vectors *and* to query vectors by
+  ``ChromaClient``, so it works with every backend.
+"""
+
+import os
+from typing import Tuple
+
+import numpy as np
+
+QUANTIZATIONS = ("float32", "float16", "int8")
+
+
+def quantize(vectors: np.ndarray, mode: str) -> Tuple[np.ndarray, np.ndarray | None]:
+    """Encode float32 vectors for storage.
+
+    Args:
+        vectors: Matrix of shape ``(n, dim)``.
+        mode: One of ``QUANTIZATIONS``.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray | None]: The codes, and the per-vector
+        float32 scales for ``int8`` (None otherwise).
+    """
+    if mode == "float32":
+        return np.ascontiguousarray(vectors, dtype=np.float32), None
+    if mode == "float16":
+        return vectors.astype(np.float16), None
+    if mode == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    raise ValueError(f"Unknown quantization: {mode}")
+
+
+def dequantize(codes: np.ndarray, scales: np.ndarray | None) -> np.ndarray:
+    """Decode stored codes back to float32 vectors.
+
+    Args:
+        codes: Stored matrix (float32, float16 or int8).
+        scales: Per-vector scales for int8 codes.
+
+    Returns:
+        np.ndarray: float32 matrix of the same shape.
+    """
+    vectors = codes.astype(np.float32)
+    if scales is not None:
+        vectors *= scales[:, None]
+    return vectors
+
+
+def bytes_per_vector(dim: int, mode: str) -> int:
+    """Return the storage size of one vector, including its scale."""
+    if mode == "int8":
+        return dim + 4
+    return dim * np.dtype(mode).itemsize
+
+
+class PcaProjection:
+    """Mean-centred PCA projection onto the top principal components."""
+
+    def __init__(self, mean: np.ndarray, components: np.ndarray):
+        """Create a projection from fitted parameters.
+
+        Args:
+            mean: Sample mean of shape ``(dim,)``.
+            components: Orthonormal rows of shape ``(n_components, dim)``.
+        """
+        self.mean = mean.astype(np.float32)
+        self.components = np.ascontiguousarray(components, dtype=np.float32)
+
+    @property
+    def input_dim(self) -> int:
+        """Dimension of the encoder output."""
+        return self.components.shape[1]
+
+    @property
+    def output_dim(self) -> int:
+        """Dimension of the projected vectors."""
+        return self.components.shape[0]
+
+    @classmethod
+    def fit(cls, sample: np.ndarray, n_components: int) -> "PcaProjection":
+        """Fit the projection on a sample of embeddings.
+
+        Args:
+            sample: Matrix of shape ``(n, dim)`` with ``n >= n_components``.
+            n_components: Number of dimensions to keep.
+
+        Returns:
+            PcaProjection: The fitted projection.
+        """
+        sample = np.asarray(sample, dtype=np.float32)
+        if not 0 < n_components <= min(sample.shape):
+            raise ValueError(
+                f"n_components must be between 1 and {min(sample.shape)}, "
+                f"got {n_components}."
+            )
+        mean = sample.mean(axis=0)
+        _, _, vt = np.linalg.svd(sample - mean, full_matrices=False)
+        return cls(mean, vt[:n_components])
+
+    def explained_variance_ratio(self, sample: np.ndarray) -> float:
+        """Return the share of the sample's variance kept by the projection."""
+        centred = np.asarray(sample, dtype=np.float32) - self.mean
+        total = float((centred**2).sum())
+        kept = float(((centred @ self.components.T) ** 2).sum())
+        return kept / total if total else 1.0
+
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        """Project vectors of shape ``(n, input_dim)`` to ``(n, output_dim)``."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.shape[-1] != self.input_dim:
+            raise ValueError(
+                f"Expected {self.input_dim}-dim vectors, got {vectors.shape[-1]}."
+            )
+        return np.ascontiguousarray((vectors - self.mean) @ self.components.T)
+
+    def save(self, path: str) -> None:
+        """Write the projection to an ``.npz`` file."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez(path, mean=self.mean, components=self.components)
+
+    @classmethod
+    def load(cls, path: str) -> "PcaProjection":
+        """Read a projection written by ``save``."""
+        with np.load(path) as data:
+            return cls(data["mean"], data["components"])
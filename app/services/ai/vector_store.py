@@ -0,0 +1,173 @@
+"""Storage-agnostic interface for the vector stores behind ``ChromaClient``.
+
+Backends receive plain equality filters (``{"workspace_id": 1, "file_id": "7"}``);
+a list value means "any of". Results use the Chroma response layout so callers
+do not depend on the backend in use.
+
+Embeddings travel as contiguous float32 ``np.ndarray`` matrices from the encoder
+to the backend; lists of floats are accepted but not produced anywhere.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+
+class VectorStore(ABC):
+    """Async add/query/get/delete surface shared by all vector store backends."""
+
+    @abstractmethod
+    async def add(
+        self,
+        ids: List[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+        """Store embeddings with their documents and metadata.
+
+        Args:
+            ids: Unique identifiers, one per embedding.
+            embeddings: Vectors to store.
+            documents: Source text of each vector.
+            metadatas: Metadata of each vector, used for filtering.
+        """
+
+    @abstractmethod
+    async def query(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        n_results: int = 3,
+        filters: Dict[str, Any] | None = None,
+    ) -> dict:
+        """Return the nearest neighbours of each query embedding.
+
+        Args:
+            query_embeddings: One or more query vectors.
+            n_results: Number of neighbours per query.
+            filters: Metadata equality filters.
+
+        Returns:
+            dict: ``ids``, ``documents``, ``metadatas`` and ``distances``, each a
+            list with one inner list per query embedding.
+        """
+
+    @abstractmethod
+    async def get(
+        self,
+        filters: Dict[str, Any] | None = None,
+        limit: int = 1000,
+        include_embeddings: bool = False,
+        include_documents: bool = True,
+    ) -> dict:
+        """Return stored documents matching the filters, without ranking.
+
+        Args:
+            filters: Metadata equality filters.
+            limit: Maximum number of results.
+            include_embeddings: Also return the stored vectors.
+            include_documents: Return the document text; scans that only need
+                metadata turn it off.
+
+        Returns:
+            dict: Flat ``ids``, ``documents`` (when requested) and ``metadatas``
+            lists, plus an ``embeddings`` float32 matrix when requested.
+        """
+
+    @abstractmethod
+    async def delete(
+        self, ids: List[str], filters: Dict[str, Any] | None = None
+    ) -> None:
+        """Delete documents by id.
+
+        Args:
+            ids: Identifiers to delete.
+            filters: Metadata the deleted documents share; backends that partition
+                data use it to avoid scanning every partition.
+        """
+
+    @abstractmethod
+    async def list_collections(self) -> List[str]:
+        """Return the names of the collections (or partitions) in the store."""
+
+
+def as_embedding_matrix(embeddings: Sequence[Sequence[float]]) -> np.ndarray:
+    """Return embeddings as a 2-D contiguous float32 array.
+
+    Float32 arrays that are already contiguous (what the encoder returns) are
+    passed through without a copy.
+
+    Args:
+        embeddings: Encoder output, a 2-D array or a list of vectors.
+
+    Returns:
+        np.ndarray: Array of shape ``(n, dim)``.
+    """
+    return np.ascontiguousarray(np.atleast_2d(embeddings), dtype=np.float32)
+
+
+def build_where(filters: Dict[str, Any] | None) -> dict | None:
+    """Translate equality filters into a Chroma ``where`` clause.
+
+    Args:
+        filters: Metadata filters; list values become ``$in`` conditions.
+
+    Returns:
+        dict | None: Chroma ``where`` clause, or None when there are no filters.
+    """
+    if not filters:
+        return None
+
+    conditions = [
+        {key: {"$in": value} if isinstance(value, list) else {"$eq": value}}
+        for key, value in filters.items()
+    ]
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+
+def tenant_key(values: Dict[str, Any] | None) -> str | None:
+    """Return the tenant a document or filter set belongs to.
+
+    Workspace files are partitioned by workspace, chat files by their owner.
+
+    Args:
+        values: Document metadata or query filters.
+
+    Returns:
+        str | None: Tenant key, or None when the values do not pin one tenant.
+    """
+    if not values:
+        return None
+    for field, prefix in (("workspace_id", "workspace"), ("user_id", "user")):
+        value = values.get(field)
+        if value is not None and not isinstance(value, list):
+            return f"{prefix}_{value}"
+    return None
+
+
+def merge_query_results(results: List[dict], n_results: int, n_queries: int) -> dict:
+    """Merge query responses from several collections by ascending distance.
+
+    Args:
+        results: Chroma-style query responses.
+        n_results: Number of neighbours to keep per query.
+        n_queries: Number of query embeddings in each response.
+
+    Returns:
+        dict: A single response with ``ids``, ``documents``, ``metadatas`` and
+        ``distances``.
+    """
+    keys = ("ids", "documents", "metadatas", "distances")
+    merged = {key: [] for key in keys}
+    for q in range(n_queries):
+        hits = []
+        for result in results:
+            hits.extend(zip(*(result[key][q] for key in keys)))
+        hits.sort(key=lambda hit: hit[3])
+        hits = hits[:n_results]
+        for position, key in enumerate(keys):
+            merged[key].append([hit[position] for hit in hits])
+    return merged
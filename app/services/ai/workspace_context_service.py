@@ -1,18 +1,33 @@
 """Service to extract and compile context from workspace files stored in ChromaDB."""
 
+import numpy as np
+
+from app.core.settings import settings
+from app.services.ai.context_assembly import (
+    ChunkStore,
+    assemble_file_sections,
+    format_file_section,
+)
 from app.services.ai.embedding_service import EmbeddingService
 
 
 class WorkspaceContextService:
     """Service to compile context from embeddings of all files in a workspace."""
 
-    def __init__(self, embedding_service: EmbeddingService):
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        chunk_store: ChunkStore | None = None,
+    ):
         """Initialize the workspace context service.
 
         Args:
             embedding_service: Service for querying embeddings from ChromaDB.
+            chunk_store: Cache of file chunks used to widen hits to their
+                neighbours (``settings.context_neighbour_window``).
         """
         self.embedding_service = embedding_service
+        self.chunk_store = chunk_store
 
     async def get_workspace_file_context(
         self,
@@ -20,30 +35,40 @@ class WorkspaceContextService:
         query_text: str,
         n_results: int = 3,
         max_tokens: int = 10000,
+        query_vec: np.ndarray | None = None,
     ) -> str:
         """Retrieve relevant semantic context from all workspace files.
 
         Queries ChromaDB for the most relevant text chunks across all files
-        in the specified workspace based on semantic similarity.
+        in the specified workspace based on semantic similarity. Chunks of the
+        same file are stitched into contiguous spans without duplicated overlap.
+        With ``settings.context_compression`` only the sentences closest to the
+        query are kept.
 
         Args:
             workspace_id: Workspace identifier.
             query_text: Query string for semantic search.
             n_results: Number of top results to return per query (default: 3).
             max_tokens: Maximum character length of returned context (default: 10000).
+            query_vec: Already encoded ``query_text``; encoded here when omitted.
 
         Returns:
             str: Formatted context string with relevant file excerpts,
             or empty string if no results.
         """
+        if query_vec is None:
+            query_vec = await self.embedding_service.encode_query(query_text)
+
         result = await self.embedding_service.query_workspace_context(
             workspace_id=workspace_id,
             query_text=query_text,
             n_results=n_results,
+            query_vec=query_vec,
         )
 
         documents = result.get("documents", [[]])[0]
         metadatas = result.get("metadatas", [[]])[0]
+        distances = (result.get("distances") or [[]])[0] or [0.0] * len(documents)
 
         if not documents:
             print(
@@ -55,17 +80,19 @@ class WorkspaceContextService:
             f"[WorkspaceContext] Found {len(documents)} for workspace_id={workspace_id}"
         )
 
-        file_groups = {}
-        for doc, meta in zip(documents, metadatas):
-            file_name = meta.get("file_name", "Unknown")
-            if file_name not in file_groups:
-                file_groups[file_name] = []
-            file_groups[file_name].append(doc)
-
-        context_parts = []
-        for file_name, docs in file_groups.items():
-            file_context = f"📄 File: {file_name}\n" + "\n---\n".join(docs)
-            context_parts.append(file_context)
+        sections = await assemble_file_sections(
+            documents,
+            metadatas,
+            scope={"workspace_id": workspace_id},
+            chunk_store=self.chunk_store,
+            neighbour_window=settings.context_neighbour_window,
+        )
+        sections = await self.embedding_service.compress_context(
+            sections, query_vec, distances=list(zip(documents, distances))
+        )
+        context_parts = [
+            format_file_section(file_name, spans) for file_name, spans in sections
+        ]
 
         context = "\n\n===========================\n\n".join(context_parts)
 
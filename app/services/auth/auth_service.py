@@ -1,22 +1,92 @@
 """Service for user authentication and verification."""
 
 import json
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
 import jwt
+from app.core.metrics import AUTH_TOKEN_CACHE_LOOKUPS_TOTAL
 from app.core.settings import settings
 
 
+class VerifiedTokenCache:
+    """LRU cache of session tokens whose signature has already been checked.
+
+    A browser sends the same session cookie with every request, so decoding it
+    once per ``ttl_secs`` is enough. Entries never outlive the token's own
+    ``exp``; invalid tokens are not cached.
+    """
+
+    def __init__(self, max_entries: int, ttl_secs: float):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Number of tokens kept.
+            ttl_secs: Longest time a token is trusted without decoding it again.
+        """
+        self.max_entries = max_entries
+        self.ttl_secs = ttl_secs
+        self._tokens: OrderedDict[str, Tuple[float, dict]] = OrderedDict()
+
+    def get(self, token: str) -> Optional[dict]:
+        """Return a copy of the token's user, if cached and not expired."""
+        cached = self._tokens.get(token)
+        if cached is None:
+            return None
+        if cached[0] <= time.time():
+            del self._tokens[token]
+            return None
+        self._tokens.move_to_end(token)
+        return dict(cached[1])
+
+    def put(self, token: str, user: dict, exp: Optional[float] = None) -> None:
+        """Cache a verified token.
+
+        Args:
+            token: The encoded token.
+            user: Its decoded user.
+            exp: The token's ``exp`` claim (seconds since the epoch), if any.
+        """
+        if self.max_entries <= 0:
+            return
+        expires_at = time.time() + self.ttl_secs
+        if exp is not None:
+            expires_at = min(expires_at, float(exp))
+        self._tokens[token] = (expires_at, dict(user))
+        self._tokens.move_to_end(token)
+        while len(self._tokens) > self.max_entries:
+            self._tokens.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget every cached token."""
+        self._tokens.clear()
+
+
+verified_tokens = VerifiedTokenCache(
+    settings.auth_token_cache_size, settings.auth_token_cache_ttl_secs
+)
+
+
 async def verify_user(token: str) -> dict | None:
     """
-    Verify the user token by calling the user service.
+    Verify the user token, from the verified-token cache when possible.
     Args:
         token (str): The user token to verify.
     Returns user data if the token is valid, otherwise None.
     """
+    user_data = verified_tokens.get(token)
+    if user_data is not None:
+        AUTH_TOKEN_CACHE_LOOKUPS_TOTAL.labels(result="hit").inc()
+        return user_data
+    AUTH_TOKEN_CACHE_LOOKUPS_TOTAL.labels(result="miss").inc()
+
     try:
         payload = jwt.decode(token, settings.jwt_secret_key, algorithms=["HS256"])
         user_data = json.loads(payload["sub"])
-        return user_data
     except jwt.ExpiredSignatureError:
         return None
     except jwt.InvalidTokenError:
         return None
+    verified_tokens.put(token, user_data, payload.get("exp"))
+    return user_data
@@ -2,9 +2,11 @@
 Chat service module handling conversations and messages.
 """
 
-from typing import Optional, List
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import decode_cursor, encode_cursor
 from app.repositories.conversation_repository import ConversationRepository
 from app.repositories.message_repository import MessageRepository
 
@@ -37,6 +39,84 @@ class ChatService:
         )
         return conversations
 
+    async def get_conversation(self, conversation_id: int):
+        """
+        Get a conversation by its ID, or None if it does not exist.
+        """
+        return await self.conversation_repo.get_conversation(conversation_id)
+
+    async def list_conversations(
+        self, user_id: int, cursor: Optional[str] = None, limit: int = 50
+    ) -> Tuple[List, Optional[str]]:
+        """
+        Get one page of the user's conversations, newest first.
+
+        Args:
+            user_id: Owner of the conversations.
+            cursor: ``next_cursor`` of the previous page; None for the first.
+            limit: Page size.
+
+        Returns:
+            Tuple[List, Optional[str]]: The conversations and the cursor of the
+            next page, or None on the last page.
+
+        Raises:
+            ValueError: If the cursor is invalid.
+        """
+        before = tuple(decode_cursor(cursor, (datetime, int))) if cursor else None
+        rows = await self.conversation_repo.list_by_user(user_id, limit + 1, before)
+        if len(rows) <= limit:
+            return rows, None
+        last = rows[limit - 1]
+        return rows[:limit], encode_cursor(last.created_at, last.id)
+
+    async def list_messages(
+        self, conversation_id: int, cursor: Optional[str] = None, limit: int = 50
+    ) -> Tuple[List, Optional[str]]:
+        """
+        Get one page of a conversation's messages, oldest first.
+
+        Args:
+            conversation_id: Conversation to read.
+            cursor: ``next_cursor`` of the previous page; None for the first.
+            limit: Page size.
+
+        Returns:
+            Tuple[List, Optional[str]]: The messages and the cursor of the next
+            page, or None on the last page.
+
+        Raises:
+            ValueError: If the cursor is invalid.
+        """
+        (after_id,) = decode_cursor(cursor, (int,)) if cursor else (None,)
+        rows = await self.message_repo.list_by_conversation(
+            conversation_id, limit + 1, after_id
+        )
+        if len(rows) <= limit:
+            return rows, None
+        return rows[:limit], encode_cursor(rows[limit - 1].id)
+
+    async def iter_messages(
+        self, conversation_id: int, page_size: int = 500
+    ) -> AsyncIterator:
+        """
+        Yield every message of a conversation, oldest first, one page at a time.
+
+        Each page is a short keyset query, and yielded messages are expunged
+        from the session, so memory stays bounded by ``page_size``.
+        """
+        after_id = None
+        while True:
+            rows = await self.message_repo.list_by_conversation(
+                conversation_id, page_size, after_id
+            )
+            for message in rows:
+                yield message
+            self.db.expunge_all()
+            if len(rows) < page_size:
+                return
+            after_id = rows[-1].id
+
     async def create_message(self, conversation_id: int, prompt: str, user_id: int):
         """
         Create a new message in a conversation.
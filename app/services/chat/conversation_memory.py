@@ -0,0 +1,220 @@
+"""
+Bounded conversation memory built on the ``messages`` table.
+
+The prompt of a chat turn gets the last ``conversation_memory_turns`` answered
+messages verbatim (each side truncated to ``conversation_memory_turn_chars``)
+plus a rolling summary of everything older, stored per conversation in
+``conversation_summaries``. Its size therefore stays roughly constant however
+long the conversation gets.
+
+The summary is never computed on the request path: after a turn is written,
+``schedule_update`` folds turns that left the verbatim window into the summary
+in a background task, ``conversation_summary_batch_turns`` at a time, so
+until a batch is full the oldest few turns outside the window are in neither
+part of the memory.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Set
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.settings import settings
+from app.models.message import Message
+from app.repositories.conversation_summary_repository import (
+    ConversationSummaryRepository,
+)
+from app.repositories.message_repository import MessageRepository
+from app.services.chat.turn_writer import PendingTurn
+from prompts.assistant_prompt_v1 import CONVERSATION_SUMMARY_PROMPT_V1
+
+Summarizer = Callable[[str, List[Message]], Awaitable[str]]
+
+# Most older turns handed to the summarizer in one call.
+_MAX_TURNS_PER_CALL = 40
+
+
+def _clip(text: Optional[str], limit: int) -> str:
+    text = (text or "").strip()
+    return text if len(text) <= limit else text[: limit - 1].rstrip() + "…"
+
+
+def render_turns(turns: Sequence[Message | PendingTurn], turn_chars: int) -> str:
+    """Render messages as alternating ``User:``/``Assistant:`` lines."""
+    lines = []
+    for turn in turns:
+        lines.append(f"User: {_clip(turn.prompt, turn_chars)}")
+        lines.append(f"Assistant: {_clip(turn.response, turn_chars)}")
+    return "\n".join(lines)
+
+
+class GeminiSummarizer:
+    """Folds turns into a summary with a Gemini call."""
+
+    def __init__(self, max_chars: int, turn_chars: int):
+        self.max_chars = max_chars
+        self.turn_chars = turn_chars
+        self._client = None
+
+    async def __call__(self, previous: str, turns: List[Message]) -> str:
+        if self._client is None:
+            # pylint: disable-next=import-outside-toplevel
+            from app.services.ai.gemini_client import GeminiClient
+
+            self._client = GeminiClient()
+        prompt = (
+            f"Current summary:\n{previous or '(empty)'}\n\n"
+            f"New messages:\n{render_turns(turns, self.turn_chars)}"
+        )
+        return await self._client.generate(
+            prompt,
+            system_instruction=CONVERSATION_SUMMARY_PROMPT_V1.format(
+                max_chars=self.max_chars
+            ),
+        )
+
+
+class ConversationMemory:
+    """Builds the memory section of a prompt and keeps summaries up to date."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        summarizer: Summarizer | None = None,
+        recent_turns: int = settings.conversation_memory_turns,
+        turn_chars: int = settings.conversation_memory_turn_chars,
+        summary_max_chars: int = settings.conversation_summary_max_chars,
+        batch_turns: int = settings.conversation_summary_batch_turns,
+    ):
+        """Initialize the memory.
+
+        Args:
+            session_factory: Opens the sessions of background summary updates.
+            summarizer: ``(previous_summary, turns) -> summary``; defaults to
+                a Gemini call.
+            recent_turns: Turns kept verbatim; 0 disables memory.
+            turn_chars: Limit of each prompt and response in the verbatim part.
+            summary_max_chars: Limit of the stored summary.
+            batch_turns: Older turns that must accumulate before the summary
+                is updated.
+        """
+        self.session_factory = session_factory
+        self.summarizer = summarizer or GeminiSummarizer(summary_max_chars, turn_chars)
+        self.recent_turns = recent_turns
+        self.turn_chars = turn_chars
+        self.summary_max_chars = summary_max_chars
+        self.batch_turns = batch_turns
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._dirty: Set[int] = set()
+
+    async def build(
+        self,
+        db: AsyncSession,
+        conversation_id: int,
+        before_message_id: Optional[int] = None,
+        pending: Sequence[PendingTurn] = (),
+    ) -> str:
+        """Return the memory of a conversation.
+
+        Costs two indexed queries and no model calls.
+
+        Args:
+            db: Session of the request.
+            conversation_id: Conversation of the turn.
+            before_message_id: Leave out this message and anything newer.
+            pending: Turns recorded by ``ChatTurnWriter`` that may not be
+                committed yet; they follow the stored ones.
+
+        Returns:
+            str: Summary and recent turns, or ``""`` for a new conversation.
+        """
+        if self.recent_turns <= 0:
+            return ""
+        stored = await ConversationSummaryRepository(db).get(conversation_id)
+        turns = await MessageRepository(db).list_recent_turns(
+            conversation_id, self.recent_turns, before_id=before_message_id
+        )
+        stored_ids = {turn.id for turn in turns}
+        unsaved = [
+            turn
+            for turn in pending
+            if turn.status == "completed" and turn.message_id not in stored_ids
+        ]
+        turns = [*turns, *unsaved][-self.recent_turns :]
+
+        sections = []
+        if stored and stored.summary:
+            sections.append(f"Summary of earlier messages:\n{stored.summary}")
+        if turns:
+            sections.append(f"Recent messages:\n{render_turns(turns, self.turn_chars)}")
+        return "\n\n".join(sections)
+
+    def schedule_update(self, conversation_id: int) -> None:
+        """Update the conversation's summary in the background.
+
+        At most one update runs per conversation; a request arriving while one
+        runs makes it check again when it finishes.
+        """
+        if self.recent_turns <= 0:
+            return
+        if conversation_id in self._tasks:
+            self._dirty.add(conversation_id)
+            return
+        self._tasks[conversation_id] = asyncio.create_task(
+            self._run_updates(conversation_id)
+        )
+
+    async def _run_updates(self, conversation_id: int) -> None:
+        try:
+            while True:
+                self._dirty.discard(conversation_id)
+                async with self.session_factory() as session:
+                    await self.update(session, conversation_id)
+                if conversation_id not in self._dirty:
+                    return
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            print(
+                f"[ConversationMemory] Summary update failed for {conversation_id}: {e}"
+            )
+        finally:
+            self._tasks.pop(conversation_id, None)
+            self._dirty.discard(conversation_id)
+
+    async def update(self, db: AsyncSession, conversation_id: int) -> int:
+        """Fold answered turns older than the verbatim window into the summary.
+
+        Args:
+            db: Session to read and write with.
+            conversation_id: Conversation to summarize.
+
+        Returns:
+            int: Number of turns folded in.
+        """
+        messages = MessageRepository(db)
+        summaries = ConversationSummaryRepository(db)
+        window = await messages.list_recent_turns(conversation_id, self.recent_turns)
+        if len(window) < self.recent_turns:
+            return 0
+
+        stored = await summaries.get(conversation_id)
+        summary = stored.summary if stored else ""
+        through_id = stored.summarized_through_id if stored else 0
+        folded = 0
+        while True:
+            pending = await messages.list_turns_between(
+                conversation_id, through_id, window[0].id, _MAX_TURNS_PER_CALL
+            )
+            if len(pending) < self.batch_turns:
+                return folded
+            summary = _clip(
+                await self.summarizer(summary, pending), self.summary_max_chars
+            )
+            through_id = pending[-1].id
+            await summaries.save(conversation_id, summary, through_id)
+            folded += len(pending)
+
+    async def close(self) -> None:
+        """Cancel running background updates."""
+        for task in list(self._tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
@@ -0,0 +1,247 @@
+"""
+Write-behind persistence of chat turns.
+
+``ChatTurnWriter.record`` appends a finished turn (prompt and response) to an
+in-process buffer and returns immediately; a background task writes the
+buffer as one multi-row INSERT every ``chat_turn_flush_interval_ms``, or as
+soon as ``chat_turn_flush_max_batch`` turns are waiting. Chat replies thus
+never wait on the database, and a turn costs one pooled connection per batch
+instead of two commits.
+
+Turns live only in memory until flushed: a flush that fails because the
+database is unreachable is retried on the next tick, the buffer is bounded by
+``chat_turn_buffer_max`` (oldest turns are dropped and counted beyond that),
+and ``stop`` drains what is left on shutdown. A batch the database rejects is
+retried one turn at a time, so a turn that can never be written (e.g. a NUL
+byte in a PostgreSQL ``text`` column) is dropped alone instead of blocking
+every turn queued behind it. A process killed outright loses at most one flush interval of turns.
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import (
+    CHAT_TURN_FLUSH_FAILURES_TOTAL,
+    CHAT_TURN_FLUSH_SECONDS,
+    CHAT_TURNS_BUFFERED,
+    CHAT_TURNS_DROPPED_TOTAL,
+)
+from app.core.settings import settings
+from app.models.message import Message
+
+
+@dataclass
+class PendingTurn:
+    """A chat turn waiting to be written.
+
+    ``message_id`` is set as soon as the INSERT returns, before the commit,
+    so readers can tell a flushed turn from its database row.
+    """
+
+    conversation_id: int
+    user_id: int
+    prompt: str
+    response: Optional[str]
+    status: str
+    message_id: Optional[int] = None
+
+
+class ChatTurnWriter:
+    """Buffers chat turns and writes them to ``messages`` in batches."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        on_flush: Callable[[int], None] | None = None,
+        flush_interval_ms: int = settings.chat_turn_flush_interval_ms,
+        max_batch: int = settings.chat_turn_flush_max_batch,
+        max_buffered: int = settings.chat_turn_buffer_max,
+    ):
+        """Initialize the writer.
+
+        Args:
+            session_factory: Opens the session of each flush.
+            on_flush: Called with each conversation id whose turns were just
+                committed.
+            flush_interval_ms: Longest time a turn waits in the buffer.
+            max_batch: Turns per INSERT; a full batch is flushed right away.
+            max_buffered: Turns kept while the database is unreachable.
+        """
+        self.session_factory = session_factory
+        self.on_flush = on_flush
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch = max_batch
+        self.max_buffered = max_buffered
+        self._buffer: Deque[PendingTurn] = deque()
+        self._flushing: List[PendingTurn] = []
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._task: asyncio.Task | None = None
+
+    def record(
+        self,
+        conversation_id: int,
+        user_id: int,
+        prompt: str,
+        response: Optional[str],
+        status: str = "completed",
+    ) -> PendingTurn:
+        """Queue a turn for writing without waiting for the database."""
+        turn = PendingTurn(conversation_id, user_id, prompt, response, status)
+        if len(self._buffer) >= self.max_buffered:
+            self._buffer.popleft()
+            CHAT_TURNS_DROPPED_TOTAL.labels(reason="buffer_full").inc()
+            print("[ChatTurnWriter] Buffer full; dropped the oldest turn.")
+        self._buffer.append(turn)
+        CHAT_TURNS_BUFFERED.set(len(self._buffer))
+        if len(self._buffer) >= self.max_batch:
+            self._wake.set()
+        return turn
+
+    def pending_turns(self, conversation_id: int) -> List[PendingTurn]:
+        """Return the conversation's turns that may not be committed yet, oldest first."""
+        return [
+            turn
+            for turn in (*self._flushing, *self._buffer)
+            if turn.conversation_id == conversation_id
+        ]
+
+    async def start(self) -> None:
+        """Start the background flush task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush task and write every buffered turn."""
+        self._stopping = True
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        if not await self.flush():
+            print(f"[ChatTurnWriter] {len(self._buffer)} turns lost on shutdown.")
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self) -> bool:
+        """Write buffered turns in batches of ``max_batch``.
+
+        Returns:
+            bool: ``False`` if the database was unreachable; the unwritten
+            turns stay buffered for a retry.
+        """
+        while self._buffer:
+            batch = [
+                self._buffer.popleft()
+                for _ in range(min(self.max_batch, len(self._buffer)))
+            ]
+            self._flushing = batch
+            start = time.perf_counter()
+            try:
+                written = await self._write_batch(batch)
+            finally:
+                self._flushing = []
+                CHAT_TURNS_BUFFERED.set(len(self._buffer))
+            if written is None:
+                return False
+            CHAT_TURN_FLUSH_SECONDS.observe(time.perf_counter() - start)
+
+            if self.on_flush is not None:
+                for conversation_id in dict.fromkeys(
+                    t.conversation_id for t in written
+                ):
+                    self.on_flush(conversation_id)
+        return True
+
+    async def _write_batch(
+        self, batch: List[PendingTurn]
+    ) -> Optional[List[PendingTurn]]:
+        """Write a batch, falling back to one turn at a time if it is rejected.
+
+        Returns:
+            Optional[List[PendingTurn]]: The written turns, or None if the
+            database was unreachable and the unwritten turns were requeued.
+        """
+        try:
+            await self._write(batch)
+            return batch
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            CHAT_TURN_FLUSH_FAILURES_TOTAL.inc()
+            print(f"[ChatTurnWriter] Flush of {len(batch)} turns failed: {e}")
+            if _is_transient(e):
+                self._requeue(batch)
+                return None
+
+        written = []
+        for position, turn in enumerate(batch):
+            try:
+                await self._write([turn])
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                if _is_transient(e):
+                    self._requeue(batch[position:])
+                    return None
+                turn.message_id = None
+                CHAT_TURNS_DROPPED_TOTAL.labels(reason="rejected").inc()
+                print(
+                    f"[ChatTurnWriter] Dropped turn of conversation "
+                    f"{turn.conversation_id} rejected by the database: {e}"
+                )
+                continue
+            written.append(turn)
+        return written
+
+    def _requeue(self, turns: List[PendingTurn]) -> None:
+        """Put unwritten turns back at the front of the buffer, in order."""
+        for turn in turns:
+            turn.message_id = None
+        self._buffer.extendleft(reversed(turns))
+
+    async def _write(self, batch: List[PendingTurn]) -> None:
+        async with self.session_factory() as session:
+            result = await session.execute(
+                insert(Message).returning(Message.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "conversation_id": turn.conversation_id,
+                        "user_id": turn.user_id,
+                        "prompt": turn.prompt,
+                        "response": turn.response,
+                        "status": turn.status,
+                    }
+                    for turn in batch
+                ],
+            )
+            for turn, message_id in zip(batch, result.scalars().all()):
+                turn.message_id = message_id
+            await session.commit()
+
+
+def _is_transient(error: Exception) -> bool:
+    """Return whether a failed write may succeed later unchanged."""
+    if isinstance(error, DBAPIError) and error.connection_invalidated:
+        return True
+    return isinstance(
+        error,
+        (
+            OperationalError,
+            InterfaceError,
+            PoolTimeoutError,
+            OSError,
+            asyncio.TimeoutError,
+        ),
+    )
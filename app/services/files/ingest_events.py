@@ -0,0 +1,124 @@
+"""In-process bus of chat file processing events.
+
+``EmbeddingService`` publishes an ``IngestEvent`` whenever a chat file changes
+stage (``queued``, ``extracting``, ``embedding``, ``completed`` or
+``failed``); ``GET /conversations/upload/events`` pushes them to the uploading
+user as Server-Sent Events, so clients no longer need to poll.
+
+The bus also remembers the latest status of every file it has seen, which is
+what the polling endpoint answers from: statuses of files still being
+processed here are kept until the file finishes, finished ones and ones read
+from the database for ``ingest_status_cache_ttl_secs``.
+
+Events only reach subscribers of the process that runs the ingestion. With
+``ingestion_enabled_in_api`` off, chat files are embedded by ``app.worker``
+and API processes only see the ``queued`` event; clients then rely on the
+polling endpoint, whose cache falls back to the database.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+from app.core.settings import settings
+
+TERMINAL_STATUSES = frozenset({"completed", "failed"})
+
+
+@dataclass(frozen=True)
+class IngestEvent:
+    """Processing status of a chat file."""
+
+    file_id: str
+    user_id: int
+    status: str
+    progress: float = 0.0
+    detail: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        """Return the event as sent to clients."""
+        return asdict(self)
+
+
+class IngestEventBus:
+    """Fan-out of ingest events to per-user subscribers, plus a status cache."""
+
+    def __init__(
+        self,
+        ttl_secs: float = settings.ingest_status_cache_ttl_secs,
+        max_files: int = settings.ingest_status_cache_max_files,
+        queue_size: int = settings.ingest_events_queue_size,
+    ):
+        """Initialize the bus.
+
+        Args:
+            ttl_secs: Lifetime of cached statuses of finished files and of
+                statuses read from the database.
+            max_files: Number of file statuses kept in memory.
+            queue_size: Events buffered per subscriber; a slow subscriber
+                loses its oldest events beyond that.
+        """
+        self.ttl_secs = ttl_secs
+        self.max_files = max_files
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._latest: OrderedDict[str, Tuple[float, IngestEvent]] = OrderedDict()
+
+    def publish(self, event: IngestEvent, expires: bool | None = None) -> None:
+        """Record a status change and hand it to the file owner's subscribers.
+
+        Args:
+            event: New status of the file.
+            expires: Whether the cached status expires; by default only
+                ``completed`` and ``failed`` do.
+        """
+        if expires is None:
+            expires = event.status in TERMINAL_STATUSES
+        self.remember(event, expires=expires)
+        for queue in self._subscribers.get(event.user_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def remember(self, event: IngestEvent, expires: bool = True) -> None:
+        """Cache a file's status without notifying anyone.
+
+        Args:
+            event: Status to cache.
+            expires: Drop it after ``ttl_secs``; otherwise keep it until
+                the next status of the file.
+        """
+        expires_at = time.monotonic() + self.ttl_secs if expires else float("inf")
+        self._latest[event.file_id] = (expires_at, event)
+        self._latest.move_to_end(event.file_id)
+        while len(self._latest) > self.max_files:
+            self._latest.popitem(last=False)
+
+    def latest(self, file_id: str) -> Optional[IngestEvent]:
+        """Return the cached status of a file, if still fresh."""
+        cached = self._latest.get(file_id)
+        if cached is None:
+            return None
+        if cached[0] <= time.monotonic():
+            del self._latest[file_id]
+            return None
+        return cached[1]
+
+    @contextmanager
+    def subscribe(self, user_id: int) -> Iterator[asyncio.Queue]:
+        """Receive the events of a user's files while the block runs."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers[user_id]
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[user_id]
+
+
+ingest_events = IngestEventBus()
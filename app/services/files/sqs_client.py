@@ -1,25 +1,43 @@
 """Asynchronous client for polling and processing AWS SQS messages."""
 
 import asyncio
+from typing import Awaitable, Callable
+
 import aioboto3
 from app.core.settings import settings
+from app.core.metrics import INGEST_QUEUED
 from app.services.files.sqs_message_handler import SqsMessageHandler
 
 
 class SQSClient:
     """Manages background polling of SQS queue and message processing."""
 
-    def __init__(self, message_handler: SqsMessageHandler):
+    def __init__(
+        self,
+        message_handler: SqsMessageHandler,
+        queue_url: str | None = None,
+        handle: Callable[[str], Awaitable[dict]] | None = None,
+        concurrency: int = 1,
+        source: str = "sqs",
+    ):
         """Initialize SQS client with configuration and handler.
 
         Args:
             message_handler: Handler for processing received messages.
+            queue_url: Queue to poll; defaults to the workspace file queue.
+            handle: Coroutine processing one message body; defaults to
+                ``message_handler.handle_workspace_file_message``.
+            concurrency: Messages of a received batch processed at once.
+            source: ``source`` label of the queued-messages gauge.
         """
-        self.queue_url = settings.sqs_workspace_queue_url
+        self.queue_url = queue_url or settings.sqs_workspace_queue_url
         self.region_name = settings.aws_region
         self._stop_event = asyncio.Event()
         self._task = None
         self.message_handler = message_handler
+        self.handle = handle or message_handler.handle_workspace_file_message
+        self._slots = asyncio.Semaphore(max(1, concurrency))
+        self.source = source
 
     async def start(self):
         """Start background polling task."""
@@ -44,7 +62,7 @@ class SQSClient:
             region_name=self.region_name,
         )
         async with session.client(
-            "sqs", endpoint_url="http://localhost:4566", region_name=self.region_name
+            "sqs", endpoint_url=settings.sqs_endpoint_url, region_name=self.region_name
         ) as sqs:
             while not self._stop_event.is_set():
                 try:
@@ -53,14 +71,29 @@ class SQSClient:
                         MaxNumberOfMessages=10,
                         WaitTimeSeconds=10,
                     )
-                    messages = response.get("Messages", [])
-                    for msg in messages:
-                        await self._handle_message(msg, sqs)
+                    await self.process_messages(response.get("Messages", []), sqs)
                 except Exception as e:
                     print(f"[SQS] Error: {e}")
 
                 await asyncio.sleep(1)
 
+    async def process_messages(self, messages: list[dict], sqs):
+        """Process a received batch, at most ``concurrency`` messages at once.
+
+        Args:
+            messages: Raw SQS messages.
+            sqs: Active SQS client for message deletion.
+        """
+        queued = INGEST_QUEUED.labels(source=self.source)
+        queued.set(len(messages))
+        await asyncio.gather(*(self._handle_queued(m, sqs, queued) for m in messages))
+
+    async def _handle_queued(self, msg: dict, sqs, queued):
+        """Process a message once a concurrency slot is free."""
+        async with self._slots:
+            queued.dec()
+            await self._handle_message(msg, sqs)
+
     async def _handle_message(self, msg: dict, sqs):
         """Process a single SQS message and delegate to handler.
 
@@ -72,7 +105,7 @@ class SQSClient:
         print(f"[SQS] Received message: {body}")
 
         try:
-            result = await self.message_handler.handle_workspace_file_message(body)
+            result = await self.handle(body)
             print(f"[SQS] Processing result: {result}")
 
             await sqs.delete_message(
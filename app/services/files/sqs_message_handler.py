@@ -1,11 +1,18 @@
 """Handler for processing SQS messages and triggering embedding generation."""
 
 import json
-from typing import Literal
-from app.schemas.sqs_message import SqsMessageDto
+from typing import Callable, Literal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.sqs_message import ChatFileMessageDto, SqsMessageDto
 from app.services.ai.embedding_service import EmbeddingService
 from app.core.settings import settings
-
+from app.core.metrics import (
+    INGEST_CHUNKS_TOTAL,
+    INGEST_FAILURES_TOTAL,
+    INGEST_FILES_TOTAL,
+)
 
 EventType = Literal["create", "update", "delete"]
 
@@ -14,16 +21,55 @@ class SqsMessageHandler:
     """Processes SQS messages and delegates to appropriate services.
 
     Handles workspace file events (create, update, delete) by managing
-    embeddings in ChromaDB accordingly.
+    embeddings in ChromaDB accordingly, and chat file uploads handed over by
+    the API when ingestion runs in the worker process.
     """
 
-    def __init__(self, embedding_service: EmbeddingService):
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        session_factory: Callable[[], AsyncSession] | None = None,
+    ):
         """Initialize the SQS message handler.
 
         Args:
             embedding_service: Service for generating and storing embeddings.
+            session_factory: Opens a database session per chat file message, used
+                to update the file's processing status.
         """
         self.embedding_service = embedding_service
+        self.session_factory = session_factory
+
+    async def handle_chat_file_message(self, message_body: str) -> dict:
+        """Embed a chat file uploaded through the API.
+
+        Args:
+            message_body: JSON string containing ChatFileMessageDto data.
+
+        Returns:
+            dict: Result of ``EmbeddingService.add_file_embeddings``.
+
+        Raises:
+            ValueError: If the message is invalid or no session factory is set.
+        """
+        try:
+            msg = ChatFileMessageDto(**json.loads(message_body))
+        except json.JSONDecodeError as e:
+            INGEST_FAILURES_TOTAL.labels(event_type="chat_upload").inc()
+            raise ValueError(f"Invalid message format: {e}") from e
+        if self.session_factory is None:
+            raise ValueError("Chat file messages require a session factory.")
+
+        print(f"[Handler] Processing chat file_id={msg.file_id}, user={msg.user_id}")
+        async with self.session_factory() as session:
+            service = self.embedding_service.with_session(session)
+            # add_file_embeddings records its own file/chunk/failure counters.
+            return await service.add_file_embeddings(
+                file_key=msg.s3_key,
+                file_name=msg.file_name,
+                user_id=msg.user_id,
+                file_id=str(msg.file_id),
+            )
 
     async def handle_workspace_file_message(self, message_body: str) -> dict:
         """Process a workspace file message from SQS.
@@ -38,10 +84,12 @@ class SqsMessageHandler:
             ValueError: If message parsing or validation fails.
             Exception: If embedding generation fails.
         """
+        event_type = "unknown"
         try:
             # Parse and validate message
             data = json.loads(message_body)
             msg = SqsMessageDto(**data)
+            event_type = msg.event_type
 
             print(
                 f"[Handler] Processing event_type={msg.event_type}, "
@@ -61,13 +109,19 @@ class SqsMessageHandler:
             print(
                 f"[Handler] Successfully processed event_type={msg.event_type}, file_id={msg.file_id}"
             )
+            INGEST_FILES_TOTAL.labels(event_type=event_type).inc()
+            INGEST_CHUNKS_TOTAL.labels(event_type=event_type).inc(
+                result.get("chunks", 0)
+            )
             return result
 
         except json.JSONDecodeError as e:
             print(f"[Handler] Invalid JSON: {e}")
+            INGEST_FAILURES_TOTAL.labels(event_type=event_type).inc()
             raise ValueError(f"Invalid message format: {e}") from e
         except Exception as e:
             print(f"[Handler] Processing error: {e}")
+            INGEST_FAILURES_TOTAL.labels(event_type=event_type).inc()
             raise
 
     async def _handle_create_event(self, msg: SqsMessageDto) -> dict:
@@ -87,6 +141,9 @@ class SqsMessageHandler:
             file_id=str(msg.file_id),
             bucket=settings.aws_s3_workspace_bucket,
         )
+        await self.embedding_service.refresh_workspace_file_summary(
+            workspace_id=msg.workspace_id, file_id=str(msg.file_id)
+        )
 
         return {**result, "event_type": "create"}
 
@@ -116,6 +173,11 @@ class SqsMessageHandler:
             bucket=settings.aws_s3_workspace_bucket,
         )
 
+        # Step 3: Replace the file's summary vector
+        await self.embedding_service.refresh_workspace_file_summary(
+            workspace_id=msg.workspace_id, file_id=str(msg.file_id)
+        )
+
         return {
             **create_result,
             "event_type": "update",
@@ -137,5 +199,8 @@ class SqsMessageHandler:
             workspace_id=msg.workspace_id,
             file_id=str(msg.file_id),
         )
+        await self.embedding_service.delete_workspace_file_summary(
+            workspace_id=msg.workspace_id, file_id=str(msg.file_id)
+        )
 
         return {**result, "event_type": "delete"}
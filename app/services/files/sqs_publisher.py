@@ -0,0 +1,39 @@
+"""Asynchronous publisher for sending messages to AWS SQS queues."""
+
+import aioboto3
+from pydantic import BaseModel
+
+from app.core.settings import settings
+
+
+class SQSPublisher:
+    """Sends JSON messages to SQS, e.g. chat files for the ingestion worker."""
+
+    def __init__(self):
+        """Initialize the publisher with credentials from settings."""
+        self.session = aioboto3.Session(
+            aws_access_key_id=settings.aws_access_key_id,
+            aws_secret_access_key=settings.aws_secret_access_key,
+            region_name=settings.aws_region,
+        )
+
+    async def publish(self, queue_url: str, message: BaseModel) -> str:
+        """Send one message as JSON, serialized with its field aliases.
+
+        Args:
+            queue_url: Target queue.
+            message: Message DTO.
+
+        Returns:
+            str: SQS message id.
+        """
+        async with self.session.client(
+            "sqs",
+            endpoint_url=settings.sqs_endpoint_url,
+            region_name=settings.aws_region,
+        ) as sqs:
+            response = await sqs.send_message(
+                QueueUrl=queue_url,
+                MessageBody=message.model_dump_json(by_alias=True),
+            )
+        return response["MessageId"]
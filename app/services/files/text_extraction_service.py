@@ -4,9 +4,6 @@ import io
 import logging
 from typing import Optional
 
-from pypdf import PdfReader
-from docx import Document
-
 logger = logging.getLogger(__name__)
 
 
@@ -46,6 +43,10 @@ class TextExtractionService:
 
     def _extract_from_pdf(self, content: bytes) -> str:
         """Extract text from a PDF file (bytes)."""
+        # Parsers are imported on first use to keep them out of startup.
+        # pylint: disable-next=import-outside-toplevel
+        from pypdf import PdfReader
+
         reader = PdfReader(io.BytesIO(content))
         text = []
         for page in reader.pages:
@@ -55,6 +56,9 @@ class TextExtractionService:
 
     def _extract_from_docx(self, content: bytes) -> str:
         """Extract text from a DOCX file (bytes)."""
+        # pylint: disable-next=import-outside-toplevel
+        from docx import Document
+
         document = Document(io.BytesIO(content))
         paragraphs = [p.text for p in document.paragraphs]
         return "\n".join(paragraphs)
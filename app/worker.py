@@ -0,0 +1,104 @@
+"""Standalone ingestion worker.
+
+Runs only the ingestion pipeline: polls the workspace file queue and the chat
+file queue and embeds the files, with ``settings.ingest_worker_concurrency``
+messages processed at once per queue. Deploy it next to API processes started
+with ``INGESTION_ENABLED_IN_API=false`` so bulk imports do not compete with chat
+requests for CPU, and scale both independently.
+
+Prometheus metrics are served on ``settings.ingest_worker_metrics_port``.
+
+Usage:
+    python -m app.worker
+"""
+
+import asyncio
+import signal
+from typing import List
+
+from prometheus_client import start_http_server
+
+from app.core.settings import settings
+from app.core.startup import StartupProfiler, process_uptime
+from app.db.database import async_session
+from app.services.ai.chroma_client import ChromaClient
+from app.services.ai.embedding_service import EmbeddingService
+from app.services.ai.model_registry import model_registry
+from app.services.files.s3_service import S3Client
+from app.services.files.sqs_client import SQSClient
+from app.services.files.sqs_message_handler import SqsMessageHandler
+from app.services.files.text_extraction_service import TextExtractionService
+
+
+def build_pollers(message_handler: SqsMessageHandler) -> List[SQSClient]:
+    """Create one poller per ingestion queue.
+
+    Args:
+        message_handler: Handler shared by both queues.
+
+    Returns:
+        List[SQSClient]: Workspace file and chat file pollers.
+    """
+    return [
+        SQSClient(
+            message_handler,
+            queue_url=settings.sqs_workspace_queue_url,
+            concurrency=settings.ingest_worker_concurrency,
+        ),
+        SQSClient(
+            message_handler,
+            queue_url=settings.sqs_chat_queue_url,
+            handle=message_handler.handle_chat_file_message,
+            concurrency=settings.ingest_worker_concurrency,
+            source="sqs_chat",
+        ),
+    ]
+
+
+async def run_worker(stop: asyncio.Event) -> None:
+    """Start the pollers and keep them running until ``stop`` is set.
+
+    Args:
+        stop: Set by the signal handlers to begin a graceful shutdown.
+    """
+    profiler = StartupProfiler()
+    profiler.record("boot", process_uptime())
+
+    clients = await profiler.gather(
+        chroma=lambda: asyncio.to_thread(ChromaClient),
+        s3=lambda: asyncio.to_thread(S3Client),
+        model_load=model_registry.get,
+    )
+    await clients["chroma"].warm_up()
+
+    embedding_service = EmbeddingService(
+        chroma_client=clients["chroma"],
+        s3_client=clients["s3"],
+        text_extractor_service=TextExtractionService(),
+        db=None,
+    )
+    message_handler = SqsMessageHandler(
+        embedding_service=embedding_service, session_factory=async_session
+    )
+    pollers = build_pollers(message_handler)
+    for poller in pollers:
+        await poller.start()
+    profiler.finish()
+
+    await stop.wait()
+    print("[Worker] Shutting down…")
+    for poller in pollers:
+        await poller.stop()
+
+
+async def _main() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await run_worker(stop)
+
+
+if __name__ == "__main__":
+    start_http_server(settings.ingest_worker_metrics_port)
+    asyncio.run(_main())
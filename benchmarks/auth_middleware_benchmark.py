@@ -0,0 +1,158 @@
+"""Per-request overhead of the session authentication middleware.
+
+Drives a minimal Starlette app directly over ASGI (no server, no sockets) and
+times requests through the previous ``BaseHTTPMiddleware`` implementation, which
+decoded the JWT on every request, and through the current pure-ASGI
+``AuthMiddleware`` with its verified-token cache. Each is measured for a public
+path (``/health``), an anonymous request and an authenticated one, next to the
+bare app as a baseline:
+
+    python -m benchmarks.auth_middleware_benchmark --requests 20000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import List
+
+import jwt
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+from app.core.settings import settings
+from app.middleware.auth_middleware import AuthMiddleware
+from app.services.auth.auth_service import verified_tokens
+from benchmarks.common import latency_summary, run_metadata, write_results
+
+
+def _legacy_verify(token: str) -> dict | None:
+    try:
+        payload = jwt.decode(token, settings.jwt_secret_key, algorithms=["HS256"])
+        return json.loads(payload["sub"])
+    except jwt.InvalidTokenError:
+        return None
+
+
+class LegacyAuthMiddleware(BaseHTTPMiddleware):
+    """The middleware as it was before the ASGI rewrite."""
+
+    async def dispatch(self, request, call_next):
+        token = request.cookies.get(settings.user_cookie_name)
+        if not token:
+            request.state.user = None
+            return await call_next(request)
+        user_data = _legacy_verify(token)
+        if not user_data:
+            return JSONResponse(
+                {"detail": "Invalid or expired session"}, status_code=401
+            )
+        request.state.user = user_data
+        return await call_next(request)
+
+
+async def _endpoint(_request: Request) -> PlainTextResponse:
+    return PlainTextResponse("ok")
+
+
+def build_app(middleware: str) -> Starlette:
+    """Return the test app wrapped in ``none``, ``legacy`` or ``asgi`` auth."""
+    stack = {
+        "none": [],
+        "legacy": [Middleware(LegacyAuthMiddleware)],
+        "asgi": [Middleware(AuthMiddleware)],
+    }[middleware]
+    routes = [Route("/health", _endpoint), Route("/conversations", _endpoint)]
+    return Starlette(routes=routes, middleware=stack)
+
+
+def _scope(path: str, cookie: str | None) -> dict:
+    headers = [(b"host", b"bench")]
+    if cookie:
+        headers.append((b"cookie", cookie.encode("latin-1")))
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+
+async def time_requests(app, path: str, cookie: str | None, requests: int) -> dict:
+    """Send ``requests`` GETs through ``app`` and return their latency summary."""
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message
+
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await app(_scope(path, cookie), receive, send)
+        samples.append(time.perf_counter() - start)
+    return latency_summary(samples)
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--output", help="Write JSON results to this path")
+    return parser.parse_args(argv)
+
+
+async def main(argv: List[str] | None = None) -> dict:
+    """Run the benchmark and return the result document."""
+    args = parse_args(argv)
+    token = jwt.encode(
+        {"sub": json.dumps({"id": 1}), "exp": int(time.time()) + 3600},
+        settings.jwt_secret_key,
+        algorithm="HS256",
+    )
+    cases = {
+        "public": ("/health", None),
+        "anonymous": ("/conversations", None),
+        "authenticated": ("/conversations", f"{settings.user_cookie_name}={token}"),
+    }
+    results = {
+        "meta": run_metadata("auth_middleware", requests=args.requests),
+        "middleware": {},
+    }
+    verified_tokens.clear()
+    for middleware in ("none", "legacy", "asgi"):
+        app = build_app(middleware)
+        # Warm up routing, imports and (for asgi) the token cache.
+        for path, cookie in cases.values():
+            await time_requests(app, path, cookie, 50)
+        results["middleware"][middleware] = {}
+        for case, (path, cookie) in cases.items():
+            stats = await time_requests(app, path, cookie, args.requests)
+            results["middleware"][middleware][case] = stats
+            print(
+                f"[{middleware:>6}] {case:<13} mean={stats['mean_ms'] * 1000:7.1f}us "
+                f"p50={stats['p50_ms'] * 1000:7.1f}us "
+                f"p95={stats['p95_ms'] * 1000:7.1f}us"
+            )
+
+    if args.output:
+        write_results(args.output, results)
+    return results
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,196 @@
+"""Prompt size and answer retention of sentence-level context compression.
+
+Builds retrieval results shaped like the ones ``WorkspaceContextService`` puts in
+the prompt (a few files, each with stitched spans of 1-2 chunks) in which one
+sentence answers the question, then runs ``compress_sections`` at several
+budgets. Reports context size before and after compression (characters and an
+approximate token count), how often the answering sentence survives, how many
+sentences are encoded per turn, and the compression latency, which includes that
+encoding. Spans are ranked with their chunks' relevance, computed up front like
+the vector store does from the stored embeddings.
+
+Usage:
+    python -m benchmarks.context_compression_benchmark --budgets 1000 2000 3000
+    python -m benchmarks.context_compression_benchmark --encoder intfloat/multilingual-e5-base
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from app.services.ai.context_assembly import format_file_section
+from app.services.ai.context_compression import compress_sections, cosine_scores
+from benchmarks.common import latency_summary, run_metadata, write_results
+from benchmarks.fakes import HashingEncoder
+
+_FILLER = (
+    "note workspace project meeting summary draft idea research document chapter "
+    "section paragraph system service team plan review release feature design "
+    "architecture deploy cluster node storage index"
+).split()
+
+_FACTS = [
+    ("invoice", "approved by finance within five business days"),
+    ("backup", "taken every night and kept for thirty days"),
+    ("onboarding", "handled by the platform team during the first week"),
+    ("incident", "reported in the status channel within fifteen minutes"),
+    ("vacation", "requested at least two weeks in advance"),
+]
+
+# Rough characters-per-token ratio of Gemini tokenizers on English prose.
+CHARS_PER_TOKEN = 4
+
+
+def _filler_sentence(rng: random.Random) -> str:
+    words = rng.choices(_FILLER, k=rng.randint(8, 20))
+    return " ".join(words).capitalize() + "."
+
+
+def build_case(
+    rng: random.Random, files: int, span_chars: int
+) -> Tuple[str, str, List[Tuple[str, List[str]]]]:
+    """Return a question, its answering sentence and the retrieved sections."""
+    topic, fact = rng.choice(_FACTS)
+    question = f"How is the {topic} {fact.split()[0]}?"
+    answer = f"Every {topic} is {fact}."
+
+    sections = []
+    for file_number in range(files):
+        spans = []
+        for _ in range(rng.randint(1, 2)):
+            sentences = []
+            while sum(len(s) + 1 for s in sentences) < span_chars:
+                sentences.append(_filler_sentence(rng))
+            spans.append(sentences)
+        sections.append((f"file-{file_number}.md", spans))
+
+    _, spans = rng.choice(sections)
+    target = rng.choice(spans)
+    target.insert(rng.randrange(len(target) + 1), answer)
+    rendered = [
+        (name, [" ".join(sentences) for sentences in spans]) for name, spans in sections
+    ]
+    return question, answer, rendered
+
+
+def load_encoder(name: str):
+    """Return the hashing stand-in or a sentence-transformers model."""
+    if name == "hash":
+        return HashingEncoder()
+
+    # pylint: disable=import-outside-toplevel
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(name)
+
+
+async def chunk_relevance(encode, sections, query) -> List[Tuple[str, float]]:
+    """Return every span with its similarity to the query, as retrieval reports it."""
+    spans = [span for _, file_spans in sections for span in file_spans]
+    return list(zip(spans, cosine_scores(await encode(spans), query).tolist()))
+
+
+async def measure(
+    encoder, cases, budget: int, neighbours: int, max_sentences: int
+) -> dict:
+    """Compress every case at one budget and aggregate the results."""
+    encoded = []
+
+    async def encode(texts):
+        encoded[-1] += len(texts)
+        return np.asarray(encoder.encode(texts, batch_size=32), dtype=np.float32)
+
+    before, after, kept, latencies = [], [], [], []
+    for question, answer, sections in cases:
+        encoded.append(0)
+        query = (await encode([question]))[0]
+        hits = await chunk_relevance(encode, sections, query)
+        encoded[-1] = 0
+        start = time.perf_counter()
+        compressed = await compress_sections(
+            sections,
+            query,
+            encode,
+            budget_chars=budget,
+            neighbours=neighbours,
+            hits=hits,
+            max_sentences=max_sentences,
+        )
+        latencies.append(time.perf_counter() - start)
+
+        original = "\n\n".join(format_file_section(n, s) for n, s in sections)
+        reduced = "\n\n".join(format_file_section(n, s) for n, s in compressed)
+        before.append(len(original))
+        after.append(len(reduced))
+        kept.append(answer in reduced)
+
+    return {
+        "chars_before": float(np.mean(before)),
+        "chars_after": float(np.mean(after)),
+        "tokens_before": float(np.mean(before)) / CHARS_PER_TOKEN,
+        "tokens_after": float(np.mean(after)) / CHARS_PER_TOKEN,
+        "reduction": 1 - float(np.sum(after)) / float(np.sum(before)),
+        "answer_retained": float(np.mean(kept)),
+        "sentences_encoded": float(np.mean(encoded)),
+        "compression": latency_summary(latencies),
+    }
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--budgets", type=int, nargs="+", default=[1000, 2000, 3000])
+    parser.add_argument("--neighbours", type=int, default=1)
+    parser.add_argument("--max-sentences", type=int, default=64)
+    parser.add_argument("--files", type=int, default=3)
+    parser.add_argument("--span-chars", type=int, default=1000)
+    parser.add_argument("--cases", type=int, default=200)
+    parser.add_argument("--encoder", default="hash")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write JSON results to this path")
+    return parser.parse_args(argv)
+
+
+async def main(argv: List[str] | None = None) -> dict:
+    """Run the benchmark and return the result document."""
+    args = parse_args(argv)
+    rng = random.Random(args.seed)
+    encoder = load_encoder(args.encoder)
+    cases = [build_case(rng, args.files, args.span_chars) for _ in range(args.cases)]
+
+    results = {
+        "meta": run_metadata(
+            "context_compression",
+            encoder=args.encoder,
+            files=args.files,
+            span_chars=args.span_chars,
+            cases=args.cases,
+            neighbours=args.neighbours,
+            max_sentences=args.max_sentences,
+        ),
+        "budgets": {},
+    }
+    for budget in args.budgets:
+        stats = await measure(
+            encoder, cases, budget, args.neighbours, args.max_sentences
+        )
+        results["budgets"][str(budget)] = stats
+        print(
+            f"[budget={budget:>5}] tokens {stats['tokens_before']:7.0f} -> "
+            f"{stats['tokens_after']:6.0f} ({stats['reduction']:.0%} less) "
+            f"answer_retained={stats['answer_retained']:.2f} "
+            f"encoded={stats['sentences_encoded']:.0f} "
+            f"p50={stats['compression']['p50_ms']:.2f}ms"
+        )
+
+    if args.output:
+        write_results(args.output, results)
+    return results
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,214 @@
+"""Deterministic synthetic document corpus used by the benchmarks.
+
+Documents are generated from a seeded vocabulary so that two runs with the same
+seed produce byte-identical files, which keeps results comparable between commits.
+"""
+
+import io
+import random
+from dataclasses import dataclass
+from typing import List
+
+from docx import Document
+
+FORMATS = ("pdf", "docx", "md", "txt")
+
+# Approximate plain-text size of each document class, in characters.
+SIZES = {
+    "small": 2_000,
+    "medium": 20_000,
+    "large": 200_000,
+}
+
+_VOCABULARY = (
+    "note workspace project meeting summary draft idea research vector embedding "
+    "search context answer question document chapter section paragraph model data "
+    "system service request response latency throughput memory storage index query "
+    "user team plan review release feature design architecture deploy cluster node "
+    "notatka projekt spotkanie pomysł wyszukiwanie odpowiedź pytanie dokument"
+).split()
+
+_LINES_PER_PDF_PAGE = 45
+_PDF_LINE_WIDTH = 90
+
+
+@dataclass
+class SyntheticDocument:
+    """A generated document ready to be stored in the fake S3 bucket.
+
+    Attributes:
+        key: S3 object key, including the file extension.
+        file_format: One of ``FORMATS``.
+        size_class: One of the keys of ``SIZES``.
+        content: Encoded file bytes.
+    """
+
+    key: str
+    file_format: str
+    size_class: str
+    content: bytes
+
+
+def _sentence(rng: random.Random) -> str:
+    words = rng.choices(_VOCABULARY, k=rng.randint(6, 18))
+    return " ".join(words).capitalize() + rng.choice([".", ".", ".", "?", "!"])
+
+
+def _paragraphs(rng: random.Random, target_chars: int) -> List[str]:
+    """Generate paragraphs until roughly ``target_chars`` characters are produced."""
+    paragraphs = []
+    total = 0
+    while total < target_chars:
+        paragraph = " ".join(_sentence(rng) for _ in range(rng.randint(3, 8)))
+        paragraphs.append(paragraph)
+        total += len(paragraph) + 2
+    return paragraphs
+
+
+def _render_txt(paragraphs: List[str]) -> bytes:
+    return "\n\n".join(paragraphs).encode("utf-8")
+
+
+def _render_md(paragraphs: List[str], rng: random.Random) -> bytes:
+    lines = []
+    for i, paragraph in enumerate(paragraphs):
+        if i % 5 == 0:
+            lines.append(f"## Section {i // 5 + 1}\n")
+        if rng.random() < 0.2:
+            lines.extend(f"- {part.strip()}" for part in paragraph.split(".") if part)
+            lines.append("")
+        else:
+            lines.append(paragraph + "\n")
+    return "\n".join(lines).encode("utf-8")
+
+
+def _render_docx(paragraphs: List[str]) -> bytes:
+    document = Document()
+    for i, paragraph in enumerate(paragraphs):
+        if i % 5 == 0:
+            document.add_heading(f"Section {i // 5 + 1}", level=2)
+        document.add_paragraph(paragraph)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _wrap(paragraphs: List[str]) -> List[str]:
+    """Hard-wrap paragraphs into fixed-width lines for PDF rendering."""
+    lines = []
+    for paragraph in paragraphs:
+        current = ""
+        for word in paragraph.split():
+            if len(current) + len(word) + 1 > _PDF_LINE_WIDTH:
+                lines.append(current)
+                current = word
+            else:
+                current = f"{current} {word}" if current else word
+        lines.extend([current, ""])
+    return lines
+
+
+def _pdf_escape(line: str) -> str:
+    # Base-14 fonts only cover Latin-1, which is enough for the synthetic vocabulary.
+    line = line.encode("latin-1", errors="replace").decode("latin-1")
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _render_pdf(paragraphs: List[str]) -> bytes:
+    """Render a minimal multi-page PDF using the built-in Helvetica font."""
+    lines = _wrap(paragraphs)
+    pages = [
+        lines[i : i + _LINES_PER_PDF_PAGE]
+        for i in range(0, len(lines), _LINES_PER_PDF_PAGE)
+    ] or [[""]]
+
+    # Object numbering: 1 catalog, 2 page tree, 3 font, then (page, content) pairs.
+    objects: List[bytes] = []
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    objects.append(
+        f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode("latin-1")
+    )
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    for page_id, page_lines in zip(page_ids, pages):
+        text_ops = ["BT", "/F1 10 Tf", "12 TL", "50 800 Td"]
+        text_ops.extend(f"({_pdf_escape(line)}) Tj T*" for line in page_lines)
+        text_ops.append("ET")
+        stream = "\n".join(text_ops).encode("latin-1")
+        objects.append(
+            (
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>"
+            ).encode("latin-1")
+        )
+        objects.append(
+            f"<< /Length {len(stream)} >>\nstream\n".encode("latin-1")
+            + stream
+            + b"\nendstream"
+        )
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(f"{number} 0 obj\n".encode("latin-1") + body + b"\nendobj\n")
+
+    xref_offset = output.tell()
+    output.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1"))
+    for offset in offsets:
+        output.write(f"{offset:010d} 00000 n \n".encode("latin-1"))
+    output.write(
+        (
+            f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n"
+        ).encode("latin-1")
+    )
+    return output.getvalue()
+
+
+def generate_corpus(
+    docs_per_format: int = 3,
+    size_classes: List[str] | None = None,
+    formats: List[str] | None = None,
+    seed: int = 42,
+) -> List[SyntheticDocument]:
+    """Generate a deterministic corpus covering every format and size class.
+
+    Args:
+        docs_per_format: Number of documents per (format, size class) pair.
+        size_classes: Subset of ``SIZES`` keys to generate (default: all).
+        formats: Subset of ``FORMATS`` to generate (default: all).
+        seed: Seed for the random generator.
+
+    Returns:
+        List[SyntheticDocument]: Generated documents in a stable order.
+    """
+    rng = random.Random(seed)
+    documents = []
+    for size_class in size_classes or list(SIZES):
+        for file_format in formats or list(FORMATS):
+            for i in range(docs_per_format):
+                paragraphs = _paragraphs(rng, SIZES[size_class])
+                if file_format == "pdf":
+                    content = _render_pdf(paragraphs)
+                elif file_format == "docx":
+                    content = _render_docx(paragraphs)
+                elif file_format == "md":
+                    content = _render_md(paragraphs, rng)
+                else:
+                    content = _render_txt(paragraphs)
+
+                key = f"bench/{size_class}/{file_format}_{i}.{file_format}"
+                documents.append(
+                    SyntheticDocument(
+                        key=key,
+                        file_format=file_format,
+                        size_class=size_class,
+                        content=content,
+                    )
+                )
+    return documents
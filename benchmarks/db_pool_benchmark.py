@@ -0,0 +1,118 @@
+"""Connection pool behaviour under concurrent chat turns.
+
+Simulates WebSocket chat turns against the real ``MessageRepository``: each turn
+opens a session, stores the prompt, holds the connection while the answer
+"streams" and stores the response. Runs the turns with SQLAlchemy's default pool
+and with the pool configured from the ``db_*`` settings, and reports throughput,
+connection checkout wait and pool timeouts.
+
+Defaults to a temporary SQLite file (needs ``aiosqlite``); point
+``--database-url`` at a local Postgres container for representative numbers:
+
+    docker run --rm -p 5432:5432 -e POSTGRES_PASSWORD=pw postgres:16
+    python -m benchmarks.db_pool_benchmark \\
+        --database-url postgresql+asyncpg://postgres:pw@localhost:5432/postgres
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import List
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.pool import engine_options, statement_cache_args
+from app.models.message import Message  # pylint: disable=unused-import
+from app.repositories.message_repository import MessageRepository
+from benchmarks.common import latency_summary, run_metadata, write_results
+
+
+async def run_turns(engine, turns: int, concurrency: int, hold_ms: float) -> dict:
+    """Run ``turns`` chat turns, ``concurrency`` at a time, on one engine."""
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    gate = asyncio.Semaphore(concurrency)
+    waits, timeouts = [], 0
+
+    async def turn(number: int) -> None:
+        nonlocal timeouts
+        async with gate, session_factory() as session:
+            start = time.perf_counter()
+            try:
+                await session.connection()
+            except PoolTimeoutError:
+                timeouts += 1
+                return
+            waits.append(time.perf_counter() - start)
+
+            repository = MessageRepository(session)
+            message = await repository.create_message(number % 50, 1, "question")
+            await asyncio.sleep(hold_ms / 1000)
+            await repository.update_message_response(message.id, "answer")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(turn(number) for number in range(turns)))
+    elapsed = time.perf_counter() - start
+    return {
+        "turns_per_sec": (turns - timeouts) / elapsed,
+        "timeouts": timeouts,
+        "checkout": latency_summary(waits),
+    }
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--turns", type=int, default=600)
+    parser.add_argument("--concurrency", type=int, default=60)
+    parser.add_argument("--hold-ms", type=float, default=20.0)
+    parser.add_argument("--output", help="Write JSON results to this path")
+    return parser.parse_args(argv)
+
+
+async def main(argv: List[str] | None = None) -> dict:
+    """Run the benchmark and return the result document."""
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite+aiosqlite:///{os.path.join(tmp, 'b.db')}"
+        configs = {
+            "default": {"pool_timeout": 5},
+            "tuned": engine_options(url),
+        }
+        results = {
+            "meta": run_metadata(
+                "db_pool",
+                backend=url.split(":", 1)[0],
+                turns=args.turns,
+                concurrency=args.concurrency,
+                hold_ms=args.hold_ms,
+            ),
+            "configs": {},
+        }
+        for name, options in configs.items():
+            engine = create_async_engine(
+                url, connect_args=statement_cache_args(url), **options
+            )
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            stats = await run_turns(engine, args.turns, args.concurrency, args.hold_ms)
+            await engine.dispose()
+            results["configs"][name] = stats
+            print(
+                f"[{name:>7}] {stats['turns_per_sec']:7.1f} turns/s "
+                f"checkout p50={stats['checkout']['p50_ms']:.2f}ms "
+                f"p95={stats['checkout']['p95_ms']:.2f}ms timeouts={stats['timeouts']}"
+            )
+
+    if args.output:
+        write_results(args.output, results)
+    return results
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+"""In-process stand-ins for the external services used by the ingestion pipeline.
+
+They implement only the methods the pipeline calls, so the real ``EmbeddingService``,
+``TextExtractionService`` and ``ChromaClient`` code runs unchanged on top of them.
+"""
+
+import hashlib
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class InMemoryS3Client:
+    """Dict-backed replacement for ``S3Client``."""
+
+    def __init__(self, bucket: str = "bench-bucket"):
+        self.bucket = bucket
+        self.objects: Dict[tuple, bytes] = {}
+
+    def put(self, key: str, content: bytes, bucket: Optional[str] = None) -> None:
+        """Store an object synchronously (used while seeding the corpus)."""
+        self.objects[(bucket or self.bucket, key)] = content
+
+    async def upload_object_to_s3(
+        self,
+        obj: bytes,
+        key: str,
+        content_type: str = "application/octet-stream",
+    ) -> str:
+        """Store an object and return its S3 path."""
+        del content_type
+        self.put(key, bytes(obj))
+        return f"s3://{self.bucket}/{key}"
+
+    async def download_file_as_bytes(self, key: str, bucket: str) -> bytes:
+        """Return the stored object bytes."""
+        return self.objects[(bucket, key)]
+
+
+class InMemoryChatFileRepository:
+    """Records status updates instead of writing them to Postgres."""
+
+    def __init__(self):
+        self.statuses: Dict[str, str] = {}
+
+    async def update_status(self, file_id: str, status: str):
+        """Remember the latest status of a chat file."""
+        self.statuses[file_id] = status
+
+
+class HashingEncoder:
+    """Deterministic bag-of-words encoder with the same interface as SentenceTransformer.
+
+    Used when the real e5 model is unavailable (e.g. offline CI). It keeps the
+    encode stage cheap, so results are only comparable with runs using the same
+    encoder.
+    """
+
+    _TOKEN = re.compile(r"\w+", re.UNICODE)
+
+    def __init__(self, dimensions: int = 768):
+        self.dimensions = dimensions
+
+    def _vector(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for token in self._TOKEN.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def encode(
+        self,
+        sentences: List[str],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        **_kwargs,
+    ) -> np.ndarray:
+        """Encode sentences into a ``(len(sentences), dimensions)`` float32 array."""
+        del batch_size, convert_to_numpy
+        if isinstance(sentences, str):
+            sentences = [sentences]
+        return np.stack([self._vector(s) for s in sentences]).astype(np.float32)
@@ -0,0 +1,153 @@
+"""Flat vs. two-level (file, then chunk) workspace retrieval.
+
+Builds workspaces of growing size with a long-tailed number of chunks per file
+(a few long documents, many short notes) in the embedded local store, then
+compares one flat chunk search with the file-summary-first search used by
+``EmbeddingService.query_workspace_context``. Reports latency, the number of
+distinct files in the top-k, and how often the file a query was drawn from is
+among the results.
+
+Usage:
+    python -m benchmarks.hierarchical_retrieval_benchmark --files 100 400 1600
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+
+from app.services.ai.file_summaries import (
+    cap_hits_per_file,
+    summary_id,
+    summary_vector,
+)
+from app.services.ai.local_vector_store import LocalVectorStore
+from benchmarks.common import latency_summary, run_metadata, write_results
+
+
+async def build_workspace(root: str, n_files: int, args, rng) -> tuple:
+    """Load one workspace into chunk and summary stores; return its file centres."""
+    chunks = LocalVectorStore(f"{root}/chunks-{n_files}")
+    summaries = LocalVectorStore(f"{root}/files-{n_files}")
+    centres = rng.normal(size=(n_files, args.dim)).astype(np.float32)
+    sizes = np.minimum(
+        args.max_chunks, np.ceil(rng.pareto(1.2, n_files) * 3 + 1).astype(int)
+    )
+    for file_id, (centre, size) in enumerate(zip(centres, sizes)):
+        vectors = centre + args.spread * rng.normal(size=(size, args.dim))
+        vectors = vectors.astype(np.float32)
+        metadata = {"workspace_id": 1, "file_id": str(file_id)}
+        await chunks.add(
+            ids=[f"workspace_1_file_{file_id}_{i}" for i in range(size)],
+            embeddings=vectors,
+            documents=[""] * size,
+            metadatas=[{**metadata, "chunk_index": i} for i in range(size)],
+        )
+        await summaries.add(
+            ids=[summary_id(1, str(file_id))],
+            embeddings=summary_vector(vectors)[None, :],
+            documents=[""],
+            metadatas=[metadata],
+        )
+    return chunks, summaries, centres, int(sizes.sum())
+
+
+async def flat_query(chunks, summaries, query, args) -> dict:
+    """One search over every chunk of the workspace."""
+    del summaries
+    result = await chunks.query(query, n_results=args.k, filters={"workspace_id": 1})
+    return result
+
+
+async def hierarchical_query(chunks, summaries, query, args) -> dict:
+    """Rank files by summary, then search chunks inside the best files."""
+    files = await summaries.query(
+        query, n_results=args.top_files, filters={"workspace_id": 1}
+    )
+    file_ids = [meta["file_id"] for meta in files["metadatas"][0]]
+    result = await chunks.query(
+        query,
+        n_results=args.k * args.per_file,
+        filters={"workspace_id": 1, "file_id": file_ids},
+    )
+    return cap_hits_per_file(result, args.k, args.per_file)
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--files", type=int, nargs="+", default=[100, 400, 1600])
+    parser.add_argument("--max-chunks", type=int, default=400)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--spread", type=float, default=0.8)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--top-files", type=int, default=5)
+    parser.add_argument("--per-file", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write JSON results to this path")
+    return parser.parse_args(argv)
+
+
+async def main(argv: List[str] | None = None) -> dict:
+    """Run the benchmark and return the result document."""
+    args = parse_args(argv)
+    rng = np.random.default_rng(args.seed)
+    results = {
+        "meta": run_metadata(
+            "hierarchical_retrieval",
+            dim=args.dim,
+            k=args.k,
+            top_files=args.top_files,
+            per_file=args.per_file,
+            queries=args.queries,
+        ),
+        "workspaces": [],
+    }
+
+    with tempfile.TemporaryDirectory(prefix="bench-hierarchical-") as root:
+        for n_files in args.files:
+            chunks, summaries, centres, n_chunks = await build_workspace(
+                root, n_files, args, rng
+            )
+            targets = rng.integers(0, n_files, size=args.queries)
+            queries = centres[targets] + args.spread * rng.normal(
+                size=(args.queries, args.dim)
+            ).astype(np.float32)
+
+            row = {"files": n_files, "chunks": n_chunks}
+            for name, search in (
+                ("flat", flat_query),
+                ("hierarchical", hierarchical_query),
+            ):
+                latencies, distinct, found = [], [], []
+                for target, query in zip(targets, queries):
+                    start = time.perf_counter()
+                    result = await search(chunks, summaries, query[None, :], args)
+                    latencies.append(time.perf_counter() - start)
+                    file_ids = [m["file_id"] for m in result["metadatas"][0]]
+                    distinct.append(len(set(file_ids)))
+                    found.append(str(target) in file_ids)
+                row[name] = {
+                    **latency_summary(latencies),
+                    "distinct_files": float(np.mean(distinct)),
+                    "target_file_hit_rate": float(np.mean(found)),
+                }
+                print(
+                    f"[{name:<12}] files={n_files:>5} chunks={n_chunks:>7} "
+                    f"p50={row[name]['p50_ms']:7.2f}ms "
+                    f"distinct_files={row[name]['distinct_files']:.2f} "
+                    f"target_hit={row[name]['target_file_hit_rate']:.2f}"
+                )
+            results["workspaces"].append(row)
+
+    if args.output:
+        write_results(args.output, results)
+    return results
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
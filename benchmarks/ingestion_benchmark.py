@@ -0,0 +1,375 @@
+"""End-to-end ingestion benchmark.
+
+Runs ``EmbeddingService.add_workspace_file_embeddings`` and
+``EmbeddingService.add_file_embeddings`` over a synthetic PDF/DOCX/MD/TXT corpus,
+using an in-memory S3 fake and an in-process (ephemeral) Chroma instance, and
+reports throughput, per-stage latency percentiles and peak RSS.
+
+Usage:
+    python -m benchmarks.ingestion_benchmark --output benchmarks/results/ingestion.json
+    python -m benchmarks.ingestion_benchmark --compare benchmarks/results/base.json
+
+Results are written as JSON so they can be diffed between commits.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from typing import Callable, Dict, List
+
+from benchmarks.common import (
+    latency_summary,
+    peak_rss_mb,
+    run_metadata,
+    write_results,
+)
+from benchmarks.corpus import FORMATS, SIZES, SyntheticDocument, generate_corpus
+from benchmarks.fakes import (
+    HashingEncoder,
+    InMemoryChatFileRepository,
+    InMemoryS3Client,
+)
+
+STAGES = ("download", "extract", "chunk", "encode", "upsert")
+WORKSPACE_BUCKET = "bench-workspace-bucket"
+
+
+class StageRecorder:
+    """Collects wall-clock samples for each pipeline stage."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def wrap_async(self, stage: str, func: Callable) -> Callable:
+        """Wrap a coroutine function so each call is timed under ``stage``."""
+
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.samples[stage].append(time.perf_counter() - start)
+
+        return timed
+
+    def wrap_sync(self, stage: str, func: Callable) -> Callable:
+        """Wrap a plain function so each call is timed under ``stage``."""
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.samples[stage].append(time.perf_counter() - start)
+
+        return timed
+
+    def summary(self) -> Dict[str, dict]:
+        """Return count, mean, p50, p95 and total time per stage in milliseconds."""
+        result = {}
+        for stage in STAGES:
+            samples = self.samples.get(stage, [])
+            result[stage] = {
+                **latency_summary(samples),
+                "total_ms": 1000 * sum(samples),
+            }
+        return result
+
+
+class _TimedEncoder:
+    """Proxy that times ``encode`` calls of the wrapped model."""
+
+    def __init__(self, model, recorder: StageRecorder):
+        self._model = model
+        self.encode = recorder.wrap_sync("encode", model.encode)
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+
+def load_encoder(name: str):
+    """Load the encoder used for the run.
+
+    Args:
+        name: ``"hash"`` for the deterministic stand-in, otherwise a
+            sentence-transformers model name.
+    """
+    if name == "hash":
+        return HashingEncoder()
+
+    # pylint: disable=import-outside-toplevel
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(name)
+
+
+def build_store(backend: str, collection_name: str, root: str):
+    """Create the vector store under test.
+
+    Args:
+        backend: ``"chroma"`` for an ephemeral in-process Chroma, ``"local"`` for
+            the embedded memory-mapped store.
+        collection_name: Collection name for the run.
+        root: Scratch directory for the local store.
+    """
+    # pylint: disable=import-outside-toplevel
+    if backend == "local":
+        from app.services.ai.local_vector_store import LocalVectorStore
+
+        return LocalVectorStore(os.path.join(root, collection_name))
+
+    import chromadb
+    from app.services.ai.chroma_client import ChromaVectorStore
+
+    return ChromaVectorStore(collection_name, client=chromadb.EphemeralClient())
+
+
+def build_service(model, s3_client: InMemoryS3Client, recorder: StageRecorder, store):
+    """Wire a real EmbeddingService to the in-process stand-ins with stage timing."""
+    # pylint: disable=import-outside-toplevel
+    from app.services.ai.chroma_client import ChromaClient
+    from app.services.ai.embedding_service import EmbeddingService
+    from app.services.files.text_extraction_service import TextExtractionService
+
+    timed_model = _TimedEncoder(model, recorder)
+    chroma_client = ChromaClient(model=timed_model, store=store)
+    chroma_client.add = recorder.wrap_async("upsert", chroma_client.add)
+
+    timed_s3 = InMemoryS3Client(bucket=s3_client.bucket)
+    timed_s3.objects = s3_client.objects
+    timed_s3.download_file_as_bytes = recorder.wrap_async(
+        "download", s3_client.download_file_as_bytes
+    )
+
+    text_extractor = TextExtractionService()
+    text_extractor.extract_text = recorder.wrap_async(
+        "extract", text_extractor.extract_text
+    )
+
+    service = EmbeddingService(
+        chroma_client=chroma_client,
+        s3_client=timed_s3,
+        text_extractor_service=text_extractor,
+        db=None,
+        model=timed_model,
+    )
+    service.chat_file_repository = InMemoryChatFileRepository()
+    service.chunk_text = recorder.wrap_sync("chunk", service.chunk_text)
+    return service, chroma_client
+
+
+async def run_pipeline(
+    pipeline: str,
+    documents: List[SyntheticDocument],
+    model,
+    concurrency: int,
+    backend: str,
+) -> dict:
+    """Ingest every document through one pipeline and return its metrics.
+
+    Args:
+        pipeline: ``"workspace"`` or ``"chat"``.
+        documents: Corpus to ingest.
+        model: Encoder shared by all runs.
+        concurrency: Maximum number of documents processed at once.
+        backend: Vector store backend (``"chroma"`` or ``"local"``).
+    """
+    recorder = StageRecorder()
+    s3_client = InMemoryS3Client()
+    for doc in documents:
+        s3_client.put(doc.key, doc.content, bucket=WORKSPACE_BUCKET)
+        s3_client.put(doc.key, doc.content)
+
+    scratch = tempfile.TemporaryDirectory(prefix="bench-vectors-")
+    store = build_store(backend, f"bench-{uuid.uuid4().hex[:12]}", scratch.name)
+    service, _ = build_service(model, s3_client, recorder, store)
+    semaphore = asyncio.Semaphore(concurrency)
+    chunk_counts: List[int] = []
+    failures: List[str] = []
+
+    async def ingest(index: int, doc: SyntheticDocument):
+        async with semaphore:
+            try:
+                if pipeline == "workspace":
+                    result = await service.add_workspace_file_embeddings(
+                        file_key=doc.key,
+                        workspace_id=1,
+                        file_id=str(index),
+                        bucket=WORKSPACE_BUCKET,
+                    )
+                else:
+                    result = await service.add_file_embeddings(
+                        file_key=doc.key,
+                        file_name=doc.key.split("/")[-1],
+                        user_id=1,
+                        file_id=str(uuid.uuid4()),
+                    )
+                chunk_counts.append(result["chunks"])
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                failures.append(f"{doc.key}: {e}")
+
+    # The pipeline prints every chunk; keep that cost but not the noise.
+    start = time.perf_counter()
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            await asyncio.gather(*(ingest(i, d) for i, d in enumerate(documents)))
+    wall = time.perf_counter() - start
+
+    if backend == "chroma":
+        store.client.delete_collection(store.collection_name)
+    scratch.cleanup()
+
+    docs = len(chunk_counts)
+    chunks = sum(chunk_counts)
+    return {
+        "docs": docs,
+        "chunks": chunks,
+        "failures": failures,
+        "wall_s": wall,
+        "docs_per_s": docs / wall if wall else 0.0,
+        "chunks_per_s": chunks / wall if wall else 0.0,
+        "stages": recorder.summary(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def compare(current: dict, baseline: dict) -> List[str]:
+    """Return human-readable lines comparing two result documents."""
+
+    def delta(new: float, old: float) -> str:
+        if not old:
+            return "n/a"
+        return f"{100 * (new - old) / old:+.1f}%"
+
+    lines = [
+        f"Comparing {current['meta'].get('commit')} "
+        f"against {baseline['meta'].get('commit')}"
+    ]
+    for name, result in current["pipelines"].items():
+        base = baseline.get("pipelines", {}).get(name)
+        if not base:
+            continue
+        lines.append(f"[{name}]")
+        for metric in ("docs_per_s", "chunks_per_s", "peak_rss_mb"):
+            lines.append(
+                f"  {metric:<14} {base[metric]:>10.2f} -> {result[metric]:>10.2f} "
+                f"({delta(result[metric], base[metric])})"
+            )
+        for stage in STAGES:
+            for metric in ("p50_ms", "p95_ms"):
+                new = result["stages"][stage][metric]
+                old = base["stages"][stage][metric]
+                lines.append(
+                    f"  {stage + '.' + metric:<14} {old:>10.2f} -> {new:>10.2f} "
+                    f"({delta(new, old)})"
+                )
+    return lines
+
+
+def format_report(results: dict) -> List[str]:
+    """Return human-readable lines summarizing a result document."""
+    lines = []
+    for name, result in results["pipelines"].items():
+        lines.append(
+            f"[{name}] {result['docs']} docs, {result['chunks']} chunks in "
+            f"{result['wall_s']:.2f}s -> {result['docs_per_s']:.2f} docs/s, "
+            f"{result['chunks_per_s']:.1f} chunks/s, peak RSS "
+            f"{result['peak_rss_mb']:.0f} MiB"
+        )
+        for stage, stats in result["stages"].items():
+            lines.append(
+                f"  {stage:<9} n={stats['count']:<5} p50={stats['p50_ms']:9.2f}ms "
+                f"p95={stats['p95_ms']:9.2f}ms total={stats['total_ms']:10.1f}ms"
+            )
+        for failure in result["failures"]:
+            lines.append(f"  FAILED {failure}")
+    return lines
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--docs-per-format", type=int, default=3)
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument(
+        "--pipelines",
+        nargs="+",
+        choices=("workspace", "chat"),
+        default=["workspace", "chat"],
+    )
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--vector-store", choices=("chroma", "local"), default="chroma")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--encoder",
+        default="intfloat/multilingual-e5-base",
+        help='sentence-transformers model name, or "hash" for the offline stand-in',
+    )
+    parser.add_argument("--output", help="Write JSON results to this path")
+    parser.add_argument("--compare", help="Baseline JSON results to compare against")
+    return parser.parse_args(argv)
+
+
+async def main(argv: List[str] | None = None) -> dict:
+    """Run the benchmark and return the result document."""
+    args = parse_args(argv)
+    rss_before_model = peak_rss_mb()
+
+    documents = generate_corpus(
+        docs_per_format=args.docs_per_format,
+        size_classes=args.sizes,
+        formats=args.formats,
+        seed=args.seed,
+    )
+    model = load_encoder(args.encoder)
+
+    results = {
+        "meta": run_metadata(
+            "ingestion",
+            encoder=args.encoder,
+            vector_store=args.vector_store,
+            corpus={
+                "docs_per_format": args.docs_per_format,
+                "sizes": args.sizes,
+                "formats": args.formats,
+                "seed": args.seed,
+                "documents": len(documents),
+                "bytes": sum(len(d.content) for d in documents),
+            },
+            concurrency=args.concurrency,
+            rss_before_model_mb=rss_before_model,
+        ),
+        "pipelines": {},
+    }
+
+    for pipeline in args.pipelines:
+        print(
+            f"Running {pipeline} pipeline on {len(documents)} documents…",
+            file=sys.stderr,
+        )
+        results["pipelines"][pipeline] = await run_pipeline(
+            pipeline, documents, model, args.concurrency, args.vector_store
+        )
+
+    print("\n".join(format_report(results)))
+
+    if args.output:
+        write_results(args.output, results)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print("\n".join(compare(results, json.load(f))))
+
+    return results
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,186 @@
+"""Memory and encode throughput of per-process models versus the embedding server.
+
+For each worker count N, starts N processes the way ``uvicorn --workers N``
+would and has every one of them encode the same stream of chunk batches, once
+with a model loaded in each process (``local``) and once through a single
+``app.services.ai.embedding_server`` process (``server``). Reports the summed
+resident set size of all processes involved after the model is ready and the
+aggregate encode throughput.
+
+``--encoder hash`` (the default) has almost no weights of its own; pass
+``--model-mb`` to give it a weight matrix of that size so the memory effect of
+sharing is visible without downloading a model.
+
+Usage:
+    python -m benchmarks.model_serving_benchmark --workers 1 2 4
+    python -m benchmarks.model_serving_benchmark --encoder intfloat/multilingual-e5-base --torch-threads 2
+"""
+
+import argparse
+import asyncio
+import multiprocessing as mp
+import os
+import random
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+
+from benchmarks.common import run_metadata, write_results
+from benchmarks.fakes import HashingEncoder
+
+_WORDS = (
+    "note workspace project meeting summary draft idea research document chapter "
+    "invoice backup release feature design cluster storage index review plan"
+).split()
+
+
+def load_encoder(name: str, model_mb: int):
+    """Return the hashing stand-in (with ballast weights) or the real model."""
+    if name == "hash":
+        encoder = HashingEncoder()
+        # Touched pages, so they count towards RSS like loaded weights do.
+        encoder.weights = np.ones(model_mb * 1024 * 1024 // 4, dtype=np.float32)
+        return encoder
+
+    # pylint: disable=import-outside-toplevel
+    from app.services.ai.model_registry import load_local_model
+
+    return load_local_model(name)
+
+
+def rss_mb(pid: int) -> float:
+    """Return the resident set size of a process in MiB (0 if unavailable)."""
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def _serve(args: argparse.Namespace, socket_path: str) -> None:
+    # pylint: disable-next=import-outside-toplevel
+    from app.services.ai.embedding_server import EmbeddingServer
+
+    async def run() -> None:
+        model = load_encoder(args.encoder, args.model_mb)
+        server = EmbeddingServer(model, socket_path, args.max_batch, args.max_wait_ms)
+        await server.start()
+        await asyncio.Event().wait()
+
+    asyncio.run(run())
+
+
+def _work(args, socket_path, texts, ready, start, results) -> None:
+    if socket_path:
+        # pylint: disable-next=import-outside-toplevel
+        from app.services.ai.embedding_server import RemoteEmbeddingModel
+
+        model = RemoteEmbeddingModel(socket_path).wait_ready(300)
+    else:
+        model = load_encoder(args.encoder, args.model_mb)
+    ready.put(os.getpid())
+    start.wait()
+
+    began = time.perf_counter()
+    for offset in range(0, len(texts), args.batch):
+        model.encode(texts[offset : offset + args.batch], batch_size=args.batch)
+    results.put(time.perf_counter() - began)
+
+
+def measure(args, mode: str, workers: int, texts: List[str]) -> dict:
+    """Run one configuration and return its memory and throughput."""
+    ctx = mp.get_context("spawn")
+    ready, results, start = ctx.Queue(), ctx.Queue(), ctx.Event()
+    processes = []
+    socket_path = None
+    with tempfile.TemporaryDirectory() as tmp:
+        if mode == "server":
+            socket_path = os.path.join(tmp, "embed.sock")
+            processes.append(ctx.Process(target=_serve, args=(args, socket_path)))
+        processes += [
+            ctx.Process(
+                target=_work, args=(args, socket_path, texts, ready, start, results)
+            )
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            for _ in range(workers):
+                ready.get(timeout=600)
+            total_rss = sum(rss_mb(process.pid) for process in processes)
+
+            began = time.perf_counter()
+            start.set()
+            worker_secs = [results.get(timeout=600) for _ in range(workers)]
+            wall = time.perf_counter() - began
+        finally:
+            for process in processes:
+                process.terminate()
+                process.join()
+
+    return {
+        "rss_mb": total_rss,
+        "texts_per_sec": workers * len(texts) / wall,
+        "slowest_worker_secs": max(worker_secs),
+    }
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--texts", type=int, default=512)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--encoder", default="hash")
+    parser.add_argument("--model-mb", type=int, default=256)
+    parser.add_argument("--torch-threads", type=int)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write JSON results to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> dict:
+    """Run the benchmark and return the result document."""
+    args = parse_args(argv)
+    if args.torch_threads:
+        # Read by the settings of every spawned process.
+        os.environ["TORCH_NUM_THREADS"] = str(args.torch_threads)
+    rng = random.Random(args.seed)
+    # Roughly the length of an ingested chunk.
+    texts = [" ".join(rng.choices(_WORDS, k=120)) for _ in range(args.texts)]
+
+    results = {
+        "meta": run_metadata(
+            "model_serving",
+            encoder=args.encoder,
+            model_mb=args.model_mb,
+            texts=args.texts,
+            batch=args.batch,
+            torch_threads=args.torch_threads,
+        ),
+        "runs": {},
+    }
+    for workers in args.workers:
+        for mode in ("local", "server"):
+            stats = measure(args, mode, workers, texts)
+            results["runs"][f"{mode}-{workers}"] = stats
+            print(
+                f"[{mode:>6} workers={workers}] rss={stats['rss_mb']:8.1f}MiB "
+                f"throughput={stats['texts_per_sec']:9.1f} texts/s"
+            )
+
+    if args.output:
+        write_results(args.output, results)
+    return results
+
+
+if __name__ == "__main__":
+    main()
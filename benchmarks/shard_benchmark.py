@@ -0,0 +1,154 @@
+"""Query latency of a small tenant as the total Chroma corpus grows.
+
+Loads one small "probe" workspace plus a growing number of filler workspaces and
+measures workspace-filtered queries for the probe tenant with the single-collection
+layout and with the sharded layouts of ``ChromaVectorStore``. With one collection
+the filtered HNSW search has to walk past every other tenant's vectors; with
+shards it only sees the probe tenant's own collection.
+
+Usage:
+    python -m benchmarks.shard_benchmark --corpus-sizes 5000 20000 80000
+    python -m benchmarks.shard_benchmark --chroma-host localhost --chroma-port 8001
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from typing import List
+
+import numpy as np
+
+from benchmarks.common import latency_summary, run_metadata, write_results
+
+PROBE_WORKSPACE = 0
+
+
+def make_client(args: argparse.Namespace):
+    """Return an HTTP client for ``--chroma-host`` or an in-process one."""
+    # pylint: disable=import-outside-toplevel
+    import chromadb
+
+    if args.chroma_host:
+        return chromadb.HttpClient(host=args.chroma_host, port=args.chroma_port)
+    return chromadb.EphemeralClient()
+
+
+async def load_workspace(store, workspace_id: int, vectors: np.ndarray) -> None:
+    """Insert the vectors of one workspace in batches."""
+    batch = 2000
+    for start in range(0, len(vectors), batch):
+        rows = range(start, min(start + batch, len(vectors)))
+        await store.add(
+            ids=[f"workspace_{workspace_id}_file_0_{i}" for i in rows],
+            embeddings=vectors[rows.start : rows.stop],
+            documents=[f"chunk {i}" for i in rows],
+            metadatas=[
+                {"workspace_id": workspace_id, "file_id": "0", "chunk_index": i}
+                for i in rows
+            ],
+        )
+
+
+async def run_layout(layout: str, args: argparse.Namespace, rng) -> List[dict]:
+    """Grow the corpus step by step and time probe-tenant queries at each size."""
+    # pylint: disable=import-outside-toplevel
+    from app.services.ai.chroma_client import ChromaVectorStore
+
+    client = make_client(args)
+    base = f"bench-{uuid.uuid4().hex[:8]}"
+    store = ChromaVectorStore(
+        base,
+        client=client,
+        shard_mode=layout,
+        shard_count=args.shard_count,
+        legacy_fallback=False,
+    )
+
+    probe = rng.normal(size=(args.probe_vectors, args.dim)).astype(np.float32)
+    await load_workspace(store, PROBE_WORKSPACE, probe)
+
+    rows, loaded, workspace_id = [], args.probe_vectors, PROBE_WORKSPACE
+    for size in sorted(args.corpus_sizes):
+        while loaded < size:
+            workspace_id += 1
+            count = min(args.filler_vectors, size - loaded)
+            filler = rng.normal(size=(count, args.dim)).astype(np.float32)
+            await load_workspace(store, workspace_id, filler)
+            loaded += count
+
+        latencies = []
+        for _ in range(args.queries):
+            query = probe[rng.integers(len(probe))] + 0.1 * rng.normal(size=args.dim)
+            start = time.perf_counter()
+            await store.query(
+                [query.astype(np.float32)],
+                n_results=args.k,
+                filters={"workspace_id": PROBE_WORKSPACE},
+            )
+            latencies.append(time.perf_counter() - start)
+
+        summary = latency_summary(latencies)
+        rows.append({"corpus_size": loaded, "tenants": workspace_id + 1, **summary})
+        print(
+            f"[{layout:<6}] corpus={loaded:>8} p50={summary['p50_ms']:7.2f}ms "
+            f"p95={summary['p95_ms']:7.2f}ms"
+        )
+
+    for name in await store.list_collections():
+        if name.startswith(base):
+            client.delete_collection(name)
+    return rows
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument(
+        "--corpus-sizes", type=int, nargs="+", default=[2_000, 10_000, 40_000]
+    )
+    parser.add_argument("--probe-vectors", type=int, default=200)
+    parser.add_argument("--filler-vectors", type=int, default=2_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--shard-count", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--layouts",
+        nargs="+",
+        choices=("single", "tenant", "hashed"),
+        default=["single", "tenant", "hashed"],
+    )
+    parser.add_argument("--chroma-host", help="Benchmark a Chroma server over HTTP")
+    parser.add_argument("--chroma-port", type=int, default=8001)
+    parser.add_argument("--output", help="Write JSON results to this path")
+    return parser.parse_args(argv)
+
+
+async def main(argv: List[str] | None = None) -> dict:
+    """Run the benchmark and return the result document."""
+    args = parse_args(argv)
+    results = {
+        "meta": run_metadata(
+            "chroma_sharding",
+            dim=args.dim,
+            probe_vectors=args.probe_vectors,
+            queries=args.queries,
+            k=args.k,
+            shard_count=args.shard_count,
+            chroma="http" if args.chroma_host else "ephemeral",
+        ),
+        "layouts": {},
+    }
+    for layout in args.layouts:
+        rng = np.random.default_rng(args.seed)
+        results["layouts"][layout] = await run_layout(layout, args, rng)
+
+    if args.output:
+        write_results(args.output, results)
+    return results
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
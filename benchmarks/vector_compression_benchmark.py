@@ -0,0 +1,171 @@
+"""Recall@k vs. memory report for the vector compression options.
+
+Evaluates float16 / int8 quantization and PCA reduction (alone and combined) on
+embeddings from our own data. It pulls them from a Chroma collection, or from an
+exported ``.npy`` matrix, and falls back to synthetic clustered vectors. A
+held-out set of stored vectors serves as queries. Ground truth is exact float32
+search, so the reported recall is what compression alone costs on top of the
+exact local store.
+
+Usage:
+    python -m benchmarks.vector_compression_benchmark --chroma-host localhost \\
+        --collection document --output out.json
+    python -m benchmarks.vector_compression_benchmark --npy embeddings.npy \\
+        --save-pca data/pca-256.npz --save-pca-dim 256
+"""
+
+import argparse
+from typing import List
+
+import numpy as np
+
+from app.services.ai.vector_compression import (
+    PcaProjection,
+    bytes_per_vector,
+    dequantize,
+    quantize,
+)
+from benchmarks.common import run_metadata, write_results
+from benchmarks.vector_store_benchmark import generate_vectors
+
+
+def load_from_chroma(args: argparse.Namespace) -> np.ndarray:
+    """Page every embedding out of a Chroma collection."""
+    # pylint: disable=import-outside-toplevel
+    import chromadb
+
+    client = chromadb.HttpClient(host=args.chroma_host, port=args.chroma_port)
+    collection = client.get_collection(args.collection)
+    batches, offset = [], 0
+    while args.limit is None or offset < args.limit:
+        batch = collection.get(limit=1000, offset=offset, include=["embeddings"])
+        if not batch["ids"]:
+            break
+        batches.append(np.asarray(batch["embeddings"], dtype=np.float32))
+        offset += len(batch["ids"])
+    return np.concatenate(batches)
+
+
+def load_vectors(args: argparse.Namespace) -> tuple[np.ndarray, str]:
+    """Return the evaluation corpus and a label describing its source."""
+    if args.chroma_host:
+        return load_from_chroma(args), f"chroma:{args.collection}"
+    if args.npy:
+        return np.load(args.npy).astype(np.float32), f"npy:{args.npy}"
+    data = generate_vectors(args.synthetic, args.dim, 20, 25, args.seed)
+    return data["vectors"], "synthetic"
+
+
+def nearest(base: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Return the indices of the exact ``k`` nearest base rows per query."""
+    distances = (
+        np.einsum("ij,ij->i", base, base)[None, :]
+        - 2.0 * queries @ base.T
+        + np.einsum("ij,ij->i", queries, queries)[:, None]
+    )
+    top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(distances, top, axis=1).argsort(axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    """Return mean overlap between found and true neighbour sets."""
+    return float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)]))
+
+
+def evaluate(
+    base: np.ndarray,
+    queries: np.ndarray,
+    truth: np.ndarray,
+    k: int,
+    projection: PcaProjection | None,
+    mode: str,
+) -> dict:
+    """Compress the base, search it exactly and compare with ground truth."""
+    if projection is not None:
+        base, queries = projection.transform(base), projection.transform(queries)
+    stored = dequantize(*quantize(base, mode))
+    size = bytes_per_vector(base.shape[1], mode)
+    return {
+        "dim": int(base.shape[1]),
+        "quantization": mode,
+        "bytes_per_vector": size,
+        "total_mb": size * len(base) / (1024 * 1024),
+        f"recall@{k}": recall(nearest(stored, queries, k), truth),
+    }
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--chroma-host", help="Read embeddings from a Chroma server")
+    parser.add_argument("--chroma-port", type=int, default=8001)
+    parser.add_argument("--collection", default="document")
+    parser.add_argument("--limit", type=int, help="Read at most this many vectors")
+    parser.add_argument("--npy", help="Read embeddings from an exported .npy matrix")
+    parser.add_argument("--synthetic", type=int, default=20_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--pca-dims", type=int, nargs="*", default=[384, 256, 128])
+    parser.add_argument("--pca-sample", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--save-pca", help="Write a fitted projection (.npz)")
+    parser.add_argument("--save-pca-dim", type=int, default=256)
+    parser.add_argument("--output", help="Write JSON results to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> dict:
+    """Run the report and return the result document."""
+    args = parse_args(argv)
+    vectors, source = load_vectors(args)
+    rng = np.random.default_rng(args.seed)
+    order = rng.permutation(len(vectors))
+    queries = vectors[order[: args.queries]]
+    base = vectors[order[args.queries :]]
+    truth = nearest(base, queries, args.k)
+    sample = base[rng.permutation(len(base))[: args.pca_sample]]
+
+    results = {
+        "meta": run_metadata(
+            "vector_compression",
+            source=source,
+            vectors=len(base),
+            dim=int(base.shape[1]),
+            queries=len(queries),
+            k=args.k,
+            pca_sample=len(sample),
+        ),
+        "configs": {},
+    }
+
+    projections = {None: None}
+    for dim in args.pca_dims:
+        if dim < base.shape[1]:
+            projections[dim] = PcaProjection.fit(sample, dim)
+    for dim, projection in projections.items():
+        for mode in ("float32", "float16", "int8"):
+            name = f"{mode}" if dim is None else f"pca{dim}+{mode}"
+            stats = evaluate(base, queries, truth, args.k, projection, mode)
+            if projection is not None:
+                stats["explained_variance"] = projection.explained_variance_ratio(
+                    sample
+                )
+            results["configs"][name] = stats
+            print(
+                f"{name:<16} {stats['bytes_per_vector']:>6} B/vec "
+                f"{stats['total_mb']:9.1f} MiB recall@{args.k}="
+                f"{stats[f'recall@{args.k}']:.3f}"
+            )
+
+    if args.save_pca:
+        PcaProjection.fit(sample, args.save_pca_dim).save(args.save_pca)
+        print(f"PCA projection ({args.save_pca_dim} dims) written to {args.save_pca}")
+    if args.output:
+        write_results(args.output, results)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Memory and throughput of handing encoder output to the vector store.
+
+Encodes one large synthetic file (10k chunks by default) once, then writes the
+vectors to a store two ways:
+
+* ``list``: ``.tolist()`` first, as the ingestion path used to (one boxed Python
+  float per component);
+* ``array``: the contiguous float32 matrix the encoder returned.
+
+For each mode the benchmark reports wall time, peak traced memory, net
+allocated blocks, and the number of GC runs it triggered. The ``payload``
+stage builds the body Chroma's HTTP client sends for a write (packed float32,
+base64, orjson). The ``write`` stage stores the vectors in an in-process
+backend.
+
+Usage:
+    python -m benchmarks.vector_handoff_benchmark --chunks 10000 --output out.json
+"""
+
+import argparse
+import asyncio
+import gc
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from typing import Any, Callable, List
+
+from benchmarks.common import run_metadata, write_results
+from benchmarks.fakes import HashingEncoder
+
+
+class _GcCounter:
+    """Count garbage collector runs while active."""
+
+    def __init__(self):
+        self.runs = 0
+
+    def _callback(self, phase: str, _info: dict) -> None:
+        if phase == "start":
+            self.runs += 1
+
+    def __enter__(self):
+        gc.callbacks.append(self._callback)
+        return self
+
+    def __exit__(self, *exc):
+        gc.callbacks.remove(self._callback)
+
+
+def chroma_payload(embeddings) -> bytes:
+    """Serialize embeddings the way chromadb's HTTP client does for writes."""
+    # pylint: disable=import-outside-toplevel
+    import orjson
+    from chromadb.api.types import optional_embeddings_to_base64_strings
+
+    return orjson.dumps(
+        {"embeddings": optional_embeddings_to_base64_strings(embeddings)},
+        option=orjson.OPT_SERIALIZE_NUMPY,
+    )
+
+
+def build_store(backend: str, root: str):
+    """Create an empty in-process store."""
+    # pylint: disable=import-outside-toplevel
+    if backend == "local":
+        from app.services.ai.local_vector_store import LocalVectorStore
+
+        return LocalVectorStore(root)
+
+    import chromadb
+    from app.services.ai.chroma_client import ChromaVectorStore
+
+    return ChromaVectorStore(
+        f"handoff-{uuid.uuid4().hex[:8]}", client=chromadb.EphemeralClient()
+    )
+
+
+async def measure(step: Callable[[], Any]) -> dict:
+    """Run ``step`` twice: once for wall time, once traced for memory."""
+    gc.collect()
+    with _GcCounter() as counter:
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        result = step()
+        if asyncio.iscoroutine(result):
+            result = await result
+        elapsed = time.perf_counter() - start
+        blocks = sys.getallocatedblocks() - blocks
+    del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = step()
+    if asyncio.iscoroutine(result):
+        await result
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "seconds": elapsed,
+        "peak_mb": peak / (1024 * 1024),
+        "net_blocks": blocks,
+        "gc_runs": counter.runs,
+    }
+
+
+async def run_mode(mode: str, vectors, chunks: List[str], args, root: str) -> dict:
+    """Measure handoff, payload and write for one representation."""
+    ids = [f"workspace_1_file_bench_{i}" for i in range(len(chunks))]
+    metadatas = [
+        {"workspace_id": 1, "file_id": "bench", "chunk_index": i}
+        for i in range(len(chunks))
+    ]
+
+    def handoff():
+        return vectors.tolist() if mode == "list" else vectors
+
+    embeddings = handoff()
+    stages = {
+        "handoff": await measure(handoff),
+        "payload": await measure(lambda: chroma_payload(embeddings)),
+    }
+
+    for backend in args.backends:
+
+        def write(backend=backend):
+            store = build_store(backend, f"{root}/{mode}-{uuid.uuid4().hex[:6]}")
+            return store.add(ids, embeddings, chunks, metadatas)
+
+        stages[f"write_{backend}"] = await measure(write)
+
+    return stages
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--chunks", type=int, default=10_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument(
+        "--backends", nargs="*", choices=("local", "chroma"), default=["local"]
+    )
+    parser.add_argument("--output", help="Write JSON results to this path")
+    return parser.parse_args(argv)
+
+
+async def main(argv: List[str] | None = None) -> dict:
+    """Run the benchmark and return the result document."""
+    args = parse_args(argv)
+    chunks = [f"chunk {i} of a very large document" for i in range(args.chunks)]
+    vectors = HashingEncoder(args.dim).encode(chunks, convert_to_numpy=True)
+
+    results = {
+        "meta": run_metadata(
+            "vector_handoff", chunks=args.chunks, dim=args.dim, backends=args.backends
+        ),
+        "modes": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="bench-handoff-") as root:
+        for mode in ("list", "array"):
+            stages = await run_mode(mode, vectors, chunks, args, root)
+            results["modes"][mode] = stages
+            for stage, stats in stages.items():
+                print(
+                    f"[{mode:<5}] {stage:<13} {stats['seconds'] * 1000:9.1f}ms "
+                    f"peak={stats['peak_mb']:8.1f}MiB "
+                    f"blocks={stats['net_blocks']:>9} gc={stats['gc_runs']}"
+                )
+
+    if args.output:
+        write_results(args.output, results)
+    return results
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
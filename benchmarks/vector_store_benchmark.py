@@ -0,0 +1,214 @@
+"""Recall and latency benchmark for the vector store backends.
+
+Loads the same synthetic multi-tenant corpus into the embedded ``LocalVectorStore``
+and into Chroma (in-process ``EphemeralClient`` by default, or a running server via
+``--chroma-host``), runs workspace- and file-filtered queries and compares the
+results against exact brute-force ground truth.
+
+Usage:
+    python -m benchmarks.vector_store_benchmark --vectors 20000 --output out.json
+    python -m benchmarks.vector_store_benchmark --chroma-host localhost --chroma-port 8001
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+import uuid
+from typing import Dict, List
+
+import numpy as np
+
+from benchmarks.common import latency_summary, peak_rss_mb, run_metadata, write_results
+
+
+def generate_vectors(
+    n_vectors: int, dim: int, workspaces: int, files_per_workspace: int, seed: int
+) -> Dict[str, np.ndarray]:
+    """Generate clustered vectors with workspace/file assignments.
+
+    Each file is a cluster around its own centre, which mimics chunks of the same
+    document being closer to each other than to other documents.
+    """
+    rng = np.random.default_rng(seed)
+    n_files = workspaces * files_per_workspace
+    centres = rng.normal(size=(n_files, dim)).astype(np.float32)
+    file_of = rng.integers(0, n_files, size=n_vectors)
+    vectors = centres[file_of] + 0.6 * rng.normal(size=(n_vectors, dim)).astype(
+        np.float32
+    )
+    return {
+        "vectors": vectors.astype(np.float32),
+        "file": file_of,
+        "workspace": file_of // files_per_workspace,
+    }
+
+
+def build_backends(names: List[str], args: argparse.Namespace, root: str) -> dict:
+    """Create the vector stores under test."""
+    # pylint: disable=import-outside-toplevel
+    from app.services.ai.local_vector_store import LocalVectorStore
+
+    backends = {}
+    for name in names:
+        if name == "local":
+            backends[name] = LocalVectorStore(root)
+            continue
+
+        import chromadb
+        from app.services.ai.chroma_client import ChromaVectorStore
+
+        client = (
+            chromadb.HttpClient(host=args.chroma_host, port=args.chroma_port)
+            if args.chroma_host
+            else chromadb.EphemeralClient()
+        )
+        backends[name] = ChromaVectorStore(
+            f"bench-{uuid.uuid4().hex[:12]}", client=client
+        )
+    return backends
+
+
+async def load(store, data: Dict[str, np.ndarray]) -> float:
+    """Insert every file as one batch, like the ingestion pipeline does."""
+    start = time.perf_counter()
+    for file_id in np.unique(data["file"]):
+        rows = np.flatnonzero(data["file"] == file_id)
+        workspace_id = int(data["workspace"][rows[0]])
+        await store.add(
+            ids=[f"workspace_{workspace_id}_file_{file_id}_{i}" for i in rows],
+            embeddings=data["vectors"][rows],
+            documents=[f"chunk {i}" for i in rows],
+            metadatas=[
+                {
+                    "workspace_id": workspace_id,
+                    "file_id": str(file_id),
+                    "chunk_index": i,
+                }
+                for i in range(len(rows))
+            ],
+        )
+    return time.perf_counter() - start
+
+
+def ground_truth(
+    data: Dict[str, np.ndarray], query: np.ndarray, mask: np.ndarray, k: int
+) -> set:
+    """Return the ids of the exact ``k`` nearest vectors among ``mask`` rows."""
+    rows = np.flatnonzero(mask)
+    distances = ((data["vectors"][rows] - query) ** 2).sum(axis=1)
+    nearest = rows[np.argsort(distances)[:k]]
+    return {
+        f"workspace_{int(data['workspace'][i])}_file_{int(data['file'][i])}_{i}"
+        for i in nearest
+    }
+
+
+async def measure(store, data, queries, k: int) -> dict:
+    """Run every query against a store and return latency and recall."""
+    results = {}
+    for mode in ("workspace", "file"):
+        latencies, recalls = [], []
+        for row, query in queries:
+            workspace_id = int(data["workspace"][row])
+            filters = {"workspace_id": workspace_id}
+            mask = data["workspace"] == workspace_id
+            if mode == "file":
+                filters["file_id"] = str(int(data["file"][row]))
+                mask = mask & (data["file"] == data["file"][row])
+
+            start = time.perf_counter()
+            response = await store.query([query], n_results=k, filters=filters)
+            latencies.append(time.perf_counter() - start)
+
+            truth = ground_truth(data, query, mask, k)
+            found = set(response["ids"][0])
+            recalls.append(len(found & truth) / max(1, len(truth)))
+
+        results[mode] = {
+            **latency_summary(latencies),
+            f"recall@{k}": float(np.mean(recalls)),
+        }
+    return results
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--vectors", type=int, default=20_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--workspaces", type=int, default=20)
+    parser.add_argument("--files-per-workspace", type=int, default=25)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=("local", "chroma"),
+        default=["local", "chroma"],
+    )
+    parser.add_argument("--chroma-host", help="Benchmark a Chroma server over HTTP")
+    parser.add_argument("--chroma-port", type=int, default=8001)
+    parser.add_argument("--output", help="Write JSON results to this path")
+    return parser.parse_args(argv)
+
+
+async def main(argv: List[str] | None = None) -> dict:
+    """Run the benchmark and return the result document."""
+    args = parse_args(argv)
+    data = generate_vectors(
+        args.vectors, args.dim, args.workspaces, args.files_per_workspace, args.seed
+    )
+    rng = np.random.default_rng(args.seed + 1)
+    query_rows = rng.integers(0, args.vectors, size=args.queries)
+    queries = [
+        (
+            int(row),
+            data["vectors"][row] + 0.3 * rng.normal(size=args.dim).astype(np.float32),
+        )
+        for row in query_rows
+    ]
+
+    results = {
+        "meta": run_metadata(
+            "vector_store",
+            vectors=args.vectors,
+            dim=args.dim,
+            workspaces=args.workspaces,
+            files_per_workspace=args.files_per_workspace,
+            queries=args.queries,
+            k=args.k,
+            chroma="http" if args.chroma_host else "ephemeral",
+        ),
+        "backends": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="bench-local-store-") as root:
+        for name, store in build_backends(args.backends, args, root).items():
+            load_s = await load(store, data)
+            stats = await measure(store, data, queries, args.k)
+            results["backends"][name] = {
+                "load_s": load_s,
+                "vectors_per_s": args.vectors / load_s if load_s else 0.0,
+                "queries": stats,
+                "peak_rss_mb": peak_rss_mb(),
+            }
+            if name == "chroma":
+                await store.client.delete_collection(store.collection_name)
+
+            print(f"[{name}] loaded {args.vectors} vectors in {load_s:.2f}s")
+            for mode, mode_stats in stats.items():
+                print(
+                    f"  {mode:<9} p50={mode_stats['p50_ms']:8.2f}ms "
+                    f"p95={mode_stats['p95_ms']:8.2f}ms "
+                    f"recall@{args.k}={mode_stats[f'recall@{args.k}']:.3f}"
+                )
+
+    if args.output:
+        write_results(args.output, results)
+    return results
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -35,3 +35,11 @@ The retrieved context will be shown like this:
 Base your response solely on the retrieved context and the user's question. 
 When composing your answer, preserve Markdown formatting where possible, and make your response clear, concise, and helpful for note-taking.
 """
+
+CONVERSATION_SUMMARY_PROMPT_V1 = """
+You maintain the running summary of a conversation between a user and the CoWrite note assistant.
+You are given the current summary (possibly empty) and the next messages of the conversation.
+Rewrite the summary so it also covers the new messages. Keep facts, decisions, names, open questions
+and the user's preferences; drop greetings and repetition. Write plain prose in the conversation's
+language, at most {max_chars} characters. Reply with the summary only.
+"""
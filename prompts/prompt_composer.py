@@ -2,6 +2,7 @@
 
 from typing import Optional
 
+
 class PromptComposer:
     """Builds the final prompt sent to the LLM."""
 
@@ -11,6 +12,7 @@ class PromptComposer:
         file_context: Optional[str] = None,
         system_instruction: Optional[str] = None,
         workspace_context: Optional[str] = None,
+        conversation_history: Optional[str] = None,
     ) -> str:
         """Combine system prompt, file context, and user input into a single formatted prompt."""
         sections = []
@@ -24,6 +26,9 @@ class PromptComposer:
         if workspace_context:
             sections.append(f"### Workspace Context\n{workspace_context.strip()}")
 
+        if conversation_history:
+            sections.append(f"### Conversation History\n{conversation_history.strip()}")
+
         sections.append(f"### User Prompt\n{user_prompt.strip()}")
 
-        return "\n\n".join(sections)
\ No newline at end of file
+        return "\n\n".join(sections)
@@ -0,0 +1,69 @@
+"""Tests for the ASGI session authentication middleware."""
+
+import json
+import time
+
+import jwt
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.core.settings import settings
+from app.middleware.auth_middleware import AuthMiddleware
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(AuthMiddleware, public_paths=["/health", "/internal/"])
+
+    @app.get("/me")
+    async def me(request: Request):
+        return {"user": request.state.user}
+
+    @app.get("/health")
+    async def health(request: Request):
+        return {"user": getattr(request.state, "user", "unset")}
+
+    @app.get("/internal/embed")
+    async def internal():
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def _session(user: dict) -> dict:
+    token = jwt.encode(
+        {"sub": json.dumps(user), "exp": int(time.time()) + 60},
+        settings.jwt_secret_key,
+        algorithm="HS256",
+    )
+    return {settings.user_cookie_name: token}
+
+
+def test_valid_session_sets_the_user():
+    """A valid cookie puts the decoded user on request.state."""
+    client = _client()
+    client.cookies.update(_session({"id": 9}))
+    assert client.get("/me").json() == {"user": {"id": 9}}
+
+
+def test_missing_session_is_anonymous():
+    """Without a cookie the request goes through with no user."""
+    assert _client().get("/me").json() == {"user": None}
+
+
+def test_invalid_session_is_rejected():
+    """A cookie that does not verify gets a 401."""
+    client = _client()
+    client.cookies.update({settings.user_cookie_name: "not.a.jwt"})
+    response = client.get("/me")
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Invalid or expired session"}
+
+
+def test_public_paths_skip_authentication():
+    """Allow-listed paths are served even with a bad cookie, without a user."""
+    client = _client()
+    client.cookies.update({settings.user_cookie_name: "not.a.jwt"})
+    assert client.get("/health").json() == {"user": "unset"}
+    assert client.get("/internal/embed").json() == {"ok": True}
+    assert client.get("/internal").status_code == 401
@@ -1,4 +1,4 @@
-"""Unit tests for auth_service.verify_user."""
+"""Unit tests for auth_service.verify_user and its verified-token cache."""
 
 import json
 import time
@@ -6,7 +6,7 @@ import jwt
 import pytest
 
 from app.core.settings import settings
-from app.services.auth.auth_service import verify_user
+from app.services.auth.auth_service import VerifiedTokenCache, verify_user
 
 
 @pytest.mark.asyncio
@@ -55,3 +55,54 @@ async def test_verify_user_malformed_token_returns_none():
     result = await verify_user("not.a.valid.jwt")
 
     assert result is None
+
+
+async def test_verify_user_decodes_a_token_once(monkeypatch):
+    """Repeated verifications of a token are answered from the cache."""
+    calls = []
+    decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(jwt, "decode", counting_decode)
+    payload = {"sub": json.dumps({"id": 5}), "exp": int(time.time()) + 60}
+    token = jwt.encode(payload, settings.jwt_secret_key, algorithm="HS256")
+
+    first = await verify_user(token)
+    first["id"] = 6  # callers get their own copy
+    assert await verify_user(token) == {"id": 5}
+    assert calls == [token]
+
+    assert await verify_user("not.a.valid.jwt") is None
+    assert await verify_user("not.a.valid.jwt") is None
+    assert calls.count("not.a.valid.jwt") == 2
+
+
+def test_cache_honours_token_expiry(monkeypatch):
+    """An entry lasts until the token's exp when that comes before the TTL."""
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = VerifiedTokenCache(max_entries=10, ttl_secs=300)
+    cache.put("short", {"id": 1}, exp=1010)
+    cache.put("long", {"id": 2}, exp=5000)
+
+    now[0] = 1011.0
+    assert cache.get("short") is None
+    assert cache.get("long") == {"id": 2}
+    now[0] = 1301.0
+    assert cache.get("long") is None
+
+
+def test_cache_evicts_least_recently_used():
+    """The cache keeps at most ``max_entries`` tokens, dropping the coldest."""
+    cache = VerifiedTokenCache(max_entries=2, ttl_secs=300)
+    cache.put("a", {"id": 1})
+    cache.put("b", {"id": 2})
+    assert cache.get("a") == {"id": 1}
+    cache.put("c", {"id": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"id": 1}
+    assert cache.get("c") == {"id": 3}
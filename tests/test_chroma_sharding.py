@@ -0,0 +1,197 @@
+"""Tests for tenant sharding in ChromaVectorStore (in-process Chroma)."""
+
+# pylint: disable=redefined-outer-name
+
+import asyncio
+import uuid
+
+import httpx
+import numpy as np
+import pytest
+
+chromadb = pytest.importorskip("chromadb")
+
+# pylint: disable=wrong-import-position
+from app.core.settings import settings
+from app.services.ai.chroma_client import ChromaVectorStore
+
+
+def _items(workspace_id: int, vectors: np.ndarray) -> dict:
+    """Build add() arguments for one workspace file."""
+    return {
+        "ids": [f"workspace_{workspace_id}_file_a_{i}" for i in range(len(vectors))],
+        "embeddings": vectors,
+        "documents": [f"chunk {i}" for i in range(len(vectors))],
+        "metadatas": [
+            {"workspace_id": workspace_id, "file_id": "a", "chunk_index": i}
+            for i in range(len(vectors))
+        ],
+    }
+
+
+@pytest.fixture
+def client():
+    """Shared in-process Chroma client."""
+    return chromadb.EphemeralClient()
+
+
+@pytest.fixture
+def base():
+    """Unique base collection name per test."""
+    return f"test-{uuid.uuid4().hex[:8]}"
+
+
+@pytest.fixture
+def vectors():
+    """Random float32 vectors shared by the tests."""
+    return np.random.default_rng(0).normal(size=(10, 8)).astype(np.float32)
+
+
+def test_shard_names_by_mode(client, base):
+    """Tenant mode names collections per tenant, hashed mode per bucket."""
+    tenant = ChromaVectorStore(base, client=client, shard_mode="tenant")
+    hashed = ChromaVectorStore(base, client=client, shard_mode="hashed", shard_count=4)
+
+    assert tenant.shard_name({"workspace_id": 3}) == f"{base}-workspace_3"
+    assert tenant.shard_name({"user_id": 9, "file_id": "x"}) == f"{base}-user_9"
+    assert tenant.shard_name({"file_id": "x"}) is None
+    assert hashed.shard_name({"workspace_id": 3}).startswith(f"{base}-shard-")
+    assert hashed.shard_name({"workspace_id": 3}) == hashed.shard_name(
+        {"workspace_id": 3, "file_id": "x"}
+    )
+
+
+@pytest.mark.asyncio
+async def test_writes_are_routed_and_reads_stay_in_one_shard(client, base, vectors):
+    """Each workspace gets its own collection and queries only see their tenant."""
+    store = ChromaVectorStore(
+        base, client=client, shard_mode="tenant", legacy_fallback=False
+    )
+    await store.add(**_items(1, vectors))
+    await store.add(**_items(2, vectors))
+
+    result = await store.query([vectors[0]], n_results=20, filters={"workspace_id": 2})
+    everything = await store.get()
+
+    assert f"{base}-workspace_1" in await store.list_collections()
+    assert base not in await store.list_collections()
+    assert len(result["ids"][0]) == 10
+    assert all(m["workspace_id"] == 2 for m in result["metadatas"][0])
+    assert len(everything["ids"]) == 20
+
+
+@pytest.mark.asyncio
+async def test_legacy_collection_is_read_until_migrated(client, base, vectors):
+    """Data in the single collection stays visible and migrates into shards."""
+    legacy = ChromaVectorStore(base, client=client, shard_mode="single")
+    await legacy.add(**_items(1, vectors))
+
+    store = ChromaVectorStore(base, client=client, shard_mode="tenant")
+    before = await store.query([vectors[0]], n_results=3, filters={"workspace_id": 1})
+    moved = await store.migrate_legacy_collection(batch_size=4)
+    after = await store.query([vectors[0]], n_results=3, filters={"workspace_id": 1})
+
+    assert moved == 10
+    assert client.get_collection(base).count() == 0
+    assert client.get_collection(f"{base}-workspace_1").count() == 10
+    assert before["ids"] == after["ids"]
+    assert after["ids"][0][0] == "workspace_1_file_a_0"
+
+
+class _FlakyCollection:
+    """Async collection stub that fails its first ``failures`` queries."""
+
+    def __init__(self, failures: int, error: Exception | None = None, delay=0.0):
+        self.failures = failures
+        self.error = error
+        self.delay = delay
+        self.calls = 0
+
+    async def query(self, **_kwargs):
+        """Fail (or stall) until the configured number of calls has passed."""
+        self.calls += 1
+        if self.calls <= self.failures:
+            if self.error:
+                raise self.error
+            await asyncio.sleep(self.delay)
+        return {"ids": [["x"]], "documents": [[""]], "metadatas": [[{}]]}
+
+
+class _RecordingCollection:
+    """Async collection stub that records upsert batches."""
+
+    def __init__(self):
+        self.upserts = []
+
+    async def upsert(self, **kwargs):
+        """Record the batch."""
+        self.upserts.append(kwargs)
+
+
+class _StubAsyncClient:
+    """Async client stub serving one collection and counting lookups."""
+
+    def __init__(self, collection, max_batch_size: int = 100):
+        self.collection = collection
+        self.max_batch_size = max_batch_size
+        self.lookups = 0
+
+    async def get_collection(self, _name):
+        """Return the stub collection."""
+        self.lookups += 1
+        return self.collection
+
+    async def get_or_create_collection(self, name):
+        """Return the stub collection."""
+        return await self.get_collection(name)
+
+    async def get_max_batch_size(self):
+        """Return the configured batch limit."""
+        return self.max_batch_size
+
+
+@pytest.mark.asyncio
+async def test_transport_errors_are_retried_and_handles_cached(monkeypatch, base):
+    """Connection errors are retried with backoff; lookups happen once."""
+    monkeypatch.setattr(settings, "chroma_retry_backoff_secs", 0.0)
+    collection = _FlakyCollection(failures=2, error=httpx.ConnectError("down"))
+    client = _StubAsyncClient(collection)
+    store = ChromaVectorStore(base, client=client, shard_mode="single")
+
+    await store.query([[0.0]], filters={"workspace_id": 1})
+    await store.query([[0.0]], filters={"workspace_id": 1})
+
+    assert collection.calls == 4
+    assert client.lookups == 1
+
+
+@pytest.mark.asyncio
+async def test_calls_time_out_after_the_last_retry(monkeypatch, base):
+    """A call that keeps stalling raises TimeoutError once retries run out."""
+    monkeypatch.setattr(settings, "chroma_request_timeout_secs", 0.01)
+    monkeypatch.setattr(settings, "chroma_retry_backoff_secs", 0.0)
+    monkeypatch.setattr(settings, "chroma_max_retries", 1)
+    collection = _FlakyCollection(failures=5, delay=1.0)
+    store = ChromaVectorStore(
+        base, client=_StubAsyncClient(collection), shard_mode="single"
+    )
+
+    with pytest.raises(asyncio.TimeoutError):
+        await store.query([[0.0]], filters={"workspace_id": 1})
+    assert collection.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_writes_pass_array_slices_in_server_sized_batches(base, vectors):
+    """Encoder output reaches Chroma as float32 views, split by max batch size."""
+    collection = _RecordingCollection()
+    store = ChromaVectorStore(
+        base, client=_StubAsyncClient(collection, max_batch_size=4), shard_mode="single"
+    )
+
+    await store.add(**_items(1, vectors))
+
+    assert [len(batch["ids"]) for batch in collection.upserts] == [4, 4, 2]
+    for batch in collection.upserts:
+        assert isinstance(batch["embeddings"], np.ndarray)
+        assert np.shares_memory(batch["embeddings"], vectors)
@@ -0,0 +1,89 @@
+"""Unit tests for stitching retrieved chunks into de-duplicated context spans."""
+
+import pytest
+
+from app.services.ai.context_assembly import (
+    ChunkStore,
+    assemble_file_sections,
+    merge_overlap,
+    stitch_chunks,
+)
+
+TEXT = " ".join(f"sentence{i} about topic {i % 7}." for i in range(200))
+
+
+def _chunks(text: str, size: int = 1000, overlap: int = 200) -> list[str]:
+    """Split text into fixed windows overlapping like chunk_text does."""
+    return [text[i : i + size] for i in range(0, len(text) - overlap, size - overlap)]
+
+
+class _FakeChromaClient:
+    """Serves every chunk of one file and counts reads."""
+
+    def __init__(self, chunks: list[str]):
+        self.chunks = chunks
+        self.reads = 0
+
+    async def get(self, filters=None, limit=1000):
+        """Return all chunks with their chunk_index metadata."""
+        self.reads += 1
+        return {
+            "ids": [str(i) for i in range(len(self.chunks))][:limit],
+            "documents": self.chunks[:limit],
+            "metadatas": [
+                {**filters, "chunk_index": i} for i in range(len(self.chunks))
+            ][:limit],
+        }
+
+
+def test_consecutive_chunks_are_merged_without_duplicated_overlap():
+    """Stitching every chunk of a file reproduces the original text exactly."""
+    chunks = _chunks(TEXT)
+
+    spans = stitch_chunks(list(enumerate(chunks))[::-1])
+
+    assert spans == [TEXT]
+
+
+def test_non_adjacent_chunks_stay_separate_spans_in_document_order():
+    """Gaps between hits keep separate spans; duplicates are dropped."""
+    chunks = _chunks(TEXT)
+
+    spans = stitch_chunks(
+        [(4, chunks[4]), (1, chunks[1]), (2, chunks[2]), (4, chunks[4])]
+    )
+
+    assert spans == [merge_overlap(chunks[1], chunks[2]), chunks[4]]
+    assert len(spans[0]) == len(chunks[1]) + len(chunks[2]) - 200
+
+
+def test_short_coincidental_overlap_is_not_removed():
+    """Text that only shares a few characters is joined, not truncated."""
+    assert merge_overlap("ends with the", "the start") == "ends with the\nthe start"
+
+
+@pytest.mark.asyncio
+async def test_hits_are_grouped_per_file_and_widened_from_the_chunk_store():
+    """Neighbour widening fills the gap between hits from the cached file."""
+    chunks = _chunks(TEXT)
+    client = _FakeChromaClient(chunks)
+    store = ChunkStore(client, max_files=2)
+    documents = [chunks[5], "other file", chunks[3]]
+    metadatas = [
+        {"file_id": "a", "file_name": "a.md", "chunk_index": 5},
+        {"file_id": "b", "file_name": "b.md", "chunk_index": 0},
+        {"file_id": "a", "file_name": "a.md", "chunk_index": 3},
+    ]
+
+    plain = await assemble_file_sections(documents, metadatas, {"workspace_id": 1})
+    widened = await assemble_file_sections(
+        documents, metadatas, {"workspace_id": 1}, store, neighbour_window=1
+    )
+    await store.get_file_chunks({"workspace_id": 1, "file_id": "a"})
+
+    assert [name for name, _ in plain] == ["a.md", "b.md"]
+    assert plain[0][1] == [chunks[3], chunks[5]]
+    assert len(widened[0][1]) == 1
+    assert widened[0][1][0] in TEXT
+    assert chunks[2][:50] in widened[0][1][0] and chunks[6][-50:] in widened[0][1][0]
+    assert client.reads == 2
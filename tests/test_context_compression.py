@@ -0,0 +1,140 @@
+"""Unit tests for sentence-level context compression."""
+
+import numpy as np
+import pytest
+
+from app.services.ai.context_compression import (
+    GAP_MARKER,
+    compress_sections,
+    select_sentences,
+    split_sentences,
+)
+
+VOCABULARY = ["alpha", "beta", "gamma", "delta", "refund", "policy", "days"]
+
+
+def _bag_of_words(texts):
+    """Encode texts as word-count vectors over ``VOCABULARY``."""
+    return np.array(
+        [[text.lower().count(word) for word in VOCABULARY] for text in texts],
+        dtype=np.float32,
+    )
+
+
+def test_split_sentences_returns_offsets_of_each_sentence():
+    """Sentences end at terminal punctuation or a line break."""
+    text = "First one. Second one!\nThird line\n\nFourth? "
+
+    sentences = [text[start:end] for start, end in split_sentences(text)]
+
+    assert sentences == ["First one.", "Second one!", "Third line", "Fourth?"]
+
+
+def test_select_sentences_keeps_neighbours_within_budget_and_span():
+    """The best sentence brings its neighbours, but never from another span."""
+    scores = np.array([0.1, 0.2, 0.9, 0.3, 0.0])
+    lengths = np.full(5, 10)
+    groups = np.array([0, 0, 0, 1, 1])
+
+    without_context = select_sentences(scores, lengths, groups, 20, neighbours=0)
+
+    assert select_sentences(scores, lengths, groups, 30).tolist() == [1, 2, 3]
+    assert without_context.tolist() == [2, 3]
+    assert select_sentences(scores, lengths, groups, 25).tolist() == [1, 2]
+    assert select_sentences(scores, lengths, groups, 5).tolist() == []
+
+
+@pytest.mark.asyncio
+async def test_compress_sections_keeps_the_matching_sentence_and_marks_gaps():
+    """Only the relevant sentence survives, cut verbatim from its span."""
+    filler = " ".join(f"Alpha beta gamma {i}." for i in range(20))
+    span = f"{filler} Refunds follow the refund policy within 30 days. {filler}"
+    sections = [("handbook.md", [span]), ("notes.md", ["Delta delta delta."])]
+    calls = []
+
+    async def encode(texts):
+        calls.append(len(texts))
+        return _bag_of_words(texts)
+
+    compressed = await compress_sections(
+        sections,
+        _bag_of_words(["refund policy days"])[0],
+        encode,
+        budget_chars=60,
+        neighbours=0,
+    )
+
+    assert compressed == [
+        (
+            "handbook.md",
+            [
+                f"{GAP_MARKER.lstrip()}Refunds follow the refund policy within 30 days."
+                f"{GAP_MARKER.rstrip()}"
+            ],
+        )
+    ]
+    assert calls == [42]
+
+
+@pytest.mark.asyncio
+async def test_compress_sections_skips_context_within_budget():
+    """Short context is returned as is, without encoding any sentence."""
+    sections = [("a.md", ["One sentence. Another one."])]
+
+    async def encode(texts):
+        raise AssertionError(f"unexpected encode of {texts}")
+
+    result = await compress_sections(
+        sections, np.ones(len(VOCABULARY)), encode, budget_chars=1000
+    )
+
+    assert result is sections
+
+
+@pytest.mark.asyncio
+async def test_compress_sections_keeps_best_chunks_whole_without_encoding():
+    """Spans ranked first by retrieval relevance are kept without any encoding."""
+    best = "Refunds follow the refund policy within 30 days."
+    worse = "Alpha beta gamma. " * 5
+    sections = [("notes.md", [worse.strip()]), ("handbook.md", [best])]
+
+    async def encode(texts):
+        raise AssertionError(f"unexpected encode of {texts}")
+
+    compressed = await compress_sections(
+        sections,
+        np.ones(len(VOCABULARY)),
+        encode,
+        budget_chars=len(best),
+        hits=[(worse.strip(), -0.9), (best, -0.1)],
+    )
+
+    assert compressed == [("handbook.md", [best])]
+
+
+@pytest.mark.asyncio
+async def test_compress_sections_caps_the_sentences_it_encodes():
+    """Only ``max_sentences`` sentences of the spans left over are encoded."""
+    first = " ".join(f"Refund policy {i}." for i in range(10))
+    second = " ".join(f"Delta days {i}." for i in range(10))
+    sections = [("a.md", [first]), ("b.md", [second])]
+    calls = []
+
+    async def encode(texts):
+        calls.append(texts)
+        return _bag_of_words(texts)
+
+    compressed = await compress_sections(
+        sections,
+        _bag_of_words(["refund policy"])[0],
+        encode,
+        budget_chars=40,
+        neighbours=0,
+        hits=[(first, 1.0), (second, 0.0)],
+        max_sentences=4,
+    )
+
+    assert calls == [[f"Refund policy {i}." for i in range(4)]]
+    assert compressed[0][0] == "a.md"
+    assert compressed[0][1][0].startswith("Refund policy 0.")
+    assert compressed[0][1][0].endswith(GAP_MARKER.rstrip())
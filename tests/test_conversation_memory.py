@@ -0,0 +1,180 @@
+"""Tests for bounded conversation memory and its rolling summaries."""
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.chat_file import ChatFile  # pylint: disable=unused-import
+from app.models.conversation import Conversation
+from app.models.conversation_summary import ConversationSummary
+from app.models.message import Message
+from app.services.chat.conversation_memory import ConversationMemory
+from app.services.chat.turn_writer import PendingTurn
+from prompts.prompt_composer import PromptComposer
+
+pytest.importorskip("aiosqlite")
+
+
+class FakeSummarizer:
+    """Appends the prompts it is given to the previous summary."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, previous, turns):
+        self.calls.append([turn.id for turn in turns])
+        return (previous + " " + " ".join(turn.prompt for turn in turns)).strip()
+
+
+@pytest.fixture(name="session_factory")
+async def session_factory_fixture(tmp_path):
+    """Empty database with one conversation (id 1)."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'memory.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add(Conversation(id=1, user_id=1))
+        await session.commit()
+    yield factory
+    await engine.dispose()
+
+
+async def _add_turns(session_factory, count, start=1):
+    async with session_factory() as session:
+        session.add_all(
+            Message(
+                conversation_id=1,
+                user_id=1,
+                prompt=f"q{n}",
+                response=f"a{n} " + "x" * 500,
+                status="completed",
+            )
+            for n in range(start, start + count)
+        )
+        await session.commit()
+
+
+def _memory(session_factory, summarizer, **overrides):
+    options = {
+        "recent_turns": 3,
+        "turn_chars": 40,
+        "summary_max_chars": 300,
+        "batch_turns": 2,
+        **overrides,
+    }
+    return ConversationMemory(session_factory, summarizer, **options)
+
+
+async def test_recent_turns_are_verbatim_and_truncated(session_factory):
+    """Only the last turns before the current message appear, clipped."""
+    await _add_turns(session_factory, 5)
+    memory = _memory(session_factory, FakeSummarizer())
+
+    async with session_factory() as session:
+        history = await memory.build(session, 1, before_message_id=5)
+
+    assert "Summary" not in history
+    assert [line.split()[1] for line in history.splitlines()[1::2]] == [
+        "q2",
+        "q3",
+        "q4",
+    ]
+    assert all(len(line) <= len("Assistant: ") + 40 for line in history.splitlines())
+
+
+async def test_update_folds_turns_older_than_the_window(session_factory):
+    """Turns that left the window are summarized in batches, once."""
+    await _add_turns(session_factory, 8)
+    summarizer = FakeSummarizer()
+    memory = _memory(session_factory, summarizer)
+
+    async with session_factory() as session:
+        assert await memory.update(session, 1) == 5
+        assert await memory.update(session, 1) == 0
+        stored = await session.get(ConversationSummary, 1)
+
+    assert summarizer.calls == [[1, 2, 3, 4, 5]]
+    assert stored.summary == "q1 q2 q3 q4 q5"
+    assert stored.summarized_through_id == 5
+
+    async with session_factory() as session:
+        history = await memory.build(session, 1, before_message_id=9)
+    assert history.startswith("Summary of earlier messages:\nq1 q2 q3 q4 q5")
+    assert "User: q6" in history and "User: q5" not in history
+
+
+async def test_update_waits_for_a_full_batch(session_factory):
+    """A single turn leaving the window does not trigger a summary call."""
+    await _add_turns(session_factory, 4)
+    summarizer = FakeSummarizer()
+    memory = _memory(session_factory, summarizer)
+
+    async with session_factory() as session:
+        assert await memory.update(session, 1) == 0
+    assert not summarizer.calls
+
+
+async def test_prompt_size_is_bounded(session_factory):
+    """The composed prompt stops growing once the summary reaches its cap."""
+    summarizer = FakeSummarizer()
+    memory = _memory(session_factory, summarizer, summary_max_chars=200)
+    sizes = {}
+    turns = 0
+    for target in (10, 100, 200):
+        await _add_turns(session_factory, target - turns, start=turns + 1)
+        turns = target
+        async with session_factory() as session:
+            await memory.update(session, 1)
+            history = await memory.build(session, 1, before_message_id=turns + 1)
+        sizes[target] = len(
+            PromptComposer.compose("next question", conversation_history=history)
+        )
+
+    assert sizes[200] <= sizes[10] + 200
+    assert abs(sizes[200] - sizes[100]) <= 10
+
+
+async def test_schedule_update_runs_in_background(session_factory):
+    """Scheduled updates run once per conversation and can be awaited on close."""
+    await _add_turns(session_factory, 6)
+    summarizer = FakeSummarizer()
+    memory = _memory(session_factory, summarizer)
+
+    memory.schedule_update(1)
+    memory.schedule_update(1)
+    task = memory._tasks[1]  # pylint: disable=protected-access
+    await task
+    await memory.close()
+
+    assert summarizer.calls == [[1, 2, 3]]
+
+
+def test_disabled_memory_builds_nothing():
+    """``recent_turns=0`` turns memory off without touching the database."""
+    memory = ConversationMemory(None, FakeSummarizer(), recent_turns=0)
+    memory.schedule_update(1)
+    assert not memory._tasks  # pylint: disable=protected-access
+
+
+async def test_default_summarizer_uses_the_configured_turn_limit():
+    """The Gemini summarizer clips turns like the verbatim window does."""
+    memory = ConversationMemory(None, turn_chars=10)
+    prompts = []
+
+    class FakeClient:
+        """Records the summary prompt."""
+
+        async def generate(self, prompt, **_kwargs):
+            """Return a fixed summary."""
+            prompts.append(prompt)
+            return "summary"
+
+    memory.summarizer._client = FakeClient()  # pylint: disable=protected-access
+    turn = PendingTurn(
+        1, 1, "a question that is long", "an answer that is long", "completed"
+    )
+
+    assert await memory.summarizer("", [turn]) == "summary"
+    assert "User: a questio…\nAssistant: an answer…" in prompts[0]
@@ -0,0 +1,71 @@
+"""Tests for the database pool configuration and checkout metrics."""
+
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db import pool
+from app.db.pool import InstrumentedAsyncPool, engine_options, statement_cache_args
+
+PG_URL = "postgresql+asyncpg://user:pw@localhost:5432/app"
+
+
+def test_engine_options_apply_pool_settings(monkeypatch):
+    """File and server databases get the configured, instrumented pool."""
+    monkeypatch.setattr(pool.settings, "db_pool_size", 7)
+    options = engine_options(PG_URL)
+
+    assert options["poolclass"] is InstrumentedAsyncPool
+    assert options["pool_size"] == 7
+    assert not engine_options("sqlite+aiosqlite://")
+    assert not engine_options("sqlite+aiosqlite:///:memory:")
+    assert engine_options("sqlite+aiosqlite:///data/app.db")["pool_size"] == 7
+
+
+def test_statement_cache_is_disabled_behind_pgbouncer(monkeypatch):
+    """PgBouncer mode turns caching off and names every statement uniquely."""
+    monkeypatch.setattr(pool.settings, "db_statement_cache_size", 64)
+    assert statement_cache_args(PG_URL)["prepared_statement_cache_size"] == 64
+    assert not statement_cache_args("sqlite+aiosqlite:///app.db")
+
+    monkeypatch.setattr(pool.settings, "db_pgbouncer", True)
+    args = statement_cache_args(PG_URL)
+    assert args["statement_cache_size"] == 0
+    assert args["prepared_statement_cache_size"] == 0
+    name = args["prepared_statement_name_func"]
+    assert name() != name()
+
+
+@pytest.mark.asyncio
+async def test_checkouts_are_timed_and_timeouts_counted(tmp_path):
+    """A checkout blocked on an exhausted pool is timed and counted as a timeout."""
+    pytest.importorskip("aiosqlite")
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedAsyncPool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+    checkouts = REGISTRY.get_sample_value("cowrite_db_pool_checkout_seconds_count")
+    timeouts = REGISTRY.get_sample_value("cowrite_db_pool_timeouts_total")
+    pool.observe_pool(engine)
+    try:
+        async with engine.connect():
+            assert REGISTRY.get_sample_value("cowrite_db_pool_in_use") == 1
+            with pytest.raises(PoolTimeoutError):
+                async with engine.connect():
+                    pass
+        await asyncio.sleep(0)
+        assert REGISTRY.get_sample_value("cowrite_db_pool_in_use") == 0
+    finally:
+        await engine.dispose()
+
+    assert (
+        REGISTRY.get_sample_value("cowrite_db_pool_checkout_seconds_count")
+        == checkouts + 2
+    )
+    assert REGISTRY.get_sample_value("cowrite_db_pool_timeouts_total") == timeouts + 1
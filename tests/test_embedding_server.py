@@ -0,0 +1,84 @@
+"""Tests for the shared embedding server and its client."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services.ai import model_registry as registry_module
+from app.services.ai.embedding_server import EmbeddingServer, RemoteEmbeddingModel
+
+
+class _LengthModel:
+    """Encodes every text as ``[len(text), index within the call]``."""
+
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+
+    def encode(self, sentences, batch_size=32, **_kwargs):
+        """Record the batch and return one row per text."""
+        del batch_size
+        if self.fail:
+            raise ValueError("out of memory")
+        self.batches.append(list(sentences))
+        return np.array(
+            [[len(text), i] for i, text in enumerate(sentences)], dtype=np.float64
+        )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_merged_and_split_back(tmp_path):
+    """Requests arriving together share one encode call but get their own rows."""
+    model = _LengthModel()
+    server = EmbeddingServer(model, str(tmp_path / "embed.sock"), max_wait_ms=50)
+    await server.start()
+    try:
+        remote = RemoteEmbeddingModel(server.socket_path).wait_ready(1.0)
+        requests = [["a" * (n + 1)] * (n + 1) for n in range(4)]
+        results = await asyncio.gather(
+            *(asyncio.to_thread(remote.encode, texts) for texts in requests)
+        )
+    finally:
+        await server.stop()
+
+    assert server.encode_calls < len(requests)
+    for texts, vectors in zip(requests, results):
+        assert vectors.dtype == np.float32
+        assert vectors.shape == (len(texts), 2)
+        assert vectors[:, 0].tolist() == [len(text) for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_encode_errors_reach_the_client(tmp_path):
+    """A failing encode is reported to the caller instead of hanging it."""
+    server = EmbeddingServer(_LengthModel(fail=True), str(tmp_path / "embed.sock"))
+    await server.start()
+    try:
+        remote = RemoteEmbeddingModel(server.socket_path)
+        with pytest.raises(RuntimeError, match="out of memory"):
+            await asyncio.to_thread(remote.encode, "hello")
+    finally:
+        await server.stop()
+
+
+def test_wait_ready_times_out_without_a_server(tmp_path):
+    """Clients give up when no server binds the socket."""
+    remote = RemoteEmbeddingModel(str(tmp_path / "missing.sock"))
+    with pytest.raises(TimeoutError):
+        remote.wait_ready(0.3)
+
+
+def test_registry_uses_the_server_when_a_socket_is_configured(tmp_path, monkeypatch):
+    """With a socket configured no model is loaded in the process itself."""
+
+    def fail_local_load(model_name):
+        raise AssertionError(f"{model_name} loaded locally")
+
+    sock = tmp_path / "embed.sock"
+    monkeypatch.setattr(registry_module, "load_local_model", fail_local_load)
+    monkeypatch.setattr(registry_module.settings, "embedding_server_socket", str(sock))
+    monkeypatch.setattr(registry_module.settings, "embedding_server_wait_secs", 0.2)
+
+    with pytest.raises(TimeoutError):
+        registry_module.load_embedding_model("e5")
@@ -0,0 +1,136 @@
+"""Unit tests for file summary vectors and two-level workspace retrieval."""
+
+import numpy as np
+import pytest
+
+from app.core.settings import settings
+from app.services.ai import backfill_file_summaries
+from app.services.ai.chroma_client import ChromaClient
+from app.services.ai.file_summaries import (
+    cap_hits_per_file,
+    files_without_summary,
+    summary_vector,
+)
+from app.services.ai.local_vector_store import LocalVectorStore
+
+
+def _result(file_ids: list[str]) -> dict:
+    """Build a single-query response with one hit per listed file, best first."""
+    return {
+        "ids": [[f"{f}_{i}" for i, f in enumerate(file_ids)]],
+        "documents": [[f"doc {i}" for i in range(len(file_ids))]],
+        "metadatas": [[{"file_id": f} for f in file_ids]],
+        "distances": [[float(i) for i in range(len(file_ids))]],
+    }
+
+
+def test_summary_vector_is_the_mean_rescaled_to_the_chunk_norm():
+    """The summary points along the mean at the average chunk length."""
+    chunks = np.array([[3.0, 0.0], [0.0, 3.0]], dtype=np.float32)
+
+    vector = summary_vector(chunks)
+
+    assert vector.dtype == np.float32
+    assert np.linalg.norm(vector) == pytest.approx(3.0)
+    assert vector[0] == pytest.approx(vector[1])
+
+
+def test_per_file_cap_spreads_hits_over_files():
+    """One long document cannot take every slot while other files have hits."""
+    result = _result(["a", "a", "a", "b", "c"])
+
+    capped = cap_hits_per_file(result, n_results=3, per_file=1)
+
+    assert [m["file_id"] for m in capped["metadatas"][0]] == ["a", "b", "c"]
+    assert capped["distances"][0] == [0.0, 3.0, 4.0]
+
+
+def test_per_file_cap_falls_back_to_skipped_hits():
+    """Free slots are filled with the best skipped hits, in distance order."""
+    result = _result(["a", "a", "a", "b"])
+
+    capped = cap_hits_per_file(result, n_results=3, per_file=1)
+
+    assert capped["ids"][0] == ["a_0", "a_1", "b_3"]
+
+
+@pytest.mark.asyncio
+async def test_local_store_returns_embeddings_on_request(tmp_path):
+    """Stored vectors can be read back to compute a file summary."""
+    store = LocalVectorStore(str(tmp_path))
+    vectors = np.random.default_rng(0).normal(size=(4, 8)).astype(np.float32)
+    await store.add(
+        ids=[f"c{i}" for i in range(4)],
+        embeddings=vectors,
+        documents=[""] * 4,
+        metadatas=[{"workspace_id": 1, "file_id": "f"} for _ in range(4)],
+    )
+
+    result = await store.get(
+        filters={"workspace_id": 1, "file_id": "f"}, include_embeddings=True
+    )
+
+    np.testing.assert_allclose(result["embeddings"], vectors)
+
+
+async def _add_chunks(store, metadatas: list[dict]) -> None:
+    """Store one random chunk per metadata."""
+    vectors = np.random.default_rng(1).normal(size=(len(metadatas), 8))
+    await store.add(
+        ids=[f"c{i}" for i in range(len(metadatas))],
+        embeddings=vectors.astype(np.float32),
+        documents=["text"] * len(metadatas),
+        metadatas=metadatas,
+    )
+
+
+@pytest.mark.asyncio
+async def test_files_without_summary_reads_metadata_only(tmp_path):
+    """Workspace files lacking a summary are listed; chat files are ignored."""
+    chunks = LocalVectorStore(str(tmp_path / "chunks"))
+    summaries = LocalVectorStore(str(tmp_path / "files"))
+    await _add_chunks(
+        chunks,
+        [
+            {"workspace_id": 1, "file_id": "a"},
+            {"workspace_id": 1, "file_id": "a"},
+            {"workspace_id": 1, "file_id": "b"},
+            {"workspace_id": 2, "file_id": "c"},
+            {"user_id": 5, "file_id": "chat"},
+        ],
+    )
+    await _add_chunks(summaries, [{"workspace_id": 1, "file_id": "b"}])
+
+    assert await files_without_summary(chunks, summaries) == {1: ["a"], 2: ["c"]}
+    assert await files_without_summary(chunks, summaries, workspace_id=2) == {2: ["c"]}
+    metadata_only = await chunks.get(include_documents=False)
+    assert "documents" not in metadata_only and len(metadata_only["metadatas"]) == 5
+
+
+@pytest.mark.asyncio
+async def test_backfill_command_summarises_missing_files_once(tmp_path, monkeypatch):
+    """The backfill CLI writes each missing summary; a re-run finds nothing left."""
+    monkeypatch.setattr(settings, "vector_store_backend", "local")
+    monkeypatch.setattr(settings, "vector_store_path", str(tmp_path))
+    client = ChromaClient("document")
+    await _add_chunks(
+        client.store,
+        [
+            {"workspace_id": 1, "file_id": "a", "file_name": "a.txt"},
+            {"workspace_id": 1, "file_id": "b", "file_name": "b.txt"},
+            {"workspace_id": 2, "file_id": "c", "file_name": "c.txt"},
+        ],
+    )
+
+    assert await backfill_file_summaries.main(["--dry-run"]) == 0
+    assert not (await client.summaries.get())["ids"]
+
+    assert await backfill_file_summaries.main(["--workspace-id", "1"]) == 2
+    assert await backfill_file_summaries.main([]) == 1
+    assert await backfill_file_summaries.main([]) == 0
+    written = await client.summaries.get()
+    assert sorted(m["file_name"] for m in written["metadatas"]) == [
+        "a.txt",
+        "b.txt",
+        "c.txt",
+    ]
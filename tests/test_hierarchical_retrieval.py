@@ -0,0 +1,158 @@
+"""Tests for two-level workspace retrieval and summary upkeep on the local store."""
+
+# pylint: disable=redefined-outer-name
+
+import json
+import zlib
+
+import numpy as np
+import pytest
+
+pytest.importorskip("aioboto3")
+
+# pylint: disable=wrong-import-position
+from app.core.settings import settings
+from app.services.ai.chroma_client import ChromaClient
+from app.services.ai.embedding_service import EmbeddingService
+from app.services.ai.local_vector_store import LocalVectorStore
+from app.services.files.sqs_message_handler import SqsMessageHandler
+
+QUERY = np.array([[1.0, 0.0]], dtype=np.float32)
+FILES = {
+    # Close to the query on average.
+    "near": [[1.0, 0.1], [1.0, -0.1], [0.9, 0.0], [0.9, 0.1]],
+    "mid": [[0.7, 0.7], [0.7, 0.6], [0.6, 0.7]],
+    # Holds the single best chunk, but points away from the query on average.
+    "far": [[1.0, 0.0], [-1.0, 0.0], [0.0, -1.0], [-1.0, -1.0]],
+}
+
+
+class HashEncoder:
+    """Deterministic stand-in for the embedding model."""
+
+    def encode(self, texts, **_kwargs) -> np.ndarray:
+        """Return one pseudo-random vector per text, seeded by the text."""
+        return np.stack(
+            [
+                np.random.default_rng(zlib.crc32(text.encode())).normal(size=8)
+                for text in texts
+            ]
+        ).astype(np.float32)
+
+
+class FakeS3:
+    """Serves object bodies from a dict."""
+
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+
+    async def download_file_as_bytes(self, key: str, bucket: str) -> bytes:
+        """Return the body stored under ``key``."""
+        assert bucket
+        return self.objects[key]
+
+
+class PlainTextExtractor:
+    """Decodes every file as UTF-8 text."""
+
+    async def extract_text(self, _file_name: str, file_bytes: bytes) -> str:
+        """Return the file's text."""
+        return file_bytes.decode()
+
+
+@pytest.fixture
+def service(tmp_path):
+    """An embedding service over local chunk and summary stores."""
+    client = ChromaClient(
+        store=LocalVectorStore(str(tmp_path / "document")),
+        summaries=LocalVectorStore(str(tmp_path / "document_files")),
+        model=HashEncoder(),
+    )
+    return EmbeddingService(
+        chroma_client=client,
+        s3_client=FakeS3(),
+        text_extractor_service=PlainTextExtractor(),
+        db=None,
+        model=HashEncoder(),
+    )
+
+
+async def _index_files(service: EmbeddingService, workspace_id: int) -> None:
+    """Store the chunks of ``FILES`` and their summaries."""
+    for file_id, vectors in FILES.items():
+        await service.chroma_client.add(
+            {
+                "id": [f"{file_id}_{i}" for i in range(len(vectors))],
+                "texts": [f"{file_id} chunk {i}" for i in range(len(vectors))],
+                "embeddings": np.array(vectors, dtype=np.float32),
+                "metadata": [
+                    {"workspace_id": workspace_id, "file_id": file_id} for _ in vectors
+                ],
+            }
+        )
+        await service.refresh_workspace_file_summary(workspace_id, file_id)
+
+
+async def _summaries(service: EmbeddingService, workspace_id: int) -> dict:
+    """Return the summary metadatas of a workspace by file id."""
+    found = await service.chroma_client.summaries.get(
+        filters={"workspace_id": workspace_id}
+    )
+    return {meta["file_id"]: meta for meta in found["metadatas"]}
+
+
+async def test_hierarchical_query_searches_only_the_top_files(service, monkeypatch):
+    """Hits come from the best files only, at most the per-file cap from each."""
+    await _index_files(service, workspace_id=1)
+
+    flat = await service.query_workspace_context(1, "q", n_results=3, query_vec=QUERY)
+    assert flat["ids"][0][0] == "far_0"
+
+    monkeypatch.setattr(settings, "workspace_hierarchical_retrieval", True)
+    monkeypatch.setattr(settings, "workspace_top_files", 2)
+    monkeypatch.setattr(settings, "workspace_chunks_per_file", 2)
+    result = await service.query_workspace_context(1, "q", n_results=3, query_vec=QUERY)
+
+    file_ids = [meta["file_id"] for meta in result["metadatas"][0]]
+    assert len(file_ids) == 3
+    assert set(file_ids) == {"near", "mid"}
+    assert file_ids.count("near") == 2
+    assert result["distances"][0] == sorted(result["distances"][0])
+
+
+async def test_hierarchical_query_falls_back_without_summaries(service, monkeypatch):
+    """A workspace that was never summarised is searched as a whole."""
+    await _index_files(service, workspace_id=1)
+    for file_id in FILES:
+        await service.delete_workspace_file_summary(1, file_id)
+
+    monkeypatch.setattr(settings, "workspace_hierarchical_retrieval", True)
+    result = await service.query_workspace_context(1, "q", n_results=1, query_vec=QUERY)
+
+    assert result["ids"][0] == ["far_0"]
+
+
+async def test_file_messages_write_refresh_and_remove_the_summary(service):
+    """Create writes a file's summary, update replaces it and delete removes it."""
+    pytest.importorskip("langchain_text_splitters")
+    handler = SqsMessageHandler(service)
+    key = "workspaces/3/notes.txt"
+
+    def message(event_type: str) -> str:
+        return json.dumps(
+            {"workspaceId": 3, "fileId": 9, "s3Key": key, "eventType": event_type}
+        )
+
+    service.s3_client.objects[key] = b"First draft."
+    await handler.handle_workspace_file_message(message("create"))
+    created = await _summaries(service, 3)
+    assert created["9"]["chunks"] == 1
+    assert created["9"]["file_name"] == "notes.txt"
+
+    service.s3_client.objects[key] = b"\n\n".join([b"x" * 900, b"y" * 900])
+    await handler.handle_workspace_file_message(message("update"))
+    assert (await _summaries(service, 3))["9"]["chunks"] == 2
+
+    await handler.handle_workspace_file_message(message("delete"))
+    assert not await _summaries(service, 3)
+    assert not (await service.chroma_client.get(filters={"workspace_id": 3}))["ids"]
@@ -0,0 +1,161 @@
+"""Tests for pushed chat file processing status and the cached polling endpoint."""
+
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+pytest.importorskip("aioboto3")
+pytest.importorskip("asyncpg")  # app.db.database builds the default engine
+
+# pylint: disable=wrong-import-position,unused-argument
+from app.api.v1 import upload
+from app.services.ai.embedding_service import EmbeddingService
+from app.services.files.ingest_events import IngestEvent, IngestEventBus
+from app.db.database import get_db
+
+
+def test_events_reach_only_the_owners_subscribers():
+    """A user's subscribers get their files' events; others get nothing."""
+    bus = IngestEventBus()
+    with bus.subscribe(1) as mine, bus.subscribe(2) as theirs:
+        bus.publish(IngestEvent("f1", 1, "embedding", 0.4))
+        assert mine.get_nowait().status == "embedding"
+        assert theirs.empty()
+    assert not bus._subscribers  # pylint: disable=protected-access
+
+
+def test_slow_subscriber_keeps_the_newest_events():
+    """A full subscriber queue drops its oldest event instead of blocking."""
+    bus = IngestEventBus(queue_size=2)
+    with bus.subscribe(1) as queue:
+        for status in ("queued", "extracting", "embedding"):
+            bus.publish(IngestEvent("f1", 1, status))
+        assert [queue.get_nowait().status for _ in range(2)] == [
+            "extracting",
+            "embedding",
+        ]
+
+
+def test_only_finished_statuses_expire():
+    """In-progress statuses stay cached; finished ones expire after the TTL."""
+    bus = IngestEventBus(ttl_secs=0)
+    bus.publish(IngestEvent("running", 1, "embedding"))
+    bus.publish(IngestEvent("done", 1, "completed", 1.0))
+
+    assert bus.latest("running").status == "embedding"
+    assert bus.latest("done") is None
+
+
+async def test_stream_sends_current_status_then_changes():
+    """The stream starts with the requested files' status, then pushes updates."""
+    bus = IngestEventBus()
+    bus.publish(IngestEvent("f1", 1, "queued"))
+    bus.publish(IngestEvent("f2", 2, "queued"))
+    stream = upload.stream_ingest_events(bus, 1, ["f1", "f2"], heartbeat_secs=0.05)
+
+    first = await anext(stream)
+    assert first.startswith("event: status\n") and '"file_id": "f1"' in first
+
+    pending = asyncio.ensure_future(anext(stream))
+    await asyncio.sleep(0)
+    bus.publish(IngestEvent("f1", 1, "completed", 1.0))
+    assert '"status": "completed"' in await pending
+    assert await anext(stream) == ": keepalive\n\n"
+    await stream.aclose()
+    assert not bus._subscribers  # pylint: disable=protected-access
+
+
+class FakeUploadService:
+    """Counts status reads and answers from a fixed table."""
+
+    def __init__(self, files):
+        self.files = files
+        self.reads = 0
+
+    async def get_file_status(self, session, file_id):
+        """Return the row of ``file_id``, if any."""
+        self.reads += 1
+        return self.files.get(file_id)
+
+
+def test_polling_is_served_from_the_cache():
+    """Repeated polls of a file read the database once per TTL."""
+    bus = IngestEventBus(ttl_secs=60)
+    service = FakeUploadService(
+        {"f1": SimpleNamespace(id="f1", user_id=1, status="completed")}
+    )
+    app = FastAPI()
+    app.include_router(upload.router)
+    app.dependency_overrides[get_db] = lambda: None
+    app.dependency_overrides[upload.get_upload_service] = lambda: service
+    app.dependency_overrides[upload.get_ingest_events] = lambda: bus
+    client = TestClient(app)
+
+    for _ in range(3):
+        response = client.get("/conversations/upload/status/f1")
+        assert response.json() == {
+            "fileId": "f1",
+            "status": "completed",
+            "progress": 1.0,
+        }
+    assert service.reads == 1
+
+    bus.publish(IngestEvent("f2", 1, "embedding", 0.4))
+    assert client.get("/conversations/upload/status/f2").json()["status"] == "embedding"
+    assert service.reads == 1
+    assert client.get("/conversations/upload/status/nope").status_code == 404
+
+
+class _Stub:
+    """Stand-in for the S3, extraction, vector store, model and file repository."""
+
+    bucket = "bucket"
+
+    def __init__(self):
+        self.statuses = {}
+
+    async def download_file_as_bytes(self, key, bucket):
+        """Return the file's bytes."""
+        return b"text"
+
+    async def extract_text(self, name, data):
+        """Return the file's text."""
+        return data.decode()
+
+    async def add(self, items):
+        """Accept the chunks."""
+
+    def encode(self, chunks, **_kwargs):
+        """Return one vector per chunk."""
+        return np.ones((len(chunks), 4), dtype=np.float32)
+
+    async def update_status(self, file_id, status):
+        """Record the file's status."""
+        self.statuses[file_id] = status
+
+
+async def test_embedding_service_publishes_each_stage(monkeypatch):
+    """A chat file goes through every status, or ends as failed."""
+    bus = IngestEventBus()
+    monkeypatch.setattr("app.services.ai.embedding_service.ingest_events", bus)
+    stub = _Stub()
+    service = EmbeddingService(stub, stub, stub, db=None, model=stub)
+    service.chat_file_repository = stub
+    monkeypatch.setattr(service, "chunk_text", lambda text: [text])
+
+    with bus.subscribe(7) as queue:
+        await service.add_file_embeddings("k", "a.txt", 7, "f1")
+        statuses = [queue.get_nowait().status for _ in range(queue.qsize())]
+        assert statuses == ["extracting", "embedding", "completed"]
+
+        monkeypatch.setattr(service, "chunk_text", lambda text: [])
+        with pytest.raises(ValueError):
+            await service.add_file_embeddings("k", "a.txt", 7, "f2")
+        statuses = [queue.get_nowait().status for _ in range(queue.qsize())]
+        assert statuses == ["extracting", "failed"]
+    assert bus.latest("f2").detail == "Failed to chunk text."
+    assert stub.statuses == {"f1": "completed", "f2": "failed"}
@@ -0,0 +1,44 @@
+"""Unit tests for the ingestion Prometheus metrics helpers."""
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core.metrics import observe_stage, track_in_flight
+
+
+def _sample(name: str, labels: dict) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_observe_stage_records_one_observation_per_block():
+    """observe_stage adds one histogram observation for the given stage."""
+    before = _sample("cowrite_ingest_stage_seconds_count", {"stage": "extract"})
+
+    with observe_stage("extract"):
+        pass
+
+    after = _sample("cowrite_ingest_stage_seconds_count", {"stage": "extract"})
+    assert after == before + 1
+
+
+def test_observe_stage_records_duration_when_block_raises():
+    """A failing stage is still timed so slow failures stay visible."""
+    before = _sample("cowrite_ingest_stage_seconds_count", {"stage": "upsert"})
+
+    with pytest.raises(RuntimeError):
+        with observe_stage("upsert"):
+            raise RuntimeError("boom")
+
+    after = _sample("cowrite_ingest_stage_seconds_count", {"stage": "upsert"})
+    assert after == before + 1
+
+
+def test_track_in_flight_increments_and_restores_gauge():
+    """track_in_flight counts work only while the block is running."""
+    labels = {"pipeline": "workspace"}
+    before = _sample("cowrite_ingest_in_flight", labels)
+
+    with track_in_flight("workspace"):
+        assert _sample("cowrite_ingest_in_flight", labels) == before + 1
+
+    assert _sample("cowrite_ingest_in_flight", labels) == before
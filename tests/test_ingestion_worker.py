@@ -0,0 +1,142 @@
+"""Tests for the queue plumbing used by the standalone ingestion worker."""
+
+import asyncio
+import json
+import uuid
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import BackgroundTasks
+from prometheus_client import REGISTRY
+
+pytest.importorskip("aioboto3")
+
+# pylint: disable=wrong-import-position
+from app.services.files.sqs_client import SQSClient
+from app.services.files.sqs_message_handler import SqsMessageHandler
+from app.services.files.sqs_publisher import SQSPublisher
+
+FILE_ID = uuid.UUID("3f2b8c4e-9a1d-4e57-b6c0-2d8f1a7e5b93")
+
+
+@pytest.mark.asyncio
+async def test_poller_processes_a_batch_with_bounded_concurrency():
+    """At most ``concurrency`` messages of a batch are handled at the same time."""
+    running, peak = 0, 0
+
+    async def handle(body):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {"body": body}
+
+    client = SQSClient(MagicMock(), queue_url="queue", handle=handle, concurrency=2)
+    sqs = AsyncMock()
+    messages = [{"Body": str(i), "ReceiptHandle": f"r{i}"} for i in range(6)]
+
+    await client.process_messages(messages, sqs)
+
+    assert peak == 2
+    assert sqs.delete_message.await_count == 6
+    assert REGISTRY.get_sample_value("cowrite_ingest_queued", {"source": "sqs"}) == 0
+
+
+@pytest.mark.asyncio
+async def test_chat_file_message_is_embedded_with_its_own_session():
+    """Chat uploads handed over by the API are embedded in a fresh DB session."""
+    sessions = []
+
+    @asynccontextmanager
+    async def session_factory():
+        session = object()
+        sessions.append(session)
+        yield session
+
+    scoped = AsyncMock()
+    scoped.add_file_embeddings.return_value = {"status": "ok", "chunks": 3}
+    embedding_service = MagicMock()
+    embedding_service.with_session.return_value = scoped
+    handler = SqsMessageHandler(embedding_service, session_factory=session_factory)
+
+    result = await handler.handle_chat_file_message(
+        json.dumps(
+            {"fileId": str(FILE_ID), "userId": 2, "s3Key": "k/a.md", "fileName": "a.md"}
+        )
+    )
+
+    assert result == {"status": "ok", "chunks": 3}
+    embedding_service.with_session.assert_called_once_with(sessions[0])
+    scoped.add_file_embeddings.assert_awaited_once_with(
+        file_key="k/a.md", file_name="a.md", user_id=2, file_id=str(FILE_ID)
+    )
+
+
+async def test_upload_hands_the_file_to_the_worker(monkeypatch):
+    """With ingestion off in the API, an upload is queued for the worker."""
+    pytest.importorskip("asyncpg")  # app.db.database builds the default engine
+    from app.api.v1 import upload  # pylint: disable=import-outside-toplevel
+
+    monkeypatch.setattr(upload.settings, "ingestion_enabled_in_api", False)
+    chat_file = SimpleNamespace(id=FILE_ID, key="k/a.md", filename="a.md")
+    upload_service = AsyncMock()
+    upload_service.upload_file_and_save_metadata.return_value = chat_file
+
+    sent = []
+
+    class FakeSqs:
+        """Records the messages sent to SQS."""
+
+        async def send_message(self, **kwargs):
+            """Keep the message and return its id."""
+            sent.append((kwargs["QueueUrl"], kwargs["MessageBody"]))
+            return {"MessageId": "m1"}
+
+    @asynccontextmanager
+    async def client(*_args, **_kwargs):
+        yield FakeSqs()
+
+    publisher = SQSPublisher()
+    monkeypatch.setattr(publisher, "session", SimpleNamespace(client=client))
+    background_tasks = BackgroundTasks()
+
+    result = await upload.upload_file(
+        request=SimpleNamespace(state=SimpleNamespace(user={"id": 2})),
+        conversation_id=1,
+        background_tasks=background_tasks,
+        file=object(),
+        session=None,
+        upload_service=upload_service,
+        embedding_service=None,
+        sqs_publisher=publisher,
+    )
+
+    assert result is chat_file
+    assert not background_tasks.tasks
+    assert len(sent) == 1
+    queue_url, body = sent[0]
+    assert queue_url == upload.settings.sqs_chat_queue_url
+    assert json.loads(body) == {
+        "fileId": str(FILE_ID),
+        "userId": 2,
+        "s3Key": "k/a.md",
+        "fileName": "a.md",
+    }
+
+    scoped = AsyncMock()
+    embedding_service = MagicMock()
+    embedding_service.with_session.return_value = scoped
+
+    @asynccontextmanager
+    async def session_factory():
+        yield object()
+
+    await SqsMessageHandler(
+        embedding_service, session_factory
+    ).handle_chat_file_message(body)
+    scoped.add_file_embeddings.assert_awaited_once_with(
+        file_key="k/a.md", file_name="a.md", user_id=2, file_id=str(FILE_ID)
+    )
@@ -0,0 +1,111 @@
+"""Tests for the internal batch embedding endpoint and its admission control."""
+
+import asyncio
+import base64
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import internal_embed
+from app.core.admission import AdmissionLimiter, Overloaded
+
+TOKEN = "internal-secret"
+
+
+class _FakeChromaClient:
+    """Encodes each text as ``[len(text), 1, 2]``."""
+
+    async def encode_texts(self, texts):
+        """Return one float32 row per text."""
+        return np.array([[len(text), 1, 2] for text in texts], dtype=np.float32)
+
+
+@pytest.fixture(name="client")
+def client_fixture(monkeypatch):
+    """App with only the internal router, a fake encoder and a 1-slot limiter."""
+    monkeypatch.setattr(internal_embed.settings, "internal_api_token", TOKEN)
+    monkeypatch.setattr(internal_embed.settings, "internal_embed_max_texts", 4)
+    monkeypatch.setattr(internal_embed.settings, "internal_embed_max_chars", 20)
+    app = FastAPI()
+    app.include_router(internal_embed.router)
+    app.state.chroma_client = _FakeChromaClient()
+    app.state.embed_limiter = AdmissionLimiter(max_concurrent=1, max_queued=0)
+    return TestClient(app)
+
+
+def _post(client, body, token=TOKEN):
+    return client.post(
+        "/internal/embed", json=body, headers={"X-Internal-Token": token}
+    )
+
+
+def test_base64_vectors_round_trip(client):
+    """Each vector is returned as base64 little-endian float32."""
+    response = _post(client, {"texts": ["ab", "abcd"], "mode": "query"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["dimensions"] == 3
+    vectors = [np.frombuffer(base64.b64decode(v), "<f4") for v in body["embeddings"]]
+    assert [v.tolist() for v in vectors] == [[2, 1, 2], [4, 1, 2]]
+
+
+def test_binary_encoding_returns_raw_matrix(client):
+    """Binary responses carry the matrix as the body and its shape in a header."""
+    response = _post(client, {"texts": ["a", "abc"], "encoding": "binary"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert response.headers["x-embedding-shape"] == "2,3"
+    matrix = np.frombuffer(response.content, "<f4").reshape(2, 3)
+    assert matrix[:, 0].tolist() == [1, 3]
+
+
+def test_requests_need_the_internal_token(client):
+    """Callers without the shared token are rejected."""
+    assert _post(client, {"texts": ["a"]}, token="wrong").status_code == 401
+
+
+def test_oversized_batches_are_rejected(client):
+    """Too many texts or too long a text yields 413 before encoding."""
+    assert _post(client, {"texts": ["a"] * 5}).status_code == 413
+    assert _post(client, {"texts": ["a" * 21]}).status_code == 413
+    assert _post(client, {"texts": []}).status_code == 422
+
+
+def test_overloaded_requests_get_503(client):
+    """With every slot taken and no queue, requests are turned away."""
+    limiter = client.app.state.embed_limiter
+
+    async def hold_slot():
+        async with limiter.admit():
+            return _post(client, {"texts": ["a"]})
+
+    response = asyncio.run(hold_slot())
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_limiter_queues_up_to_its_bound():
+    """Waiters beyond ``max_queued`` are rejected; admitted ones run in turn."""
+    limiter = AdmissionLimiter(max_concurrent=1, max_queued=1)
+    order = []
+
+    async def job(name):
+        async with limiter.admit():
+            order.append(name)
+            await asyncio.sleep(0.02)
+
+    first = asyncio.create_task(job("first"))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(job("second"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(Overloaded):
+        async with limiter.admit():
+            pass
+    await asyncio.gather(first, second)
+    assert order == ["first", "second"]
@@ -0,0 +1,110 @@
+"""Unit tests for the embedded LocalVectorStore backend."""
+
+# pylint: disable=redefined-outer-name
+
+import numpy as np
+import pytest
+
+from app.services.ai.local_vector_store import LocalVectorStore
+
+
+def _workspace_items(workspace_id: int, file_id: str, vectors: np.ndarray) -> dict:
+    """Build add() arguments for the chunks of one workspace file."""
+    return {
+        "ids": [
+            f"workspace_{workspace_id}_file_{file_id}_{i}" for i in range(len(vectors))
+        ],
+        "embeddings": vectors,
+        "documents": [f"file {file_id} chunk {i}" for i in range(len(vectors))],
+        "metadatas": [
+            {"workspace_id": workspace_id, "file_id": file_id, "chunk_index": i}
+            for i in range(len(vectors))
+        ],
+    }
+
+
+@pytest.fixture
+def vectors():
+    """Random float32 vectors shared by the tests."""
+    return np.random.default_rng(0).normal(size=(20, 8)).astype(np.float32)
+
+
+@pytest.mark.asyncio
+async def test_query_returns_nearest_neighbours_in_distance_order(tmp_path, vectors):
+    """Exact search returns the query vector itself first, then by distance."""
+    store = LocalVectorStore(str(tmp_path))
+    await store.add(**_workspace_items(1, "a", vectors))
+
+    result = await store.query([vectors[3]], n_results=3, filters={"workspace_id": 1})
+
+    assert result["ids"][0][0] == "workspace_1_file_a_3"
+    assert result["distances"][0][0] == pytest.approx(0.0, abs=1e-4)
+    assert result["distances"][0] == sorted(result["distances"][0])
+    expected = np.argsort(((vectors - vectors[3]) ** 2).sum(axis=1))[:3]
+    assert result["ids"][0] == [f"workspace_1_file_a_{i}" for i in expected]
+
+
+@pytest.mark.asyncio
+async def test_query_is_isolated_per_workspace_and_file(tmp_path, vectors):
+    """Filters restrict results to one tenant and, within it, to one file."""
+    store = LocalVectorStore(str(tmp_path))
+    await store.add(**_workspace_items(1, "a", vectors[:10]))
+    await store.add(**_workspace_items(1, "b", vectors[10:]))
+    await store.add(**_workspace_items(2, "a", vectors))
+
+    by_file = await store.query(
+        [vectors[0]], n_results=5, filters={"workspace_id": 1, "file_id": "b"}
+    )
+    other_tenant = await store.query(
+        [vectors[0]], n_results=50, filters={"workspace_id": 2}
+    )
+    any_of = await store.query(
+        [vectors[0]], n_results=50, filters={"workspace_id": 1, "file_id": ["a", "b"]}
+    )
+
+    assert all(m["file_id"] == "b" for m in by_file["metadatas"][0])
+    assert all(m["workspace_id"] == 2 for m in other_tenant["metadatas"][0])
+    assert len(other_tenant["ids"][0]) == 20
+    assert len(any_of["ids"][0]) == 20
+
+
+@pytest.mark.asyncio
+async def test_delete_and_reopen_persist_state(tmp_path, vectors):
+    """Deletes survive a restart because segments and tombstones are on disk."""
+    store = LocalVectorStore(str(tmp_path))
+    await store.add(**_workspace_items(1, "a", vectors[:5]))
+    await store.add(**_workspace_items(1, "b", vectors[5:10]))
+
+    found = await store.get(filters={"workspace_id": 1, "file_id": "a"})
+    await store.delete(found["ids"], filters={"workspace_id": 1, "file_id": "a"})
+
+    reopened = LocalVectorStore(str(tmp_path))
+    remaining = await reopened.get(filters={"workspace_id": 1})
+
+    assert len(found["ids"]) == 5
+    assert sorted(m["file_id"] for m in remaining["metadatas"]) == ["b"] * 5
+    assert await reopened.list_collections() == ["workspace_1"]
+
+
+@pytest.mark.asyncio
+async def test_re_adding_an_id_replaces_the_previous_vector(tmp_path, vectors):
+    """Adding an existing id shadows the old row instead of duplicating it."""
+    store = LocalVectorStore(str(tmp_path))
+    await store.add(**_workspace_items(1, "a", vectors[:3]))
+    await store.add(**_workspace_items(1, "a", vectors[3:6]))
+
+    result = await store.get(filters={"workspace_id": 1})
+    nearest = await store.query([vectors[4]], n_results=1, filters={"workspace_id": 1})
+
+    assert len(result["ids"]) == 3
+    assert nearest["ids"][0] == ["workspace_1_file_a_1"]
+
+
+@pytest.mark.asyncio
+async def test_dimension_mismatch_is_rejected(tmp_path, vectors):
+    """Vectors of a different dimension cannot be mixed into one tenant index."""
+    store = LocalVectorStore(str(tmp_path))
+    await store.add(**_workspace_items(1, "a", vectors))
+
+    with pytest.raises(ValueError, match="dimension"):
+        await store.add(**_workspace_items(1, "b", vectors[:, :4]))
@@ -0,0 +1,88 @@
+"""Tests for the lazily loaded, shared embedding model."""
+
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from app.services.ai.model_registry import ModelRegistry
+
+
+class _CountingLoader:
+    """Slow stand-in loader that records how often it was called."""
+
+    def __init__(self, fail_first: bool = False):
+        self.calls = 0
+        self.threads = set()
+        self.fail_first = fail_first
+
+    def __call__(self, model_name: str):
+        self.calls += 1
+        self.threads.add(threading.get_ident())
+        time.sleep(0.05)
+        if self.fail_first and self.calls == 1:
+            raise OSError("model download failed")
+        return f"model:{model_name}"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_load_off_the_event_loop():
+    """The model is loaded once, in a worker thread, however many callers wait."""
+    loader = _CountingLoader()
+    registry = ModelRegistry("e5", loader=loader)
+
+    assert not registry.is_loaded
+    models = await asyncio.gather(*(registry.get() for _ in range(5)))
+
+    assert models == ["model:e5"] * 5
+    assert loader.calls == 1
+    assert threading.get_ident() not in loader.threads
+    assert registry.is_loaded
+
+
+@pytest.mark.asyncio
+async def test_failed_load_is_reported_and_retried():
+    """A failed load surfaces its error and the next caller tries again."""
+    registry = ModelRegistry("e5", loader=_CountingLoader(fail_first=True))
+
+    with pytest.raises(OSError):
+        await registry.get()
+    assert isinstance(registry.load_error, OSError)
+    assert not registry.is_loaded
+
+    assert await registry.get() == "model:e5"
+    assert registry.load_error is None
+
+
+@pytest.mark.parametrize(
+    "module, requires",
+    [
+        ("app.services.ai.model_registry", []),
+        (
+            "app.services.ai.embedding_service",
+            ["chromadb", "langchain_text_splitters", "httpx"],
+        ),
+    ],
+)
+def test_importing_services_does_not_load_the_model(module, requires):
+    """Importing service modules must not import sentence_transformers or torch."""
+    for name in requires:
+        pytest.importorskip(name)
+
+    code = (
+        f"import sys, {module}\n"
+        "heavy = {'sentence_transformers', 'torch'} & set(sys.modules)\n"
+        "print(','.join(sorted(heavy)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=120,
+    )
+
+    assert result.stdout.strip() == ""
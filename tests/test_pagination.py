@@ -0,0 +1,160 @@
+"""Tests for keyset-paginated conversation and message listing."""
+
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.db.base import Base
+from app.models.chat_file import ChatFile  # pylint: disable=unused-import
+from app.models.conversation import Conversation
+from app.models.message import Message
+from app.services.chat.chat_service import ChatService
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("asyncpg")  # app.db.database builds the default engine
+
+# pylint: disable=wrong-import-position
+from app.api.v1 import chat
+from app.db.database import get_db
+
+USER_ID = 1
+CREATED = datetime(2026, 5, 1, 12, 0, 0)
+
+
+@pytest.fixture(name="client")
+def client_fixture(tmp_path):
+    """Chat router on a seeded SQLite database, authenticated as ``USER_ID``."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'pages.db'}")
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def seed():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with session_factory() as session:
+            # Created at the same instant, so the id has to break the ties.
+            session.add_all(
+                Conversation(id=n, user_id=USER_ID if n <= 7 else 2, created_at=CREATED)
+                for n in range(1, 10)
+            )
+            session.add_all(
+                Message(conversation_id=1, user_id=USER_ID, prompt=f"p{n}")
+                for n in range(11)
+            )
+            await session.commit()
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(chat.router)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[chat.get_session_factory] = lambda: session_factory
+
+    @app.middleware("http")
+    async def authenticate(request: Request, call_next):
+        request.state.user = {"id": USER_ID}
+        return await call_next(request)
+
+    with TestClient(app) as test_client:
+        test_client.portal.call(seed)
+        test_client.app.state.session_factory = session_factory
+        yield test_client
+        test_client.portal.call(engine.dispose)
+
+
+def _walk(client, url, limit):
+    """Follow ``X-Next-Cursor`` through every page and return all items."""
+    items, cursor = [], None
+    for pages in range(1, 20):
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get(url, params=params)
+        assert response.status_code == 200
+        items += response.json()
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            return items, pages
+    raise AssertionError("pagination did not terminate")
+
+
+def test_conversation_pages_cover_each_row_once_newest_first(client):
+    """Pages are disjoint, ordered by (created_at, id) descending, and complete."""
+    items, pages = _walk(client, "/conversations", limit=3)
+
+    assert [c["id"] for c in items] == [7, 6, 5, 4, 3, 2, 1]
+    assert pages == 3
+
+
+def test_message_pages_are_oldest_first(client):
+    """Messages are paged in insertion order."""
+    items, pages = _walk(client, "/conversations/1/messages", limit=4)
+
+    assert [m["prompt"] for m in items] == [f"p{n}" for n in range(11)]
+    assert pages == 3
+
+
+def test_other_users_conversations_are_hidden(client):
+    """Messages of another user's conversation are not found."""
+    assert client.get("/conversations/8/messages").status_code == 404
+
+
+def test_invalid_cursor_is_a_bad_request(client):
+    """A tampered cursor is rejected instead of failing the query."""
+    response = client.get("/conversations", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "path, values",
+    [
+        ("/conversations", ["1", "dt:2026-05-01T12:00:00"]),
+        ("/conversations", ["dt:yesterday", 1]),
+        ("/conversations", ["dt:2026-05-01T12:00:00+02:00", 1]),
+        ("/conversations", ["dt:2026-05-01T12:00:00", True]),
+        ("/conversations/1/messages", ["5"]),
+    ],
+)
+def test_well_formed_cursor_with_wrong_types_is_a_bad_request(client, path, values):
+    """Cursor values of the wrong type are rejected before reaching the query."""
+    cursor = encode_cursor(*values)
+    assert client.get(path, params={"cursor": cursor}).status_code == 400
+
+
+def test_export_streams_ndjson(client):
+    """The export yields one JSON document per message line."""
+    response = client.get("/conversations/1/messages/export")
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["prompt"] for line in lines] == [f"p{n}" for n in range(11)]
+
+
+def test_iter_messages_reads_page_by_page(client):
+    """The export iterator keeps at most one page in the session."""
+    session_factory = client.app.state.session_factory
+
+    async def collect():
+        prompts, identity_map_sizes = [], []
+        async with session_factory() as session:
+            async for message in ChatService(session).iter_messages(1, page_size=4):
+                prompts.append(message.prompt)
+                identity_map_sizes.append(len(session.identity_map))
+        return prompts, identity_map_sizes
+
+    prompts, sizes = client.portal.call(collect)
+    assert prompts == [f"p{n}" for n in range(11)]
+    assert max(sizes) <= 4
+
+
+def test_cursor_round_trip_keeps_datetimes():
+    """Cursors restore the exact sort key they were built from."""
+    key = [datetime(2026, 1, 2, 3, 4, 5, 678), 42]
+    assert decode_cursor(encode_cursor(*key), (datetime, int)) == key
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(1), (datetime, int))
@@ -0,0 +1,154 @@
+"""Query-plan regression tests for the hot-path repository queries.
+
+Runs the repository methods against seeded data, captures the SQL they emit
+and fails if the database would answer any of it with a full table scan or an
+extra sort. Uses a temporary SQLite file by default; set
+``TEST_DATABASE_URL=postgresql+asyncpg://…`` to check PostgreSQL plans, where
+sequential scans are disabled so that any remaining ``Seq Scan`` means no
+usable index exists.
+"""
+
+import os
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db.base import Base
+from app.models.chat_file import ChatFile
+from app.models.conversation import Conversation
+from app.models.message import Message
+from app.repositories.chat_files_repository import ChatFileRepository
+from app.repositories.conversation_repository import ConversationRepository
+from app.repositories.message_repository import MessageRepository
+
+pytest.importorskip("aiosqlite")
+
+CONVERSATIONS = 40
+MESSAGES_PER_CONVERSATION = 25
+
+
+def _plan_problems(dialect: str, plan: list) -> list:
+    """Return the plan lines that indicate a full scan or an unindexed sort."""
+    if dialect == "sqlite":
+        # EXPLAIN QUERY PLAN rows are (id, parent, notused, detail).
+        details = [row[3] for row in plan]
+        return [
+            line
+            for line in details
+            if (line.startswith("SCAN ") and "USING" not in line)
+            or "TEMP B-TREE" in line
+        ]
+    return [row[0] for row in plan if "Seq Scan" in row[0]]
+
+
+@pytest.fixture(name="engine")
+async def engine_fixture(tmp_path):
+    """Seeded database with every model table and index."""
+    url = os.environ.get(
+        "TEST_DATABASE_URL", f"sqlite+aiosqlite:///{tmp_path / 'plans.db'}"
+    )
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSession(engine) as session:
+        for number in range(1, CONVERSATIONS + 1):
+            session.add(Conversation(id=number, user_id=number % 10, title="t"))
+        await session.flush()
+        for number in range(1, CONVERSATIONS + 1):
+            session.add_all(
+                Message(conversation_id=number, user_id=1, prompt="p")
+                for _ in range(MESSAGES_PER_CONVERSATION)
+            )
+            session.add_all(
+                ChatFile(
+                    conversation_id=number,
+                    user_id=1,
+                    filename="f.txt",
+                    file_type="text/plain",
+                    size=1,
+                    storage_path="s3://b/k",
+                    key="k",
+                )
+                for _ in range(3)
+            )
+        await session.commit()
+
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("ANALYZE")
+    yield engine
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+async def _explain_captured(engine, call) -> list:
+    """Run ``call(session)`` and return the plan problems of its SELECTs."""
+    statements = []
+
+    def capture(_conn, _cursor, statement, parameters, _context, _executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with AsyncSession(engine) as session:
+            await call(session)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    dialect = engine.dialect.name
+    problems = []
+    async with engine.connect() as conn:
+        if dialect == "postgresql":
+            await conn.exec_driver_sql("SET enable_seqscan = off")
+        prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(prefix + statement, parameters)
+            problems += _plan_problems(dialect, result.all())
+    assert statements, "the repository method issued no SELECT"
+    return problems
+
+
+async def test_messages_by_conversation_use_an_index(engine):
+    """Loading a conversation's messages is an index range scan."""
+
+    async def call(session):
+        await MessageRepository(session).get_messages_by_conversation(7)
+
+    assert not await _explain_captured(engine, call)
+
+
+async def test_conversations_by_user_use_an_index(engine):
+    """Listing a user's conversations is an index range scan."""
+
+    async def call(session):
+        await ConversationRepository(session).get_conversations_by_user(3)
+
+    assert not await _explain_captured(engine, call)
+
+
+async def test_user_files_are_read_in_index_order(engine):
+    """The oldest files of a conversation come from the index, without a sort."""
+
+    async def call(session):
+        await ChatFileRepository(session).list_user_files(7, max_files=3)
+
+    assert not await _explain_captured(engine, call)
+
+
+async def test_keyset_pages_use_an_index(engine):
+    """Later pages of conversations and messages are index range scans."""
+
+    async def call(session):
+        conversations = await ConversationRepository(session).list_by_user(3, 2)
+        last = conversations[-1]
+        await ConversationRepository(session).list_by_user(
+            3, 2, before=(last.created_at, last.id)
+        )
+        await MessageRepository(session).list_by_conversation(7, 10, after_id=5)
+
+    assert not await _explain_captured(engine, call)
@@ -0,0 +1,90 @@
+"""Round-trip counts of the repository writes."""
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db.base import Base
+from app.models.chat_file import ChatFile
+from app.repositories.chat_files_repository import ChatFileRepository
+from app.repositories.conversation_repository import ConversationRepository
+from app.repositories.message_repository import MessageRepository
+
+pytest.importorskip("aiosqlite")
+
+
+class _RoundTrips:
+    """Counts statements and commits sent to the database."""
+
+    def __init__(self, engine):
+        self.statements = []
+        self.commits = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._statement)
+        event.listen(engine.sync_engine, "commit", self._commit)
+
+    def _statement(self, _conn, _cursor, statement, *_args):
+        self.statements.append(statement.split()[0].upper())
+
+    def _commit(self, _conn):
+        self.commits += 1
+
+    def reset(self):
+        """Forget everything counted so far."""
+        self.statements.clear()
+        self.commits = 0
+
+
+@pytest.fixture(name="session")
+async def session_fixture(tmp_path):
+    """Session on an empty SQLite database, configured like ``async_session``."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'repo.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.info["round_trips"] = _RoundTrips(engine)
+        yield session
+    await engine.dispose()
+
+
+async def test_chat_turn_costs_one_statement_per_write(session):
+    """Creating and answering a message is one statement and one commit each."""
+    trips = session.info["round_trips"]
+    conversation = await ConversationRepository(session).create_conversation(5, "t")
+    assert conversation.id is not None and conversation.created_at is not None
+    assert trips.statements == ["INSERT"] and trips.commits == 1
+
+    repository = MessageRepository(session)
+    trips.reset()
+    message = await repository.create_message(conversation.id, 5, "hi")
+    assert message.status == "pending"
+    updated = await repository.update_message_response(message.id, "hello")
+
+    assert trips.statements == ["INSERT", "UPDATE"] and trips.commits == 2
+    assert updated.response == "hello" and updated.status == "completed"
+    assert updated.created_at is not None
+
+
+async def test_missing_rows_are_not_committed(session):
+    """Updating a row that does not exist returns None without a commit."""
+    trips = session.info["round_trips"]
+    assert await MessageRepository(session).update_message_response(99, "x") is None
+    assert trips.commits == 0
+
+
+async def test_file_status_update_is_one_statement(session):
+    """A status change is a single UPDATE ... RETURNING of the file."""
+    trips = session.info["round_trips"]
+    conversation = await ConversationRepository(session).create_conversation(5)
+    repository = ChatFileRepository(session)
+    chat_file = await repository.create(
+        conversation.id, 5, "a.txt", "text/plain", 1, "k", "s"
+    )
+    assert chat_file.status == "in progress"
+
+    trips.reset()
+    updated = await repository.update_status(chat_file.id, "failed")
+    assert updated.status == "failed"
+    assert trips.statements == ["UPDATE"] and trips.commits == 1
+
+    session.expunge_all()
+    assert (await session.get(ChatFile, chat_file.id)).status == "failed"
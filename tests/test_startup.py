@@ -0,0 +1,45 @@
+"""Tests for the startup profiler used by the application lifespan."""
+
+import asyncio
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core.startup import StartupProfiler, process_uptime
+
+
+@pytest.mark.asyncio
+async def test_gather_runs_initializers_concurrently_and_times_each_phase():
+    """Independent initializers overlap, and each gets its own phase timing."""
+    profiler = StartupProfiler()
+
+    async def slow(value):
+        await asyncio.sleep(0.1)
+        return value
+
+    start = time.perf_counter()
+    results = await profiler.gather(
+        chroma=lambda: slow("chroma"), s3=lambda: slow("s3")
+    )
+    elapsed = time.perf_counter() - start
+
+    assert results == {"chroma": "chroma", "s3": "s3"}
+    assert elapsed < 0.18
+    assert set(profiler.phases) == {"chroma", "s3"}
+    assert all(seconds >= 0.09 for seconds in profiler.phases.values())
+    assert REGISTRY.get_sample_value(
+        "cowrite_startup_phase_seconds", {"phase": "s3"}
+    ) == pytest.approx(profiler.phases["s3"])
+
+
+def test_finish_publishes_time_since_process_start():
+    """The cold-start gauge covers the whole process lifetime so far."""
+    profiler = StartupProfiler()
+    with profiler.phase("services"):
+        pass
+
+    total = profiler.finish()
+
+    assert 0 < total <= process_uptime()
+    assert REGISTRY.get_sample_value("cowrite_startup_seconds") == total
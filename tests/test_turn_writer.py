@@ -0,0 +1,181 @@
+"""Tests for write-behind persistence of chat turns."""
+
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.chat_file import ChatFile  # pylint: disable=unused-import
+from app.models.conversation import Conversation
+from app.models.message import Message
+from app.services.chat.conversation_memory import ConversationMemory
+from app.services.chat.turn_writer import ChatTurnWriter
+
+pytest.importorskip("aiosqlite")
+
+
+@pytest.fixture(name="engine")
+async def engine_fixture(tmp_path):
+    """Empty database with conversations 1 and 2."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'turns.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine) as session:
+        session.add_all([Conversation(id=1, user_id=1), Conversation(id=2, user_id=1)])
+        await session.commit()
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture(name="session_factory")
+def session_factory_fixture(engine):
+    """Session factory of ``engine``."""
+    return sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def _stored(session_factory):
+    async with session_factory() as session:
+        result = await session.execute(select(Message).order_by(Message.id))
+        return [(m.conversation_id, m.prompt, m.status) for m in result.scalars()]
+
+
+def _dropped(reason):
+    return (
+        REGISTRY.get_sample_value(
+            "cowrite_chat_turns_dropped_total", {"reason": reason}
+        )
+        or 0
+    )
+
+
+async def test_flush_writes_one_transaction_per_batch(engine, session_factory):
+    """Buffered turns are written in one transaction, in recording order."""
+    commits = []
+    event.listen(engine.sync_engine, "commit", commits.append)
+    writer = ChatTurnWriter(session_factory, max_batch=10)
+    for n in range(5):
+        writer.record(1 + n % 2, 1, f"q{n}", f"a{n}")
+
+    assert not await _stored(session_factory)
+    assert await writer.flush()
+
+    assert len(commits) == 1
+    assert [prompt for _, prompt, _ in await _stored(session_factory)] == [
+        f"q{n}" for n in range(5)
+    ]
+    assert REGISTRY.get_sample_value("cowrite_chat_turns_buffered") == 0
+
+
+async def test_background_task_flushes_and_notifies(session_factory):
+    """Turns are written within the interval and their conversations reported."""
+    flushed = []
+    writer = ChatTurnWriter(
+        session_factory, on_flush=flushed.append, flush_interval_ms=20
+    )
+    await writer.start()
+    writer.record(2, 1, "q", "a")
+    writer.record(2, 1, "q2", None, status="failed")
+    await asyncio.sleep(0.2)
+
+    assert await _stored(session_factory) == [
+        (2, "q", "completed"),
+        (2, "q2", "failed"),
+    ]
+    assert flushed == [2]
+    await writer.stop()
+
+
+async def test_full_batch_is_flushed_without_waiting(session_factory):
+    """Reaching ``max_batch`` wakes the flusher before the interval ends."""
+    writer = ChatTurnWriter(session_factory, flush_interval_ms=60_000, max_batch=3)
+    await writer.start()
+    for n in range(3):
+        writer.record(1, 1, f"q{n}", "a")
+    await asyncio.sleep(0.2)
+
+    assert len(await _stored(session_factory)) == 3
+    await writer.stop()
+
+
+async def test_failed_flush_keeps_turns_for_retry(session_factory):
+    """A batch that cannot be written stays buffered, in order."""
+    calls = []
+
+    def flaky_factory():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionError("database unavailable")
+        return session_factory()
+
+    writer = ChatTurnWriter(flaky_factory)
+    writer.record(1, 1, "q0", "a")
+    writer.record(1, 1, "q1", "a")
+
+    assert not await writer.flush()
+    assert [t.prompt for t in writer.pending_turns(1)] == ["q0", "q1"]
+    assert await writer.flush()
+    assert [p for _, p, _ in await _stored(session_factory)] == ["q0", "q1"]
+
+
+async def test_rejected_turn_does_not_block_the_batch(session_factory):
+    """A turn the database refuses is dropped alone; the rest are written."""
+    flushed = []
+    writer = ChatTurnWriter(session_factory, on_flush=flushed.append)
+    before = _dropped("rejected")
+    writer.record(1, 1, "q0", "a")
+    writer.record(1, 1, None, "a")  # violates NOT NULL on every attempt
+    writer.record(2, 1, "q2", "a")
+
+    assert await writer.flush()
+
+    assert [p for _, p, _ in await _stored(session_factory)] == ["q0", "q2"]
+    assert not writer.pending_turns(1) and not writer.pending_turns(2)
+    assert _dropped("rejected") == before + 1
+    assert flushed == [1, 2]
+
+
+async def test_stop_drains_the_buffer(session_factory):
+    """Shutdown writes turns recorded since the last flush."""
+    writer = ChatTurnWriter(session_factory, flush_interval_ms=60_000)
+    await writer.start()
+    writer.record(1, 1, "last words", "a")
+    await writer.stop()
+
+    assert await _stored(session_factory) == [(1, "last words", "completed")]
+
+
+def test_full_buffer_drops_oldest_turns():
+    """The buffer is bounded while the database is unreachable."""
+    before = _dropped("buffer_full")
+    writer = ChatTurnWriter(None, max_batch=100, max_buffered=2)
+    for n in range(3):
+        writer.record(1, 1, f"q{n}", "a")
+
+    assert [t.prompt for t in writer.pending_turns(1)] == ["q1", "q2"]
+    assert _dropped("buffer_full") == before + 1
+
+
+async def test_memory_sees_each_turn_once(session_factory):
+    """Unflushed turns are in the memory, and flushed ones are not repeated."""
+    writer = ChatTurnWriter(session_factory)
+    memory = ConversationMemory(session_factory, summarizer=None, recent_turns=4)
+    writer.record(1, 1, "first", "a")
+    assert await writer.flush()
+    writer.record(1, 1, "second", "b")
+    stale = writer.pending_turns(1)
+    writer.record(2, 1, "other conversation", "c")
+
+    async with session_factory() as session:
+        before = await memory.build(session, 1, pending=writer.pending_turns(1))
+        assert await writer.flush()
+        after = await memory.build(session, 1, pending=stale)
+
+    assert before == after
+    assert [line for line in after.splitlines() if line.startswith("User:")] == [
+        "User: first",
+        "User: second",
+    ]
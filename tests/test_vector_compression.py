@@ -0,0 +1,70 @@
+"""Unit tests for vector quantization, PCA reduction and compressed local storage."""
+
+# pylint: disable=redefined-outer-name
+
+import numpy as np
+import pytest
+
+from app.services.ai.local_vector_store import LocalVectorStore
+from app.services.ai.vector_compression import (
+    PcaProjection,
+    bytes_per_vector,
+    dequantize,
+    quantize,
+)
+
+
+@pytest.fixture
+def vectors():
+    """Random float32 vectors shared by the tests."""
+    return np.random.default_rng(0).normal(size=(50, 32)).astype(np.float32)
+
+
+@pytest.mark.parametrize("mode, tolerance", [("float16", 1e-2), ("int8", 3e-2)])
+def test_quantization_round_trip_is_close(vectors, mode, tolerance):
+    """Decoded vectors stay within the quantization step of the originals."""
+    codes, scales = quantize(vectors, mode)
+    decoded = dequantize(codes, scales)
+
+    assert decoded.dtype == np.float32
+    assert np.abs(decoded - vectors).max() < tolerance * np.abs(vectors).max()
+    assert codes.nbytes + (0 if scales is None else scales.nbytes) == len(
+        vectors
+    ) * bytes_per_vector(vectors.shape[1], mode)
+
+
+def test_pca_projection_keeps_low_rank_structure(tmp_path):
+    """Data living in a low-dimensional subspace is reduced without loss."""
+    rng = np.random.default_rng(1)
+    basis = rng.normal(size=(4, 32))
+    sample = (rng.normal(size=(200, 4)) @ basis).astype(np.float32)
+
+    projection = PcaProjection.fit(sample, 4)
+    projection.save(str(tmp_path / "pca.npz"))
+    reloaded = PcaProjection.load(str(tmp_path / "pca.npz"))
+    reduced = reloaded.transform(sample)
+
+    original = np.linalg.norm(sample[0] - sample[1:], axis=1)
+    kept = np.linalg.norm(reduced[0] - reduced[1:], axis=1)
+    assert reduced.shape == (200, 4)
+    assert projection.explained_variance_ratio(sample) == pytest.approx(1.0)
+    np.testing.assert_allclose(kept, original, rtol=1e-3)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["float16", "int8"])
+async def test_local_store_searches_quantized_segments(tmp_path, vectors, mode):
+    """Quantized segments return the same nearest neighbours after a reopen."""
+    store = LocalVectorStore(str(tmp_path), quantization=mode)
+    await store.add(
+        ids=[f"v{i}" for i in range(len(vectors))],
+        embeddings=vectors,
+        documents=[""] * len(vectors),
+        metadatas=[{"workspace_id": 1} for _ in range(len(vectors))],
+    )
+
+    reopened = LocalVectorStore(str(tmp_path))
+    result = await reopened.query(vectors[:5], n_results=1, filters={"workspace_id": 1})
+
+    assert [ids[0] for ids in result["ids"]] == [f"v{i}" for i in range(5)]
+    assert all(d[0] == pytest.approx(0.0, abs=0.05) for d in result["distances"])
@@ -0,0 +1,194 @@
+"""Tests for chat WebSocket resource usage: DB sessions, idle reaping and limits."""
+
+import json
+import time
+from contextlib import ExitStack
+
+import jwt
+import pytest
+from prometheus_client import REGISTRY
+from starlette.websockets import WebSocketDisconnect
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.connections import ConnectionTracker
+from app.core.settings import settings
+from app.db.base import Base
+from app.middleware.auth_middleware import AuthMiddleware
+from app.models.chat_file import ChatFile  # pylint: disable=unused-import
+from app.models.conversation import Conversation
+from app.repositories.chat_files_repository import ChatFileRepository
+from app.services.chat.conversation_memory import ConversationMemory
+from app.services.chat.turn_writer import ChatTurnWriter
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("asyncpg")  # app.db.database builds the default engine
+
+# pylint: disable=wrong-import-position
+from app.api.v1 import ws_chat
+from app.db.database import get_session_factory
+
+SOCKETS = 1000
+POOL_SIZE = 2
+
+
+class FakeTextService:
+    """Reads the conversation's files like the real service, answers with an echo."""
+
+    def __init__(self, db):
+        self.db = db
+
+    async def build_prompt(self, conversation_id, user_id, user_prompt, **_kwargs):
+        """Read from the turn's session and return the prompt."""
+        await ChatFileRepository(self.db).list_user_files(conversation_id, max_files=3)
+        assert user_id == 1
+        return user_prompt
+
+    async def complete(self, full_prompt):
+        """Return the prompt back."""
+        return f"echo: {full_prompt}"
+
+
+@pytest.fixture(name="client")
+def client_fixture(tmp_path):
+    """WebSocket router on a database whose pool has only ``POOL_SIZE`` connections."""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'ws.db'}",
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=POOL_SIZE,
+        max_overflow=0,
+        pool_timeout=2,
+    )
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def seed():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with session_factory() as session:
+            session.add(Conversation(id=1, user_id=1))
+            session.add(Conversation(id=2, user_id=2))
+            await session.commit()
+
+    app = FastAPI()
+    app.add_middleware(AuthMiddleware)
+    app.include_router(ws_chat.router)
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+    app.dependency_overrides[ws_chat.get_text_service_factory] = lambda: (
+        FakeTextService
+    )
+    app.state.conversation_memory = ConversationMemory(
+        session_factory, summarizer=None, recent_turns=2
+    )
+    app.state.turn_writer = ChatTurnWriter(session_factory)
+    app.state.ws_connections = ConnectionTracker(max_per_user=0)
+
+    with TestClient(app) as test_client:
+        test_client.portal.call(seed)
+        test_client.engine = engine
+        yield test_client
+        test_client.portal.call(engine.dispose)
+
+
+TOKEN = jwt.encode(
+    {"sub": json.dumps({"id": 1}), "exp": int(time.time()) + 3600},
+    settings.jwt_secret_key,
+    algorithm="HS256",
+)
+HEADERS = {"cookie": f"{settings.user_cookie_name}={TOKEN}"}
+
+
+def _gauge(name, labels=None):
+    return REGISTRY.get_sample_value(name, labels or {}) or 0
+
+
+def test_idle_sockets_hold_no_connections(client):
+    """A thousand open chats share a two-connection pool."""
+    pool = client.engine.sync_engine.pool
+
+    with ExitStack() as stack:
+        sockets = [
+            stack.enter_context(client.websocket_connect("/ws/chat/1", headers=HEADERS))
+            for _ in range(SOCKETS)
+        ]
+        assert pool.checkedout() == 0
+
+        # Every socket gets a turn while all the others stay open.
+        for number, socket in enumerate(sockets):
+            socket.send_text(f"hello {number}")
+            assert socket.receive_text() == f"echo: hello {number}"
+
+        assert pool.checkedout() == 0
+        assert pool.size() == POOL_SIZE
+
+    writer = client.app.state.turn_writer
+    assert len(writer.pending_turns(1)) == SOCKETS
+
+
+def test_idle_socket_is_closed(client, monkeypatch):
+    """A socket without messages for the idle timeout is closed with 1001."""
+    monkeypatch.setattr(settings, "ws_idle_timeout_secs", 0.2)
+    closed = _gauge("cowrite_ws_connections_closed_total", {"reason": "idle"})
+
+    with client.websocket_connect("/ws/chat/1", headers=HEADERS) as socket:
+        socket.send_text("hi")
+        assert socket.receive_text() == "echo: hi"
+        start = time.monotonic()
+        with pytest.raises(WebSocketDisconnect) as disconnect:
+            socket.receive_text()
+
+    assert disconnect.value.code == 1001
+    assert 0.1 < time.monotonic() - start < 5
+    assert (
+        _gauge("cowrite_ws_connections_closed_total", {"reason": "idle"}) == closed + 1
+    )
+
+
+def test_connections_per_user_are_capped(client):
+    """Sockets beyond the per-user limit are refused and not counted as active."""
+    client.app.state.ws_connections = ConnectionTracker(max_per_user=2)
+    active = _gauge("cowrite_ws_connections_active")
+
+    with ExitStack() as stack:
+        sockets = [
+            stack.enter_context(client.websocket_connect("/ws/chat/1", headers=HEADERS))
+            for _ in range(2)
+        ]
+        sockets[-1].send_text("ready?")
+        sockets[-1].receive_text()
+        assert _gauge("cowrite_ws_connections_active") == active + 2
+
+        with client.websocket_connect("/ws/chat/1", headers=HEADERS) as extra:
+            with pytest.raises(WebSocketDisconnect) as disconnect:
+                extra.receive_text()
+        assert disconnect.value.code == 1008
+        assert _gauge("cowrite_ws_connections_active") == active + 2
+
+    # A closed socket frees its slot.
+    with client.websocket_connect("/ws/chat/1", headers=HEADERS) as socket:
+        socket.send_text("again")
+        assert socket.receive_text() == "echo: again"
+
+
+def test_sockets_need_a_valid_session(client):
+    """The handshake is refused for a bad cookie; without one the chat says why."""
+    bad = {"cookie": f"{settings.user_cookie_name}=not.a.jwt"}
+    with pytest.raises(WebSocketDisconnect) as disconnect:
+        with client.websocket_connect("/ws/chat/1", headers=bad):
+            pass
+    assert disconnect.value.code == 1008
+
+    with client.websocket_connect("/ws/chat/1") as socket:
+        assert socket.receive_text() == "Missing session cookie"
+
+
+def test_other_users_conversation_is_refused(client):
+    """The handshake on someone else's conversation is refused."""
+    for path in ("/ws/chat/2", "/ws/chat/404"):
+        with pytest.raises(WebSocketDisconnect) as disconnect:
+            with client.websocket_connect(path, headers=HEADERS):
+                pass
+        assert disconnect.value.code == 1008
+    assert not client.app.state.turn_writer.pending_turns(2)